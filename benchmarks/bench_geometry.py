@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the segment intersection kernels in util.geometry
+Compares calculateIntersectPoint with segmentIntersectPoint and the
+vectorized polygonIntersectPoint on game sized shapes
+"""
+
+import argparse
+import random
+import sys
+import os
+import timeit
+
+# Add source directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from util.geometry import (calculateIntersectPoint, segmentIntersectPoint,
+                           polygonIntersectPoint, polygonIntersectAvailable)
+
+# Outlines as used in the game, a large rock and the ship
+ROCK = [(-10, -30), (15, -30), (32, -10), (32, 12), (15, 32), (0, 32),
+        (0, 10), (-20, 32), (-37, 10), (-17, 2), (-37, -7)]
+SHIP = [(0, -10), (6, 10), (3, 7), (-3, 7), (-6, 10)]
+
+
+def place(pointlist, x, y):
+    return [[px + x, py + y] for px, py in pointlist]
+
+
+# Double loop over both outlines, as VectorSprite.checkPolygonCollision does
+def polygonLoop(intersect, pointlist1, pointlist2):
+    for i in range(0, len(pointlist1)):
+        for j in range(0, len(pointlist2)):
+            p = intersect(pointlist1[i-1], pointlist1[i],
+                          pointlist2[j-1], pointlist2[j])
+            if p is not None:
+                return p
+    return None
+
+
+def timePerCall(func, number):
+    best = min(timeit.repeat(func, number=number, repeat=5))
+    return best / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=2000,
+                        help='calls per timing run')
+    args = parser.parse_args()
+
+    random.seed(0)
+    segments = [[(random.uniform(0, 100), random.uniform(0, 100))
+                 for _ in range(4)] for _ in range(256)]
+
+    def oldSegments():
+        for p in segments:
+            calculateIntersectPoint(*p)
+
+    def newSegments():
+        for p in segments:
+            segmentIntersectPoint(*p)
+
+    rock = place(ROCK, 500, 400)
+    shipMiss = place(SHIP, 580, 400)  # inside the rock's bounding box only
+    shipHit = place(SHIP, 530, 400)
+
+    results = [
+        ('segment pair, calculateIntersectPoint',
+         timePerCall(oldSegments, args.number // 10) / len(segments)),
+        ('segment pair, segmentIntersectPoint',
+         timePerCall(newSegments, args.number // 10) / len(segments)),
+    ]
+
+    for name, ship in (('miss', shipMiss), ('hit', shipHit)):
+        results.append(('rock v ship %s, calculateIntersectPoint loop' % name,
+                        timePerCall(lambda: polygonLoop(
+                            calculateIntersectPoint, rock, ship),
+                            args.number)))
+        results.append(('rock v ship %s, segmentIntersectPoint loop' % name,
+                        timePerCall(lambda: polygonLoop(
+                            segmentIntersectPoint, rock, ship),
+                            args.number)))
+        if polygonIntersectAvailable:
+            results.append(('rock v ship %s, polygonIntersectPoint' % name,
+                            timePerCall(lambda: polygonIntersectPoint(
+                                rock, ship), args.number)))
+
+    width = max(len(name) for name, _ in results)
+    for name, micros in results:
+        print('%-*s %9.2f us' % (width, name, micros))
+
+
+if __name__ == '__main__':
+    main()
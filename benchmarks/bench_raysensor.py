@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for util.raysensor
+Times RaySensor.sense for a ship among a field of rocks
+"""
+
+import argparse
+import sys
+import os
+import timeit
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+# Add source directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from asteroids import Asteroids
+from badies import Rock
+from util.vector2d import Vector2d
+from util.raysensor import RaySensor, raySensorAvailable
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rays', type=int, default=64)
+    parser.add_argument('--rocks', type=int, default=120)
+    parser.add_argument('--number', type=int, default=200,
+                        help='calls per timing run')
+    args = parser.parse_args()
+
+    if not raySensorAvailable:
+        sys.exit('numpy not installed')
+
+    game = Asteroids(headless=True, seed=3)
+    game.initialiseGame()
+    while len(game.rockList) < args.rocks:
+        position = Vector2d(game.rng.uniform(0, game.stage.width),
+                            game.rng.uniform(0, game.stage.height))
+        rock = Rock(game.stage, position, game.rng.randrange(3), game.rng,
+                    game.rockShapes)
+        game.stage.addSprite(rock)
+        game.rockList.append(rock)
+
+    sensor = RaySensor(game.stage.width, game.stage.height, args.rays)
+    best = min(timeit.repeat(lambda: sensor.sense(game), number=args.number,
+                             repeat=5))
+    print('%d rays, %d rocks: %.3f ms' % (args.rays, len(game.rockList),
+                                          best / args.number * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Frame pipeline benchmarks on fixed, seeded game scenarios
+Times Stage.moveSprites, the sprite drawing, Asteroids.checkCollisions and
+the HUD separately for every frame and reports mean/p50/p99 in ms.
+Results can be saved as JSON and compared with an earlier run, the exit
+status is 1 when any stage got slower than the threshold allows
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+srcDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Draw to an offscreen display with no sound unless asked otherwise, must be
+# set before pygame starts
+if '--display' not in sys.argv:
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+# Add source directory to path
+sys.path.insert(0, srcDir)
+
+import pygame
+from asteroids import Asteroids
+from badies import Rock, Saucer, Debris
+from util.vector2d import Vector2d
+from util.controls import FIRE, ROTATE_LEFT, THRUST
+from util.frameprofiler import percentile
+from util.particles import particlesAvailable
+
+phases = ('move', 'draw', 'collisions', 'hud', 'total')
+
+
+# Holds the keys down every tick
+class HeldInput:
+
+    def __init__(self, keys):
+        self.keys = keys
+
+    def keyDown(self, key):
+        pass
+
+    def read(self):
+        return self.keys
+
+
+def spreadRocks(game, counts):
+    for rockType, count in enumerate(counts):
+        for _ in range(count):
+            position = Vector2d(game.rng.uniform(0, game.stage.width),
+                                game.rng.uniform(0, game.stage.height))
+            rock = Rock(game.stage, position, rockType, game.rng,
+                        game.rockShapes)
+            game.stage.addSprite(rock)
+            game.rockList.append(rock)
+
+
+def clearRocks(game):
+    for rock in game.rockList:
+        game.stage.removeSprite(rock)
+    game.rockList = []
+
+
+# Scenarios, each sets up a freshly started game and may top it up between
+# frames (untimed) so the load stays the same for the whole run
+
+def wave1(game):
+    pass
+
+
+def wave20(game):
+    clearRocks(game)
+    game.numRocks = 22
+    spreadRocks(game, (30, 30, 20))
+
+
+# Somewhere for Asteroids.createDebris to put an explosion
+class Blast:
+
+    def __init__(self, position):
+        self.position = position
+
+
+def debrisCount(game):
+    if game.stage.particles is not None:
+        return len(game.stage.particles)
+    return sum(1 for sprite in game.stage.spriteList
+               if isinstance(sprite, Debris))
+
+
+# Keeps count pieces of debris flying, as particles or Debris sprites
+def explosions(game, count):
+    def topUp():
+        pieces = debrisCount(game)
+        while pieces < count:
+            position = Vector2d(game.rng.uniform(0, game.stage.width),
+                                game.rng.uniform(0, game.stage.height))
+            game.createDebris(Blast(position))
+            pieces += 25
+
+    topUp()
+    return topUp
+
+
+def debris(game):
+    return explosions(game, 5000)
+
+
+def particles(game):
+    return explosions(game, 100000)
+
+
+def saucerSpray(game):
+    def newSaucer():
+        if game.saucer is None:
+            game.saucer = Saucer(game.stage, Saucer.smallSaucerType,
+                                 game.ship, game.rng)
+            game.stage.addSprite(game.saucer)
+
+    game.controls = HeldInput(FIRE | ROTATE_LEFT | THRUST)
+    spreadRocks(game, (4, 4, 4))
+    newSaucer()
+    return newSaucer
+
+
+scenarios = {
+    'wave1': ('wave 1, three large rocks', wave1),
+    'wave20': ('wave 20, 80 rocks of all sizes', wave20),
+    'debris': ('5000 debris particles', debris),
+    'particles': ('100000 debris particles (needs numpy)', particles),
+    'saucer': ('saucer and a full spray of bullets', saucerSpray),
+}
+
+
+# Adds up the time spent in the wrapped methods for each frame
+class PhaseTimer:
+
+    def __init__(self):
+        self.current = dict.fromkeys(phases, 0.0)
+
+    def wrap(self, obj, name, phase):
+        method = getattr(obj, name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.current[phase] += time.perf_counter() - start
+
+        setattr(obj, name, timed)
+
+    def take(self):
+        frame = self.current
+        self.current = dict.fromkeys(phases, 0.0)
+        return frame
+
+
+def createGame(options, seed):
+    game = Asteroids(headless=options.headless,
+                     entityStore=options.entity_store,
+                     batchTransform=options.batch_transform,
+                     dirtyRects=options.dirty_rects,
+                     spriteAtlas=options.sprite_atlas,
+                     seed=seed, controls=HeldInput(0))
+    game.initialiseGame()
+    game.showingFPS = True
+    game.fps = 60
+
+    # The ship can't die, so every frame does the same work
+    game.killShip = lambda cause=None: None
+    return game
+
+
+def runScenario(name, options):
+    game = createGame(options, options.seed)
+    everyFrame = scenarios[name][1](game)
+
+    timer = PhaseTimer()
+    timer.wrap(game.stage, 'moveSprites', 'move')
+    timer.wrap(game.stage, 'updateSprites', 'draw')
+    timer.wrap(game.stage, 'renderSprites', 'draw')
+    timer.wrap(game, 'checkCollisions', 'collisions')
+    timer.wrap(game, 'displayScore', 'hud')
+    timer.wrap(game, 'displayFps', 'hud')
+    timer.wrap(game, 'displayText', 'hud')
+
+    frames = []
+    for frameNumber in range(options.warmup + options.frames):
+        if everyFrame is not None:
+            everyFrame()
+        timer.take()
+
+        start = time.perf_counter()
+        game.tick()
+        game.render()
+        total = time.perf_counter() - start
+
+        frame = timer.take()
+        frame['total'] = total
+        if frameNumber >= options.warmup:
+            frames.append(frame)
+
+    results = {}
+    for phase in phases:
+        times = sorted(frame[phase] * 1000.0 for frame in frames)
+        results[phase] = {
+            'mean': sum(times) / len(times),
+            'p50': percentile(times, 50),
+            'p99': percentile(times, 99),
+        }
+    results['description'] = scenarios[name][0]
+    results['sprites'] = len(game.stage.spriteList)
+    return results
+
+
+def gitCommit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=srcDir,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def printResults(results):
+    print('%-8s %-10s %9s %9s %9s' % ('scenario', 'stage', 'mean ms',
+                                      'p50 ms', 'p99 ms'))
+    for name, scenario in results.items():
+        for phase in phases:
+            stats = scenario[phase]
+            print('%-8s %-10s %9.3f %9.3f %9.3f' % (
+                name, phase, stats['mean'], stats['p50'], stats['p99']))
+
+
+# Stages slower than the baseline by more than threshold (a fraction) and
+# by at least minMs, so tiny stages don't fail on noise
+def findRegressions(results, baseline, metric, threshold, minMs):
+    regressions = []
+    for name, scenario in results.items():
+        if name not in baseline:
+            continue
+        for phase in phases:
+            if phase not in baseline[name]:
+                continue
+            old = baseline[name][phase][metric]
+            new = scenario[phase][metric]
+            if new > old * (1.0 + threshold) and new - old >= minMs:
+                regressions.append((name, phase, old, new))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('scenarios', nargs='*', metavar='SCENARIO',
+                        help='scenarios to run (default all): %s' %
+                        ', '.join(scenarios))
+    parser.add_argument('--frames', type=int, default=300,
+                        help='timed frames per scenario')
+    parser.add_argument('--warmup', type=int, default=30,
+                        help='untimed frames before timing starts')
+    parser.add_argument('--seed', type=int, default=1,
+                        help='seed for every scenario')
+    parser.add_argument('--output', metavar='FILE',
+                        help='save the results as JSON')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='compare with the results of an earlier run')
+    parser.add_argument('--metric', choices=('mean', 'p50', 'p99'),
+                        default='p50', help='statistic compared with the '
+                        'baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='fail when a stage is this fraction slower '
+                        'than the baseline')
+    parser.add_argument('--min-ms', type=float, default=0.05,
+                        help='ignore slowdowns smaller than this')
+    parser.add_argument('--display', action='store_true',
+                        help='draw to a real display')
+    parser.add_argument('--headless', action='store_true',
+                        help='no drawing at all, only the simulation')
+    parser.add_argument('--entity-store', action='store_true')
+    parser.add_argument('--batch-transform', action='store_true')
+    parser.add_argument('--dirty-rects', action='store_true')
+    parser.add_argument('--sprite-atlas', action='store_true')
+    args = parser.parse_args()
+
+    for name in args.scenarios:
+        if name not in scenarios:
+            parser.error('unknown scenario %s' % name)
+
+    # Without numpy the particles would all be sprites, far too slow
+    names = args.scenarios or [name for name in scenarios
+                               if name != 'particles' or particlesAvailable]
+
+    # The game loads its font relative to the source directory
+    if args.output:
+        args.output = os.path.abspath(args.output)
+    if args.baseline:
+        args.baseline = os.path.abspath(args.baseline)
+    os.chdir(srcDir)
+
+    results = {}
+    for name in names:
+        results[name] = runScenario(name, args)
+
+    printResults(results)
+
+    if args.output:
+        report = {
+            'commit': gitCommit(),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'frames': args.frames,
+            'seed': args.seed,
+            'options': {
+                'headless': args.headless,
+                'entityStore': args.entity_store,
+                'batchTransform': args.batch_transform,
+                'dirtyRects': args.dirty_rects,
+                'spriteAtlas': args.sprite_atlas,
+            },
+            'scenarios': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['scenarios']
+        regressions = findRegressions(results, baseline, args.metric,
+                                      args.threshold, args.min_ms)
+        for name, phase, old, new in regressions:
+            print('REGRESSION %s %s %s: %.3f ms -> %.3f ms' % (
+                name, phase, args.metric, old, new))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
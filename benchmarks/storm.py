@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Load test with an asteroid storm
+Plays storms of more and more rocks with the ship spinning and firing, then
+narrows down the highest number of rocks whose frames (a tick and drawing
+them) still fit the frame budget at the chosen percentile
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+srcDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Draw to an offscreen display with no sound unless asked otherwise, must be
+# set before pygame starts
+if '--display' not in sys.argv:
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+# Add source directory to path
+sys.path.insert(0, srcDir)
+
+import pygame
+from asteroids import Asteroids
+from util.controls import FIRE, ROTATE_LEFT
+from util.entitystore import entityStoreAvailable
+from util.frameprofiler import percentile
+from util.narrowphase import narrowPhase, NarrowPhase
+
+
+# Holds fire and rotate down, so there are always bullets to check
+class SpinAndFire:
+
+    def keyDown(self, key):
+        pass
+
+    def read(self):
+        return FIRE | ROTATE_LEFT
+
+
+# Frame times in ms for a storm of the given number of rocks
+def runStorm(rocks, options):
+    game = Asteroids(headless=options.headless, seed=options.seed,
+                     controls=SpinAndFire(), storm=rocks)
+    game.initialiseGame()
+
+    # The ship can't die, so every frame does the same work
+    game.killShip = lambda cause=None: None
+
+    times = []
+    for frameNumber in range(options.warmup + options.frames):
+        if frameNumber == options.warmup:
+            narrowPhase.clear()
+        start = time.perf_counter()
+        game.tick()
+        game.render()
+        if frameNumber >= options.warmup:
+            times.append((time.perf_counter() - start) * 1000.0)
+
+    times.sort()
+    return {
+        'rocks': rocks,
+        'mean': sum(times) / len(times),
+        'p50': percentile(times, 50),
+        'p95': percentile(times, 95),
+        'p99': percentile(times, 99),
+        # Collision pairs a frame, how many each tier ruled out and how many
+        # hit on the boxes alone
+        'narrowPhase': dict((name, count / float(options.frames))
+                            for name, count in narrowPhase.stats().items()),
+    }
+
+
+def printResult(result, budget, metric):
+    print('%6d rocks  mean %7.2f  p95 %7.2f  p99 %7.2f ms  %s' % (
+        result['rocks'], result['mean'], result['p95'], result['p99'],
+        'ok' if result[metric] <= budget else 'too slow'))
+    narrow = result['narrowPhase']
+    print('        pairs/frame %7.1f  %s  hits %.1f (box only %.1f)' % (
+        narrow['pairs'], '  '.join('%s %.1f' % (name, narrow[name])
+                                   for name in NarrowPhase.tiers),
+        narrow['hits'], narrow['boxHits']))
+
+
+# Step up by step rocks until a storm is too slow, then halve the gap
+# between the last storm that kept up and the first that didn't until it is
+# no bigger than resolution. Returns the highest count that kept up (0 if
+# none did) and every result
+def findLimit(options, budget, metric):
+    results = []
+
+    def keepsUp(rocks):
+        result = runStorm(rocks, options)
+        printResult(result, budget, metric)
+        results.append(result)
+        return result[metric] <= budget
+
+    good, bad = 0, None
+    rocks = options.start
+    while rocks <= options.max:
+        if not keepsUp(rocks):
+            bad = rocks
+            break
+        good = rocks
+        rocks += options.step
+
+    if bad is None:
+        return good, results
+
+    while bad - good > options.resolution:
+        rocks = (good + bad) // 2
+        if keepsUp(rocks):
+            good = rocks
+        else:
+            bad = rocks
+
+    return good, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--start', type=int, default=1000,
+                        help='rocks in the first storm')
+    parser.add_argument('--step', type=int, default=1000,
+                        help='rocks added each storm')
+    parser.add_argument('--max', type=int, default=20000,
+                        help='rocks in the biggest storm tried')
+    parser.add_argument('--resolution', type=int, default=250,
+                        help='stop narrowing down when this close')
+    parser.add_argument('--frames', type=int, default=120,
+                        help='timed frames per storm')
+    parser.add_argument('--warmup', type=int, default=20,
+                        help='untimed frames before timing starts')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--fps', type=int, default=60,
+                        help='frame rate to hold')
+    parser.add_argument('--metric', choices=('mean', 'p50', 'p95', 'p99'),
+                        default='p95', help='frame time that has to fit '
+                        'the budget')
+    parser.add_argument('--output', metavar='FILE',
+                        help='save the results as JSON')
+    parser.add_argument('--display', action='store_true',
+                        help='draw to a real display')
+    parser.add_argument('--headless', action='store_true',
+                        help='no drawing at all, only the simulation')
+    args = parser.parse_args()
+
+    if not entityStoreAvailable:
+        sys.exit('numpy not installed, a storm needs it')
+
+    # The game loads its font relative to the source directory
+    if args.output:
+        args.output = os.path.abspath(args.output)
+    os.chdir(srcDir)
+
+    budget = 1000.0 / args.fps
+    limit, results = findLimit(args, budget, args.metric)
+    print('Holds %d FPS (%s frame within %.1f ms) up to %d rocks' % (
+        args.fps, args.metric, budget, limit))
+
+    if args.output:
+        report = {
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'machine': platform.machine(),
+            'fps': args.fps,
+            'metric': args.metric,
+            'headless': args.headless,
+            'limit': limit,
+            'storms': sorted(results, key=lambda result: result['rocks']),
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -18,7 +18,6 @@
 #
 
 # TODO
-# safe area on new life
 # sounds thump
 
 # Notes:
@@ -26,6 +25,7 @@
 # random.uniform returns a float
 # p for pause
 # j for toggle showing FPS
+# g for toggle the frame profiler
 # o for frame advance whilst paused
 # k to kill own ship
 
@@ -33,8 +33,16 @@ import pygame
 import sys
 import os
 import random
+import math
+import argparse
+from collections import Counter
 from pygame.locals import *
 from util.vectorsprites import *
+from util.spatialhash import *
+from util.textcache import *
+from util.controls import *
+from util.frameprofiler import *
+from util.dangergrid import *
 from ship import *
 from stage import *
 from badies import *
@@ -46,19 +54,72 @@ class Asteroids():
 
     explodingTtl = 180
 
-    def __init__(self):
-        self.stage = Stage('Atari Asteroids', (1024, 768))
+    # The display is drawn at most maxFps times a second, and when it falls
+    # behind at most maxCatchUpTicks ticks are run before the next frame
+    maxFps = 60
+    maxCatchUpTicks = 5
+
+    # The profiler keeps this many seconds of frames, its figures are
+    # worked out again every profilerRefresh frames
+    profilerSeconds = 5
+    profilerRefresh = 30
+
+    # Furthest any rock's outline reaches from its position, and how far
+    # from the ship storm rocks are kept when they appear
+    rockReach = int(math.ceil(Rock.reach))
+    stormClearance = 150
+
+    # Velocities, timers and the saucer's arrival are all counted in ticks,
+    # they are tuned for the default of 60 ticks a second.
+    # Everything random in the game comes from its own generator made from
+    # seed, and all input is read once a tick from controls, so the same
+    # seed and the same input always play the same game. Without controls a
+    # game with a display reads the keyboard and a headless game gets none.
+    # A storm starts each wave with storm rocks (thousands of them) spread
+    # over the screen, moved, transformed and drawn in batches. Given a
+    # surface the game is drawn onto it rather than the display
+    def __init__(self, headless=False, entityStore=False,
+                 batchTransform=False, dirtyRects=False, spriteAtlas=False,
+                 tickRate=60, seed=None, controls=None, storm=0,
+                 surface=None):
+        self.storm = storm
+        if storm:
+            entityStore = batchTransform = spriteAtlas = True
+        self.stage = Stage('Atari Asteroids', (1024, 768), headless,
+                           entityStore, batchTransform, dirtyRects,
+                           spriteAtlas, surface=surface)
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.rockShapes = RockShapes()
+        if controls is None and not headless:
+            controls = KeyboardInput()
+        self.controls = controls
+        self.keys = 0
+        self.tickRate = tickRate
+        self.lag = 0.0
         self.paused = False
         self.showingFPS = False
+        self.showingProfiler = False
+        self.profiler = FrameProfiler(self.profilerSeconds * self.maxFps)
+        self.profilerRows = []
+        self.profilerAge = 0
+        self.narrowCounts = narrowPhase.stats()
         self.frameAdvance = False
         self.gameState = "attract_mode"
         self.rockList = []
-        self.createRocks(3)
+        self.rockGrid = SpatialHash(self.stage.width, self.stage.height)
+        self.dangerGrid = DangerGrid(self.stage.width, self.stage.height)
+        self.textCache = TextCache('../res/Hyperspace.otf')
+        self.ship = None
+        self.createRocks(storm or 3)
         self.saucer = None
         self.secondsCount = 1
         self.score = 0
-        self.ship = None
         self.lives = 0
+        self.level = 1
+        self.deathCause = None
         self.highscoreTab = [ ['ACE', 20000], ['SND', 10000], ['TRD', 5000] ]
         self.preInitials = 'AAA'
         self.scorePos = 0
@@ -114,23 +175,30 @@ class Asteroids():
          for sprite in self.rockList]  # clear old rocks
         if self.saucer is not None:
             self.killSaucer()
+        self.dangerGrid.clear()
         self.startLives = 3
         self.createNewShip()
         self.createLivesList()
         self.score = 0
         self.rockList = []
-        self.numRocks = 3
+        self.numRocks = self.storm or 3
+        self.level = 1
+        self.deathCause = None
         self.nextLife = 10000
 
         self.createRocks(self.numRocks)
         self.secondsCount = 1
         self.scoreChecked = False
 
+    # New ships start in the middle unless a rock is heading there, then
+    # at the nearest safe place
     def createNewShip(self):
         if self.ship:
-            [self.stage.spriteList.remove(debris)
+            [self.stage.removeSprite(debris)
              for debris in self.ship.shipDebrisList]
-        self.ship = Ship(self.stage)
+        self.ship = Ship(self.stage, self.rng, self.dangerGrid)
+        self.ship.moveTo(*self.dangerGrid.safestPoint(
+            self.stage.width / 2, self.stage.height / 2))
         self.stage.addSprite(self.ship.thrustJet)
         self.stage.addSprite(self.ship)
 
@@ -142,70 +210,174 @@ class Asteroids():
 
     def addLife(self, lifeNumber):
         self.lives += 1
-        ship = Ship(self.stage)
-        self.stage.addSprite(ship)
+        ship = Ship(self.stage, self.rng)
+        bounds = ship.bounds()
         ship.position.x = self.stage.width - \
-            (lifeNumber * ship.boundingRect.width) - 10
-        ship.position.y = 0 + ship.boundingRect.height
+            (lifeNumber * bounds.width) - 10
+        ship.position.y = 0 + bounds.height
+        self.stage.addSprite(ship)
         self.livesList.append(ship)
 
+    # Rocks start in the top left corner, in a storm they are spread over
+    # the screen
     def createRocks(self, numRocks):
         for _ in range(0, numRocks):
-            position = Vector2d(random.randrange(-10, 10),
-                                random.randrange(-10, 10))
+            if self.storm:
+                position = self.stormPosition()
+            else:
+                position = Vector2d(self.rng.randrange(-10, 10),
+                                    self.rng.randrange(-10, 10))
 
-            newRock = Rock(self.stage, position, Rock.largeRockType)
+            newRock = Rock(self.stage, position, Rock.largeRockType,
+                           self.rng, self.rockShapes)
             self.stage.addSprite(newRock)
             self.rockList.append(newRock)
 
-    def playGame(self):
+    # Anywhere on the screen that isn't too close to the ship (or the middle
+    # if there isn't one yet)
+    def stormPosition(self):
+        if self.ship is not None:
+            centerX, centerY = self.ship.position.x, self.ship.position.y
+        else:
+            centerX, centerY = self.stage.width / 2, self.stage.height / 2
+
+        while True:
+            x = self.rng.uniform(0, self.stage.width)
+            y = self.rng.uniform(0, self.stage.height)
+            if math.hypot(x - centerX, y - centerY) > self.stormClearance:
+                return Vector2d(x, y)
+
+    # The game moves on in fixed ticks of 1/tickRate seconds. Each frame
+    # runs as many ticks as the time since the last one needs and then
+    # draws the result, so a slow display drops frames rather than slowing
+    # the game down. A headless game only runs ticks, and with no controls
+    # there is nobody to press start so it begins playing straight away.
+    # Stops after maxFrames ticks if given
+    def playGame(self, maxFrames=None):
 
         clock = pygame.time.Clock()
+        headless = self.stage.headless
 
+        if headless and self.controls is None:
+            self.initialiseGame()
+
+        self.lag = 0.0
         frameCount = 0.0
         timePassed = 0.0
+        totalTicks = 0
         self.fps = 0.0
         # Main loop
-        while True:
+        while maxFrames is None or totalTicks < maxFrames:
 
-            # calculate fps
-            timePassed += clock.tick(60)
+            # calculate fps, headless games don't wait for the next frame
+            if headless:
+                elapsed = clock.tick()
+            else:
+                elapsed = clock.tick(self.maxFps)
+            timePassed += elapsed
             frameCount += 1
             if frameCount % 10 == 0:  # every 10 frames
                 # nearest integer
-                self.fps = round((frameCount / (timePassed / 1000.0)))
+                self.fps = round((frameCount / (max(timePassed, 1) / 1000.0)))
                 # reset counter
                 timePassed = 0
                 frameCount = 0
 
-            self.secondsCount += 1
+            self.profiler.startFrame(elapsed)
+            if headless:
+                self.tick()
+                self.profiler.endFrame()
+                totalTicks += 1
+                continue
 
             self.input(pygame.event.get())
+            self.profiler.lap('input')
 
             # pause
             if self.paused and not self.frameAdvance:
                 self.displayPaused()
+                self.lag = 0.0
                 continue
 
-            self.stage.screen.fill((10, 10, 10))
-            self.stage.moveSprites()
-            self.stage.drawSprites()
-            self.doSaucerLogic()
-            self.displayScore()
-            if self.showingFPS:
-                self.displayFps()  # for debug
-            self.checkExtraLife()
-
-            # Process keys
-            if self.gameState == 'playing':
-                self.playing()
-            elif self.gameState == 'exploding':
-                self.exploding()
+            if self.paused:
+                # frame advance
+                ticks = 1
             else:
-                self.displayText()
-
-            # Double buffer draw
-            pygame.display.flip()
+                ticks = self.ticksDue(elapsed)
+
+            if maxFrames is not None:
+                ticks = min(ticks, maxFrames - totalTicks)
+
+            for _ in range(ticks):
+                self.tick()
+                totalTicks += 1
+
+            self.render()
+            self.profiler.endFrame()
+
+    # The number of ticks to run after elapsed milliseconds, the time left
+    # over is carried on to the next frame
+    def ticksDue(self, elapsed):
+        tickTime = 1000.0 / self.tickRate
+        self.lag += elapsed
+        ticks = int(self.lag // tickTime)
+        if ticks > self.maxCatchUpTicks:
+            # Too far behind, give up on the rest
+            self.lag = 0.0
+            return self.maxCatchUpTicks
+
+        self.lag -= ticks * tickTime
+        return ticks
+
+    # Move the game on by one tick
+    def tick(self):
+        lap = self.profiler.lap
+        if self.controls is not None:
+            self.keys = self.controls.read()
+        self.pressKeys(self.keys)
+        lap('input')
+
+        self.secondsCount += 1
+        self.stage.moveSprites()
+        lap('move')
+        self.stage.updateSprites()
+        lap('draw')
+        self.doSaucerLogic()
+        lap('saucer')
+        self.updateDangerGrid()
+        lap('danger')
+        self.checkExtraLife()
+
+        # playing() laps the collisions itself, the rest is charged to game
+        if self.gameState == 'playing':
+            self.playing()
+        elif self.gameState == 'exploding':
+            self.exploding()
+        lap('game')
+
+    # Draw the game as the last tick left it, a headless game draws nothing
+    def render(self):
+        if self.stage.headless:
+            return
+
+        lap = self.profiler.lap
+        self.stage.clearScreen()
+        self.stage.renderSprites()
+        lap('draw')
+        self.displayScore()
+        if self.showingFPS:
+            self.displayFps()  # for debug
+
+        if self.showingProfiler:
+            self.displayProfiler()
+
+        if self.gameState != 'playing' and self.gameState != 'exploding':
+            self.displayText()
+        lap('hud')
+
+        # Double buffer draw
+        self.stage.present()
+        lap('flip')
 
     def playing(self):
         if self.lives == 0:
@@ -213,11 +385,25 @@ class Asteroids():
                 self.checkScore()
                 #print(self.scoreChecked)
         else:
-            self.processKeys()
+            lap = self.profiler.lap
+            self.processKeys(self.keys)
+            lap('game')
             self.checkCollisions()
+            lap('collisions')
             if len(self.rockList) == 0:
                 self.levelUp()
 
+    # A storm covers the whole screen so the grid isn't kept, new ships
+    # start in the middle and hyperspace goes anywhere
+    def updateDangerGrid(self):
+        if self.storm:
+            return
+
+        if self.saucer is None:
+            self.dangerGrid.update(self.rockList)
+        else:
+            self.dangerGrid.update(self.rockList + [self.saucer])
+
     def doSaucerLogic(self):
         if self.saucer is not None:
             if self.saucer.laps >= 2:
@@ -225,20 +411,20 @@ class Asteroids():
 
         # Create a saucer
         if self.secondsCount % 2000 == 0 and self.saucer is None:
-            randVal = random.randrange(0, 10)
+            randVal = self.rng.randrange(0, 10)
             if randVal <= 3:
                 self.saucer = Saucer(
-                    self.stage, Saucer.smallSaucerType, self.ship)
+                    self.stage, Saucer.smallSaucerType, self.ship, self.rng)
             else:
                 self.saucer = Saucer(
-                    self.stage, Saucer.largeSaucerType, self.ship)
+                    self.stage, Saucer.largeSaucerType, self.ship, self.rng)
             self.stage.addSprite(self.saucer)
 
     def exploding(self):
         self.explodingCount += 1
         if self.explodingCount > self.explodingTtl:
             self.gameState = 'playing'
-            [self.stage.spriteList.remove(debris)
+            [self.stage.removeSprite(debris)
              for debris in self.ship.shipDebrisList]
             self.ship.shipDebrisList = []
 
@@ -249,62 +435,58 @@ class Asteroids():
 
     def levelUp(self):
         self.numRocks += 1
+        self.level += 1
         self.createRocks(self.numRocks)
 
     # move this kack somewhere else!
     def displayText(self):
-        font1 = pygame.font.Font('../res/Hyperspace.otf', 50)
-        font2 = pygame.font.Font('../res/Hyperspace.otf', 20)
-        font3 = pygame.font.Font('../res/Hyperspace.otf', 30)
-        
-        titleText = font1.render('Asteroids', True, (180, 180, 180))
+        titleText = self.textCache.render(50, 'Asteroids', (180, 180, 180))
         titleTextRect = titleText.get_rect(centerx=self.stage.width/2)
         titleTextRect.y = self.stage.height/2 - titleTextRect.height*2
-        self.stage.screen.blit(titleText, titleTextRect)
+        self.stage.blit(titleText, titleTextRect)
 
-        keysText = font2.render(
-            '(C) 1979 Atari INC.', True, (255, 255, 255))
+        keysText = self.textCache.render(
+            20, '(C) 1979 Atari INC.', (255, 255, 255))
         keysTextRect = keysText.get_rect(centerx=self.stage.width/2)
         keysTextRect.y = self.stage.height - keysTextRect.height - 20
-        self.stage.screen.blit(keysText, keysTextRect)
+        self.stage.blit(keysText, keysTextRect)
 
-        instructionText = font3.render(
-            'Press start to Play', True, (200, 200, 200))
+        instructionText = self.textCache.render(
+            30, 'Press start to Play', (200, 200, 200))
         instructionTextRect = instructionText.get_rect(
             centerx=self.stage.width/2)
         instructionTextRect.y = self.stage.height/2 - instructionTextRect.height
-        self.stage.screen.blit(instructionText, instructionTextRect)
+        self.stage.blit(instructionText, instructionTextRect)
 
         self.displayHighscore()
 
     def displayScore(self):
-        font1 = pygame.font.Font('../res/Hyperspace.otf', 30)
         scoreStr = str("%02d" % self.score)
-        scoreText = font1.render(scoreStr, True, (200, 200, 200))
+        scoreText = self.textCache.render(30, scoreStr, (200, 200, 200))
         scoreTextRect = scoreText.get_rect(centerx=100, centery=45)
-        self.stage.screen.blit(scoreText, scoreTextRect)
+        self.stage.blit(scoreText, scoreTextRect)
 
     def displayHighscore(self):
-        font1 = pygame.font.Font('../res/Hyperspace.otf', 30)
         y_pos = self.stage.height/2 + 100
         x_pos = self.stage.width/2
         for item in self.highscoreTab:
             itemStr = item[0] + ':    ' + str('%6d' % item[1])
-            itemTxt = font1.render(itemStr, True, (200, 200, 200))
+            itemTxt = self.textCache.render(30, itemStr, (200, 200, 200))
             itemTxtRect = itemTxt.get_rect(centerx=x_pos, centery=y_pos)
-            self.stage.screen.blit(itemTxt, itemTxtRect)
+            self.stage.blit(itemTxt, itemTxtRect)
             y_pos += 50
             
     def displayPaused(self):
         if self.paused:
-            font1 = pygame.font.Font('../res/Hyperspace.otf', 30)
-            pausedText = font1.render("Paused", True, (255, 255, 255))
+            pausedText = self.textCache.render(30, "Paused", (255, 255, 255))
             textRect = pausedText.get_rect(
                 centerx=self.stage.width/2, centery=self.stage.height/2)
             self.stage.screen.blit(pausedText, textRect)
+            self.stage.redrawAll()
             pygame.display.update()
 
-    # Should move the ship controls into the ship class
+    # Keys that drive the game are handed to the controls and act on the
+    # next tick, the rest work the display and act straight away
     def input(self, events):
         self.frameAdvance = False
         for event in events:
@@ -313,35 +495,8 @@ class Asteroids():
             elif event.type == KEYDOWN:
                 if event.key == K_ESCAPE:
                     sys.exit(0)
-                if self.gameState == 'playing':
-                    if event.key == K_SPACE:
-                        self.ship.fireBullet()
-                    elif event.key == K_b:
-                        self.ship.fireBullet()
-                    elif event.key == K_h:
-                        self.ship.enterHyperSpace()
-                    elif event.key == K_k:
-                        self.killShip()
-                elif self.gameState == 'attract_mode':
-                    # Start a new game
-                    if event.key == K_RETURN:
-                        self.initialiseGame()
-                elif self.gameState == 'highscore_set':
-                    if event.key == K_UP and self.asciiNum[self.initialsNum] < 90:
-                        self.asciiNum[self.initialsNum] += 1
-                    elif event.key == K_DOWN and self.asciiNum[self.initialsNum] > 65:
-                        self.asciiNum[self.initialsNum] -= 1
-                    elif event.key == K_RIGHT and self.initialsNum < 2:
-                        self.initialsNum += 1
-                    elif event.key == K_LEFT and self.initialsNum > 0:
-                        self.initialsNum -= 1
-                    elif event.key == K_RETURN:
-                        self.gameState = 'attract_mode'
-                    itemStr = ''
-                    for i in range(0, 3):
-                        itemStr += chr(self.asciiNum[i])
-                    self.highscoreTab[self.scorePos][0] = itemStr
-                
+                if self.controls is not None:
+                    self.controls.keyDown(event.key)
 
                 if event.key == K_p:
                     if self.paused:  # (is True)
@@ -355,22 +510,54 @@ class Asteroids():
                     else:
                         self.showingFPS = True
 
+                if event.key == K_g:
+                    self.showingProfiler = not self.showingProfiler
+
                 if event.key == K_f:
                     pygame.display.toggle_fullscreen()
+                    self.stage.redrawAll()
 
             elif event.type == KEYUP:
                 if event.key == K_o:
                     self.frameAdvance = True
 
-    def processKeys(self):
-        key = pygame.key.get_pressed()
-
-        if key[K_LEFT] or key[K_z]:
+    # Act on the keys pressed since the last tick
+    def pressKeys(self, keys):
+        if self.gameState == 'playing':
+            if keys & FIRE:
+                self.ship.fireBullet()
+            if keys & HYPERSPACE:
+                self.ship.enterHyperSpace()
+            if keys & KILL:
+                self.killShip('self')
+        elif self.gameState == 'attract_mode':
+            # Start a new game
+            if keys & START:
+                self.initialiseGame()
+        elif self.gameState == 'highscore_set':
+            if keys & UP and self.asciiNum[self.initialsNum] < 90:
+                self.asciiNum[self.initialsNum] += 1
+            if keys & DOWN and self.asciiNum[self.initialsNum] > 65:
+                self.asciiNum[self.initialsNum] -= 1
+            if keys & RIGHT and self.initialsNum < 2:
+                self.initialsNum += 1
+            if keys & LEFT and self.initialsNum > 0:
+                self.initialsNum -= 1
+            if keys & START:
+                self.gameState = 'attract_mode'
+            itemStr = ''
+            for i in range(0, 3):
+                itemStr += chr(self.asciiNum[i])
+            self.highscoreTab[self.scorePos][0] = itemStr
+
+    # Act on the keys held down
+    def processKeys(self, keys):
+        if keys & ROTATE_LEFT:
             self.ship.rotateLeft()
-        elif key[K_RIGHT] or key[K_x]:
+        elif keys & ROTATE_RIGHT:
             self.ship.rotateRight()
 
-        if key[K_UP] or key[K_n]:
+        if keys & THRUST:
             self.ship.increaseThrust()
             self.ship.thrustJet.accelerating = True
         else:
@@ -380,82 +567,125 @@ class Asteroids():
 
     def checkCollisions(self):
 
-        # Ship bullet hit rock?
-        newRocks = []
-        shipHit, saucerHit = False, False
-
-        # Rocks
-        for rock in self.rockList:
-            rockHit = False
+        # What hit the ship, if anything
+        shipHit, saucerHit = None, False
+
+        # Broad phase, the rocks are filed in a grid so the ship, saucer and
+        # bullets are only tested against the rocks near them. Each pair it
+        # finds goes through the tiers of the narrow phase in collidesWith
+        self.rockGrid.rebuild(self.collidableRocks())
+        hitRocks = set()
+
+        if not self.ship.inHyperSpace:
+            for rock in self.rockGrid.query(self.ship.boundingRect):
+                # Small storm rocks are no bigger than the ship, the
+                # bounding boxes touching is close enough
+                boxIsEnough = self.storm and \
+                    rock.rockType == Rock.smallRockType
+                if rock.collidesWith(self.ship, boxIsEnough):
+                    shipHit = 'rock'
+                    hitRocks.add(rock)
 
-            if not self.ship.inHyperSpace and rock.collidesWith(self.ship):
-                p = rock.checkPolygonCollision(self.ship)
-                if p is not None:
-                    shipHit = True
-                    rockHit = True
-
-            if self.saucer is not None:
+        if self.saucer is not None:
+            for rock in self.rockGrid.query(self.saucer.boundingRect):
                 if rock.collidesWith(self.saucer):
                     saucerHit = True
-                    rockHit = True
+                    hitRocks.add(rock)
 
-                if self.saucer.bulletCollision(rock):
-                    rockHit = True
+            hitRocks.update(self.saucer.bulletCollisions(self.rockGrid))
 
-                if self.ship.bulletCollision(self.saucer):
-                    saucerHit = True
-                    self.score += self.saucer.scoreValue
-
-            if self.ship.bulletCollision(rock):
-                rockHit = True
-
-            if rockHit:
-                self.rockList.remove(rock)
-                self.stage.spriteList.remove(rock)
-
-                if rock.rockType == Rock.largeRockType:
-                    playSound("explode1")
-                    newRockType = Rock.mediumRockType
-                    self.score += 50
-                elif rock.rockType == Rock.mediumRockType:
-                    playSound("explode2")
-                    newRockType = Rock.smallRockType
-                    self.score += 100
-                else:
-                    playSound("explode3")
-                    self.score += 200
-
-                if rock.rockType != Rock.smallRockType:
-                    # new rocks
-                    for _ in range(0, 2):
-                        position = Vector2d(rock.position.x, rock.position.y)
-                        newRock = Rock(self.stage, position, newRockType)
-                        self.stage.addSprite(newRock)
-                        self.rockList.append(newRock)
-
-                self.createDebris(rock)
+            if self.ship.bulletCollision(self.saucer):
+                saucerHit = True
+                self.score += self.saucer.scoreValue
+
+        hitRocks.update(self.ship.bulletCollisions(self.rockGrid))
+
+        # Rocks, the list only changes when some were hit
+        if hitRocks:
+            self.rockList = self.breakRocks(hitRocks)
 
         # Saucer bullets
         if self.saucer is not None:
             if not self.ship.inHyperSpace:
                 if self.saucer.bulletCollision(self.ship):
-                    shipHit = True
+                    shipHit = 'saucer bullet'
 
                 if self.saucer.collidesWith(self.ship):
-                    shipHit = True
+                    shipHit = 'saucer'
                     saucerHit = True
 
             if saucerHit:
                 self.createDebris(self.saucer)
                 self.killSaucer()
 
-        if shipHit:
-            self.killShip()
+        if shipHit is not None:
+            self.killShip(shipHit)
 
             # comment in to pause on collision
             #self.paused = True
 
-    def killShip(self):
+    # Break up the rocks that were hit, returning the rocks left
+    def breakRocks(self, hitRocks):
+        newRocks = []
+        for rock in self.rockList:
+            if rock not in hitRocks:
+                newRocks.append(rock)
+                continue
+
+            self.stage.removeSprite(rock)
+
+            if rock.rockType == Rock.largeRockType:
+                playSound("explode1")
+                newRockType = Rock.mediumRockType
+                self.score += 50
+            elif rock.rockType == Rock.mediumRockType:
+                playSound("explode2")
+                newRockType = Rock.smallRockType
+                self.score += 100
+            else:
+                playSound("explode3")
+                self.score += 200
+
+            if rock.rockType != Rock.smallRockType:
+                # new rocks
+                for _ in range(0, 2):
+                    position = rock.position.copy()
+                    newRock = Rock(self.stage, position, newRockType,
+                                   self.rng, self.rockShapes)
+                    self.stage.addSprite(newRock)
+                    newRocks.append(newRock)
+
+            self.createDebris(rock)
+
+        return newRocks
+
+    # The rocks that could hit something this tick. In a storm the rocks
+    # too far from the ship, the saucer and every bullet are culled in one
+    # vectorized pass before the broad phase
+    def collidableRocks(self):
+        store = self.stage.store
+        if not self.storm or store is None:
+            return self.rockList
+
+        targets = [self.ship]
+        targets.extend(self.ship.bullets)
+        if self.saucer is not None:
+            targets.append(self.saucer)
+            targets.extend(self.saucer.bullets)
+
+        boxes = []
+        for target in targets:
+            rect = target.boundingRect
+            boxes.append((rect.centerx, rect.centery,
+                          rect.width / 2 + self.rockReach,
+                          rect.height / 2 + self.rockReach))
+
+        return [sprite for sprite in store.near(boxes)
+                if isinstance(sprite, Rock)]
+
+    # cause is what destroyed the ship, kept in deathCause
+    def killShip(self, cause=None):
+        self.deathCause = cause
         stopSound("thrust")
         playSound("explode2")
         self.explodingCount = 0
@@ -476,19 +706,96 @@ class Asteroids():
         self.stage.removeSprite(self.saucer)
         self.saucer = None
 
+    # The explosion goes into the stage's particles, or is made of Debris
+    # sprites when there aren't any
     def createDebris(self, sprite):
+        particles = self.stage.particles
+        if particles is not None:
+            particles.emit(sprite.position.x, sprite.position.y, 25,
+                           self.rng)
+            return
+
         for _ in range(0, 25):
-            position = Vector2d(sprite.position.x, sprite.position.y)
-            debris = Debris(position, self.stage)
+            debris = Debris.pool.acquire(sprite.position, self.stage,
+                                         self.rng)
             self.stage.addSprite(debris)
 
     def displayFps(self):
-        font2 = pygame.font.Font('../res/Hyperspace.otf', 15)
         fpsStr = str(self.fps)+(' FPS')
-        scoreText = font2.render(fpsStr, True, (255, 255, 255))
+        scoreText = self.textCache.render(15, fpsStr, (255, 255, 255))
         scoreTextRect = scoreText.get_rect(
             centerx=(self.stage.width/2), centery=15)
-        self.stage.screen.blit(scoreText, scoreTextRect)
+        self.stage.blit(scoreText, scoreTextRect)
+
+    # Frame time percentiles, the time taken by each stage of the frame and
+    # the number of each kind of sprite, over a graph of the time between
+    # frames (white) and the time spent working (green)
+    def displayProfiler(self):
+        self.profilerAge -= 1
+        if self.profilerAge <= 0:
+            self.profilerRows = self.profilerText()
+            self.profilerAge = self.profilerRefresh
+
+        left, y = 10, 80
+        for row in self.profilerRows:
+            x = left
+            for cell in row:
+                text = self.textCache.render(15, cell, (255, 255, 255))
+                rect = self.stage.blit(text, (x, y))
+                x += 100
+            y += rect.height + 2
+
+        self.displayFrameGraph(left, y + 10)
+
+    # The profiler's figures as rows of text
+    def profilerText(self):
+        stats = self.profiler.stats()
+        rows = [('frame ms', 'p95 %.1f' % stats['p95'],
+                 'p99 %.1f' % stats['p99'], 'max %.1f' % stats['max'])]
+        for name, times in stats['stages'].items():
+            rows.append((name, '%.2f' % times['mean'],
+                         'max %.2f' % times['max']))
+
+        # Collision pairs a frame since the last refresh, and how many of
+        # them each tier of the narrow phase ruled out
+        narrow = narrowPhase.stats()
+        perFrame = dict((name, (narrow[name] - self.narrowCounts[name]) /
+                         float(self.profilerRefresh)) for name in narrow)
+        self.narrowCounts = narrow
+        rows.append(('pairs %.1f' % perFrame['pairs'],) +
+                    tuple('%s %.1f' % (name, perFrame[name])
+                          for name in narrowPhase.tiers +
+                          ('hits', 'boxHits')))
+
+        counts = Counter(type(sprite).__name__
+                         for sprite in self.stage.spriteList
+                         if sprite is not None)
+        if self.stage.particles:
+            counts['Particle'] = len(self.stage.particles)
+        rows.append(('  '.join('%s %d' % (name, count)
+                               for name, count in sorted(counts.items())),))
+        return rows
+
+    def displayFrameGraph(self, left, top):
+        height = 100
+        width = self.profiler.history.maxlen
+        budget = 1000.0 / self.maxFps
+        scale = height / (budget * 3)
+        bottom = top + height
+        budgetY = bottom - budget * scale
+        self.stage.drawLines((90, 90, 90), False,
+                             [(left, budgetY), (left + width, budgetY)])
+        self.stage.drawLines((90, 90, 90), False,
+                             [(left, bottom), (left + width, bottom)])
+
+        for times, color in ((self.profiler.frameTimes(), (255, 255, 255)),
+                             (self.profiler.workTimes(), (0, 200, 0))):
+            if len(times) < 2:
+                continue
+
+            points = [(left + i, bottom - min(ms * scale, height))
+                      for i, ms in enumerate(times)]
+            self.stage.drawLines(color, False, points)
 
     def checkExtraLife(self):
         if self.score > 0 and self.score > self.nextLife:
@@ -498,13 +805,75 @@ class Asteroids():
 
 
 # Script to run the game
-if not pygame.font:
-    print('Warning, fonts disabled')
-if not pygame.mixer:
-    print('Warning, sound disabled')
-
-initSoundManager()
-game = Asteroids()  # create object game from class Asteroids
-game.playGame()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Atari Asteroids')
+    parser.add_argument('--headless', action='store_true',
+                        help='run the simulation without a display or sound')
+    parser.add_argument('--frames', type=int, default=None,
+                        help='stop after this many ticks')
+    parser.add_argument('--entity-store', action='store_true',
+                        help='move all sprites in one vectorized step '
+                        '(needs numpy)')
+    parser.add_argument('--batch-transform', action='store_true',
+                        help='transform all sprite outlines in one '
+                        'vectorized pass (needs numpy)')
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help='only redraw the parts of the screen that '
+                        'change each frame')
+    parser.add_argument('--sprite-atlas', action='store_true',
+                        help='draw each sprite outline once and blit it '
+                        'from then on')
+    parser.add_argument('--tick-rate', type=int, default=60,
+                        help='game ticks a second, the game is tuned for 60')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='seed for the random numbers, the same seed and '
+                        'input always play the same game')
+    parser.add_argument('--record', metavar='FILE',
+                        help='save the seed and every tick of input to FILE')
+    parser.add_argument('--replay', metavar='FILE',
+                        help='play back a game saved with --record')
+    parser.add_argument('--storm', type=int, default=0, metavar='ROCKS',
+                        help='asteroid storm, every wave starts with this '
+                        'many rocks (needs numpy)')
+    args = parser.parse_args()
+
+    seed = args.seed
+    frames = args.frames
+    controls = None
+    if args.replay:
+        seed, ticks = loadRecording(args.replay)
+        controls = ReplayInput(ticks)
+        if frames is None:
+            frames = len(ticks)
+    elif not args.headless:
+        controls = KeyboardInput()
+
+    if args.record:
+        if controls is None:
+            parser.error('a headless game has no input to record, '
+                         'use --replay')
+        controls = InputRecorder(controls)
+
+    if not args.headless:
+        if not pygame.font:
+            print('Warning, fonts disabled')
+        if not pygame.mixer:
+            print('Warning, sound disabled')
+
+        initSoundManager()
+
+    # create object game from class Asteroids
+    game = Asteroids(args.headless, args.entity_store,
+                     args.batch_transform, args.dirty_rects,
+                     args.sprite_atlas, args.tick_rate, seed, controls,
+                     args.storm)
+    try:
+        game.playGame(frames)
+    finally:
+        if args.record:
+            saveRecording(args.record, game.seed, controls.ticks)
+
+    if args.headless:
+        print('Seed %d, score %d' % (game.seed, game.score))
 
 ####
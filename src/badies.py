@@ -33,15 +33,29 @@ class Rock(VectorSprite):
     velocities = (1.5, 3.0, 4.5)    
     scales = (2.5, 1.5, 0.6)
 
-    # tracks the last rock shape to be generated
+    # The four rock outlines
+    outlines = (
+        [(-4,-12), (6,-12), (13, -4), (13, 5), (6, 13), (0,13), (0,4),
+         (-8,13), (-15, 4), (-7,1), (-15,-3)],
+        [(-6,-12), (1,-5), (8, -12), (15, -5), (12,0), (15,6), (5,13),
+         (-7,13), (-14,7), (-14,-5)],
+        [(-7,-12), (1,-9), (8,-12), (15,-5), (8,-3), (15,4), (8,12),
+         (-3,10), (-6,12), (-14,7), (-10,0), (-14,-5)],
+        [(-7,-11), (3,-11), (13,-5), (13,-2), (2,2), (13,8), (6,14),
+         (2,10), (-7,14), (-15,5), (-15,-5), (-5,-5), (-7,-11)],
+    )
+
+    # tracks the last rock shape to be generated, for rocks made outside
+    # a game
     rockShape = 1    
     
-    # Create the rock polygon to the given scale
-    def __init__(self, stage, position, rockType):
+    # Create the rock polygon to the given scale, rng is the game's random
+    # number generator and shapes its RockShapes
+    def __init__(self, stage, position, rockType, rng=random, shapes=None):
         
         scale = Rock.scales[rockType]
         velocity = Rock.velocities[rockType]                
-        heading = Vector2d(random.uniform(-velocity, velocity), random.uniform(-velocity, velocity))
+        heading = Vector2d(rng.uniform(-velocity, velocity), rng.uniform(-velocity, velocity))
         
         # Ensure that the rocks don't just sit there or move along regular lines
         if heading.x == 0:
@@ -51,52 +65,71 @@ class Rock(VectorSprite):
             heading.y = 0.1
                         
         self.rockType = rockType  
-        pointlist = self.createPointList()
-        newPointList = [self.scale(point, scale) for point in pointlist]        
-        VectorSprite.__init__(self, position, heading, newPointList)
+        shape = self.nextShape(scale, shapes)
+        VectorSprite.__init__(self, position, heading, shape.points)
+
+        # Rocks of the same shape and size share their points, and their
+        # rotations in the cache
+        self.useShape(shape)
+
+        # Spin the rock when it moves. Original Asteroid didn't have spinning
+        # rocks but they look nicer
+        self.vAngle = 1
                 
     
-    # Create different rock type pointlists    
-    def createPointList(self):
-        
-        if (Rock.rockShape == 1):
-            pointlist = [(-4,-12), (6,-12), (13, -4), (13, 5), (6, 13), (0,13), (0,4),\
-                     (-8,13), (-15, 4), (-7,1), (-15,-3)]
- 
-        elif (Rock.rockShape == 2):
-            pointlist = [(-6,-12), (1,-5), (8, -12), (15, -5), (12,0), (15,6), (5,13),\
-                         (-7,13), (-14,7), (-14,-5)]
-            
-        elif (Rock.rockShape == 3):
-            pointlist = [(-7,-12), (1,-9), (8,-12), (15,-5), (8,-3), (15,4), (8,12),\
-                         (-3,10), (-6,12), (-14,7), (-10,0), (-14,-5)]            
+    # The next of the rock shapes at the given scale, from the shared
+    # registry. Each game takes its turns from its own RockShapes
+    def nextShape(self, scale, shapes=None):
+        if shapes is not None:
+            return shapeRegistry.get(('rock', shapes.take()), scale)
 
-        elif (Rock.rockShape == 4):
-            pointlist = [(-7,-11), (3,-11), (13,-5), (13,-2), (2,2), (13,8), (6,14),\
-                         (2,10), (-7,14), (-15,5), (-15,-5), (-5,-5), (-7,-11)]
+        shape = shapeRegistry.get(('rock', Rock.rockShape), scale)
 
         Rock.rockShape += 1
         if (Rock.rockShape == 5):
             Rock.rockShape = 1
 
-        return pointlist
-    
-    # Spin the rock when it moves
-    def move(self):
-        VectorSprite.move(self)                        
-        
-        # Original Asteroid didn't have spinning rocks but they look nicer
-        self.angle += 1
+        return shape
     
     
 #    def destroyed(self):
         
 
+# Hands out the rock shapes in turn, 1 to 4 and round again. Each game has
+# its own, so games sharing a process don't change each other's rocks
+class RockShapes:
+
+    def __init__(self, first=1):
+        self.next = first
+
+    def take(self):
+        shape = self.next
+        self.next = shape % len(Rock.outlines) + 1
+        return shape
+
+
+# Registered as ('rock', 1) to ('rock', 4)
+for shape, outline in enumerate(Rock.outlines, 1):
+    shapeRegistry.register(('rock', shape), outline)
+
+# Furthest any rock's outline reaches from its position, at any angle
+Rock.reach = max(shapeRegistry.get(('rock', shape), scale).radius
+                 for shape in range(1, 5) for scale in Rock.scales)
+
+
 class Debris(Point):    
      
-    def __init__(self, position, stage):
-        heading = Vector2d(random.uniform(-1.5, 1.5), random.uniform(-1.5, 1.5))
-        Point.__init__(self, position, heading, stage)
+    # Takes a copy of the position, reused debris copies it in reset
+    def __init__(self, position, stage, rng=random):
+        heading = Vector2d(rng.uniform(-1.5, 1.5), rng.uniform(-1.5, 1.5))
+        Point.__init__(self, position.copy(), heading, stage)
+        self.ttl = 50
+
+    # Same random heading as a new piece of debris
+    def reset(self, position, stage, rng=random):
+        self.heading.x = rng.uniform(-1.5, 1.5)
+        self.heading.y = rng.uniform(-1.5, 1.5)
+        Point.reset(self, position, self.heading, stage)
         self.ttl = 50
     
     def move(self):    
@@ -106,6 +139,10 @@ class Debris(Point):
         g -= 5
         b -= 5
         self.color = (r,g,b)
+
+
+# Every rock destroyed makes 25 pieces of debris
+Debris.pool = ObjectPool(Debris, maxSize=1024)
         
 
 # Flying saucer, shoots at player
@@ -118,13 +155,13 @@ class Saucer(Shooter):
     velocities = (1.5, 2.5)    
     scales = (1.5, 1.0)
     scores = (500, 1000)
-    pointlist = [(-9,0), (-3,-3), (-2,-6), (-2,-6), (2,-6), (3,-3), (9,0), (-9,0), (-3,4), (3,4), (9,0)]
+    outline = [(-9,0), (-3,-3), (-2,-6), (-2,-6), (2,-6), (3,-3), (9,0), (-9,0), (-3,4), (3,4), (9,0)]
     maxBullets = 1
     bulletTtl = [60, 90]
     bulletVelocity = 5  
     
-    def __init__(self, stage, saucerType, ship):                
-        position = Vector2d(0.0, random.randrange(0, stage.height))
+    def __init__(self, stage, saucerType, ship, rng=random):
+        position = Vector2d(0.0, rng.randrange(0, stage.height))
         heading = Vector2d(self.velocities[saucerType], 0.0)
         self.saucerType = saucerType
         self.ship = ship
@@ -138,9 +175,10 @@ class Saucer(Shooter):
         self.laps = 0
         self.lastx = 0
         
-        # Scale the shape and create the VectorSprite
-        newPointList = [self.scale(point, self.scales[saucerType]) for point in self.pointlist]
-        Shooter.__init__(self, position, heading, newPointList, stage)
+        # Every saucer of the same size shares its scaled shape
+        shape = shapeRegistry.get('saucer', self.scales[saucerType])
+        Shooter.__init__(self, position, heading, shape.points, stage)
+        self.useShape(shape)
         
     def move(self):        
         Shooter.move(self)  
@@ -162,13 +200,13 @@ class Saucer(Shooter):
     # Set the bullet velocity and create the bullet
     def fireBullet(self):
         if self.ship is not None:            
-            dx = self.ship.position.x - self.position.x
-            dy = self.ship.position.y - self.position.y
-            mag = math.sqrt(dx*dx + dy*dy);
-            heading = Vector2d(self.bulletVelocity * (dx/mag), self.bulletVelocity * (dy/mag))
-            position = Vector2d(self.position.x, self.position.y)          
+            direction = (self.ship.position - self.position).normalized()
+            heading = direction * self.bulletVelocity
             shotFired = Shooter.fireBullet(self, heading, self.bulletTtl[self.saucerType], self.bulletVelocity)
             if shotFired:
                 playSound("sfire")
+
+
+shapeRegistry.register('saucer', Saucer.outline)
             
 # end    
\ No newline at end of file
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# Play lots of headless games at once, for trying out bots and tuning the
+# game. Each game gets its own seed and a controller that plays it in place
+# of the keyboard, the games are shared out over a pool of processes and
+# the result of each one is written out as soon as it finishes, one line of
+# CSV or JSON per game.
+#
+# A controller is made for each game with controller(game, rng), rng being
+# a random number generator of its own so the controller doesn't change the
+# game's random numbers. Like the keyboard it is asked for the keys once a
+# tick, see util/controls.py.
+
+import os
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import sys
+import csv
+import json
+import time
+import random
+import argparse
+import importlib
+import multiprocessing
+from util.controls import *
+from asteroids import Asteroids
+
+
+# Never touches the keys
+class IdleController:
+
+    def __init__(self, game, rng):
+        pass
+
+    def keyDown(self, key):
+        pass
+
+    def read(self):
+        return 0
+
+
+# Holds down a random set of keys for a random number of ticks
+class RandomController:
+
+    keys = (ROTATE_LEFT, ROTATE_RIGHT, THRUST, FIRE, HYPERSPACE)
+
+    def __init__(self, game, rng):
+        self.rng = rng
+        self.held = 0
+        self.ticksLeft = 0
+
+    def keyDown(self, key):
+        pass
+
+    def read(self):
+        if self.ticksLeft <= 0:
+            self.held = 0
+            for key in self.keys:
+                if self.rng.random() < 0.3:
+                    self.held |= key
+            self.ticksLeft = self.rng.randrange(5, 30)
+
+        self.ticksLeft -= 1
+        return self.held
+
+
+# Turns on the spot, firing as fast as it can
+class SpinnerController:
+
+    def __init__(self, game, rng):
+        self.tickCount = 0
+
+    def keyDown(self, key):
+        pass
+
+    def read(self):
+        self.tickCount += 1
+        keys = ROTATE_LEFT
+        if self.tickCount % 8 == 0:
+            keys |= FIRE
+        return keys
+
+
+controllers = {
+    'idle': IdleController,
+    'random': RandomController,
+    'spinner': SpinnerController,
+}
+
+resultFields = ('seed', 'controller', 'score', 'level', 'frames', 'cause')
+
+
+# A controller by name, or any class given as module:Class
+def findController(name):
+    if name in controllers:
+        return controllers[name]
+
+    moduleName, _, className = name.partition(':')
+    if not className:
+        raise ValueError('Unknown controller %s' % name)
+
+    return getattr(importlib.import_module(moduleName), className)
+
+
+# Play one game until the last ship is destroyed or maxTicks have passed.
+# frames is the number of ticks survived, cause is what destroyed the last
+# ship or 'alive' when the time ran out
+def runGame(seed, controllerName, maxTicks):
+    game = Asteroids(headless=True, seed=seed)
+    controller = findController(controllerName)
+    game.controls = controller(game, random.Random('controller %d' % seed))
+    game.initialiseGame()
+
+    frames = 0
+    while frames < maxTicks and game.lives > 0:
+        game.tick()
+        frames += 1
+
+    cause = game.deathCause if game.lives == 0 else 'alive'
+    return {'seed': seed, 'controller': controllerName, 'score': game.score,
+            'level': game.level, 'frames': frames, 'cause': cause}
+
+
+def runGameTask(task):
+    return runGame(*task)
+
+
+# Play games for each of the seeds on a pool of processes, yielding the
+# results as the games finish (not in seed order)
+def runGames(seeds, controllerName, maxTicks, workers=None):
+    tasks = [(seed, controllerName, maxTicks) for seed in seeds]
+    if workers == 1:
+        for task in tasks:
+            yield runGameTask(task)
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(runGameTask, tasks):
+            yield result
+
+
+class CsvWriter:
+
+    def __init__(self, f):
+        self.writer = csv.DictWriter(f, fieldnames=resultFields)
+        self.writer.writeheader()
+        self.f = f
+
+    def write(self, result):
+        self.writer.writerow(result)
+        self.f.flush()
+
+
+class JsonLinesWriter:
+
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, result):
+        self.f.write(json.dumps(result) + '\n')
+        self.f.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Play headless games of Asteroids on all cores')
+    parser.add_argument('--games', type=int, default=100,
+                        help='number of games to play')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the first game, the rest count up')
+    parser.add_argument('--controller', default='random',
+                        help='who plays: %s, or module:Class' %
+                        ', '.join(controllers))
+    parser.add_argument('--max-ticks', type=int, default=60 * 60 * 10,
+                        help='stop a game after this many ticks')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='processes to use, one a core by default')
+    parser.add_argument('--output', metavar='FILE',
+                        help='write the results here instead of stdout')
+    parser.add_argument('--format', choices=('csv', 'jsonl'), default=None,
+                        help='taken from the output file name by default, '
+                        'jsonl on stdout')
+    args = parser.parse_args()
+
+    try:
+        findController(args.controller)
+    except (ValueError, ImportError, AttributeError) as e:
+        parser.error(str(e))
+
+    resultFormat = args.format
+    if resultFormat is None:
+        resultFormat = 'csv' if (args.output or '').endswith('.csv') \
+            else 'jsonl'
+
+    f = open(args.output, 'w', newline='') if args.output else sys.stdout
+    writer = CsvWriter(f) if resultFormat == 'csv' else JsonLinesWriter(f)
+
+    seeds = range(args.seed, args.seed + args.games)
+    start = time.perf_counter()
+    scores = []
+    frames = 0
+    try:
+        for result in runGames(seeds, args.controller, args.max_ticks,
+                                args.workers):
+            writer.write(result)
+            scores.append(result['score'])
+            frames += result['frames']
+    finally:
+        if f is not sys.stdout:
+            f.close()
+
+    seconds = time.perf_counter() - start
+    if scores:
+        print('%d games in %.1fs (%.1f games/s, %d ticks/s), mean score %.0f,'
+              ' best %d' % (len(scores), seconds, len(scores) / seconds,
+                            frames / seconds, sum(scores) / len(scores),
+                            max(scores)), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# Reinforcement learning style access to the game. AsteroidsEnv wraps one
+# headless game with reset() and step(action), each step runs frameSkip
+# ticks with the action's keys held and returns the observation, the score
+# gained as the reward, whether the game is over and an info dict.
+# VectorAsteroidsEnv steps several games in lockstep and returns the same
+# things as arrays, one row for each game.
+#
+# Actions are indexes into AsteroidsEnv.actions, which are the control
+# masks from util/controls.py. Observations are float32 vectors of
+# observationSize values, all roughly between -1 and 1:
+#
+#   ship       x, y, heading x, y, sin and cos of the angle, in hyperspace,
+#              lives left
+#   saucer     there, offset x, y, heading x, y
+#   bullet     the saucer's bullet: there, offset x, y
+#   rocks      the nearest maxRocks rocks, nearest first: there, offset x,
+#              y, heading x, y, size
+#   rays       with numRays, how far each RaySensor ray got as a fraction
+#              of its length (1 when it hit nothing)
+#
+# Offsets are from the ship to the object the shortest way round the
+# screen. Needs numpy.
+
+import random
+from util.controls import *
+from asteroids import Asteroids
+from badies import Rock
+from ship import Ship
+from util.raysensor import RaySensor
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+environmentAvailable = numpy is not None
+
+
+class AsteroidsEnv:
+
+    actions = (0, ROTATE_LEFT, ROTATE_RIGHT, THRUST, FIRE, HYPERSPACE)
+    actionNames = ('nothing', 'rotateLeft', 'rotateRight', 'increaseThrust',
+                   'fireBullet', 'enterHyperSpace')
+
+    maxRocks = 8
+    shipValues = 8
+    saucerValues = 5
+    bulletValues = 3
+    rockValues = 6
+    observationSize = (shipValues + saucerValues + bulletValues +
+                       maxRocks * rockValues)
+
+    # seed makes the seeds of the games played, maxTicks ends a game that
+    # is still going (info['truncated'] is set)
+    def __init__(self, seed=None, frameSkip=1, maxTicks=None, numRays=0,
+                 **gameOptions):
+        if not environmentAvailable:
+            raise RuntimeError('AsteroidsEnv needs numpy')
+
+        self.seeds = random.Random(seed)
+        self.frameSkip = frameSkip
+        self.maxTicks = maxTicks
+        self.numRays = numRays
+        self.sensor = None
+        self.observationSize = AsteroidsEnv.observationSize + numRays
+        self.gameOptions = gameOptions
+        self.game = None
+        self.keys = 0
+        self.ticks = 0
+
+    # Controls interface, the game reads the held action every tick
+    def keyDown(self, key):
+        pass
+
+    def read(self):
+        return self.keys
+
+    # Start a new game and return its first observation
+    def reset(self, seed=None):
+        if seed is None:
+            seed = self.seeds.randrange(2**32)
+
+        self.game = Asteroids(headless=True, seed=seed, controls=self,
+                              **self.gameOptions)
+        self.game.initialiseGame()
+        if self.numRays and self.sensor is None:
+            stage = self.game.stage
+            self.sensor = RaySensor(stage.width, stage.height, self.numRays)
+
+        self.keys = 0
+        self.ticks = 0
+        return self.observe()
+
+    # Returns (observation, reward, done, info)
+    def step(self, action):
+        game = self.game
+        self.keys = self.actions[action]
+        score = game.score
+        for _ in range(self.frameSkip):
+            game.tick()
+            self.ticks += 1
+            if game.lives == 0:
+                break
+
+        gameOver = game.lives == 0
+        truncated = (not gameOver and self.maxTicks is not None and
+                     self.ticks >= self.maxTicks)
+        info = {'score': game.score, 'level': game.level,
+                'lives': game.lives, 'ticks': self.ticks,
+                'truncated': truncated}
+        return (self.observe(), float(game.score - score),
+                gameOver or truncated, info)
+
+    def observe(self):
+        game = self.game
+        stage = game.stage
+        ship = game.ship
+        width = stage.width
+        height = stage.height
+        observation = numpy.zeros(self.observationSize, dtype=numpy.float32)
+        shipX = ship.position.x
+        shipY = ship.position.y
+
+        radians = numpy.radians(ship.angle)
+        observation[0:self.shipValues] = (
+            shipX / width, shipY / height,
+            ship.heading.x / Ship.maxVelocity,
+            ship.heading.y / Ship.maxVelocity,
+            numpy.sin(radians), numpy.cos(radians),
+            ship.inHyperSpace, game.lives / 3.0)
+
+        # The shortest way round the screen from the ship
+        def offset(position):
+            dx = (position.x - shipX + width / 2) % width - width / 2
+            dy = (position.y - shipY + height / 2) % height - height / 2
+            return dx, dy
+
+        start = self.shipValues
+        saucer = game.saucer
+        if saucer is not None:
+            dx, dy = offset(saucer.position)
+            observation[start:start + self.saucerValues] = (
+                1.0, 2 * dx / width, 2 * dy / height,
+                saucer.heading.x / 5.0, saucer.heading.y / 5.0)
+
+            start += self.saucerValues
+            bullets = [bullet for bullet in saucer.bullets if bullet.ttl > 0]
+            if bullets:
+                dx, dy = offset(bullets[0].position)
+                observation[start:start + self.bulletValues] = (
+                    1.0, 2 * dx / width, 2 * dy / height)
+
+        start = self.shipValues + self.saucerValues + self.bulletValues
+        rocks = game.rockList
+        if rocks:
+            count = len(rocks)
+            xs = numpy.fromiter((rock.position.x for rock in rocks),
+                                dtype=numpy.float64, count=count)
+            ys = numpy.fromiter((rock.position.y for rock in rocks),
+                                dtype=numpy.float64, count=count)
+            dxs = (xs - shipX + width / 2) % width - width / 2
+            dys = (ys - shipY + height / 2) % height - height / 2
+            nearest = numpy.argsort(dxs * dxs + dys * dys,
+                                    kind='stable')[:self.maxRocks]
+
+            rockValues = self.rockValues
+            fastest = Rock.velocities[-1]
+            for i, index in enumerate(nearest.tolist()):
+                rock = rocks[index]
+                offsetStart = start + i * rockValues
+                observation[offsetStart:offsetStart + rockValues] = (
+                    1.0, 2 * dxs[index] / width, 2 * dys[index] / height,
+                    rock.heading.x / fastest, rock.heading.y / fastest,
+                    Rock.scales[rock.rockType] / Rock.scales[0])
+
+        if self.sensor is not None:
+            distances, _ = self.sensor.sense(game)
+            start = AsteroidsEnv.observationSize
+            observation[start:] = distances / self.sensor.maxDistance
+
+        return observation
+
+
+# Steps numEnvs games together. A game that ends is started again straight
+# away, its last observation is in its info as 'terminalObservation'
+class VectorAsteroidsEnv:
+
+    def __init__(self, numEnvs, seed=None, frameSkip=1, maxTicks=None,
+                 **gameOptions):
+        seeds = random.Random(seed)
+        self.envs = [AsteroidsEnv(seeds.randrange(2**32), frameSkip,
+                                  maxTicks, **gameOptions)
+                     for _ in range(numEnvs)]
+        self.numEnvs = numEnvs
+        self.observationSize = self.envs[0].observationSize
+
+    # The first observation of every game, one row each
+    def reset(self):
+        observations = numpy.empty((self.numEnvs, self.observationSize),
+                                   dtype=numpy.float32)
+        for i, env in enumerate(self.envs):
+            observations[i] = env.reset()
+
+        return observations
+
+    # actions has one action for each game. Returns (observations, rewards,
+    # dones, infos)
+    def step(self, actions):
+        observations = numpy.empty((self.numEnvs, self.observationSize),
+                                   dtype=numpy.float32)
+        rewards = numpy.zeros(self.numEnvs, dtype=numpy.float32)
+        dones = numpy.zeros(self.numEnvs, dtype=bool)
+        infos = []
+        for i, env in enumerate(self.envs):
+            observation, reward, done, info = env.step(int(actions[i]))
+            if done:
+                info['terminalObservation'] = observation
+                observation = env.reset()
+
+            observations[i] = observation
+            rewards[i] = reward
+            dones[i] = done
+            infos.append(info)
+
+        return observations, rewards, dones, infos
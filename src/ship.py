@@ -33,8 +33,12 @@ class Ship(Shooter):
     bulletVelocity = 13.0
     maxBullets = 4
     bulletTtl = 35
+    outline = [(0, -10), (6, 10), (3, 7), (-3, 7), (-6, 10)]
 
-    def __init__(self, stage):
+    # rng is the game's random number generator, used for hyperspace and
+    # the debris when the ship explodes. With a DangerGrid the ship comes
+    # out of hyperspace somewhere safe
+    def __init__(self, stage, rng=random, dangerGrid=None):
 
         position = Vector2d(stage.width/2, stage.height/2)
         heading = Vector2d(0, 0)
@@ -42,24 +46,16 @@ class Ship(Shooter):
         self.shipDebrisList = []
         self.visible = True
         self.inHyperSpace = False
-        pointlist = [(0, -10), (6, 10), (3, 7), (-3, 7), (-6, 10)]
+        self.rng = rng
+        self.dangerGrid = dangerGrid
+        shape = shapeRegistry.get('ship')
 
-        Shooter.__init__(self, position, heading, pointlist, stage)
+        Shooter.__init__(self, position, heading, shape.points, stage)
+        self.useShape(shape)
 
     def draw(self):
-        if self.visible:
-            if not self.inHyperSpace:
-                VectorSprite.draw(self)
-            else:
-                self.hyperSpaceTtl -= 1
-                if self.hyperSpaceTtl == 0:
-                    self.inHyperSpace = False
-                    self.color = (255, 255, 255)
-                    self.thrustJet.color = (255, 255, 255)
-                    self.position.x = random.randrange(0, self.stage.width)
-                    self.position.y = random.randrange(0, self.stage.height)
-                    position = Vector2d(self.position.x, self.position.y)
-                    self.thrustJet.position = position
+        if self.visible and not self.inHyperSpace:
+            VectorSprite.draw(self)
 
         return self.transformedPointlist
 
@@ -73,31 +69,31 @@ class Ship(Shooter):
 
     def increaseThrust(self):
         playSoundContinuous("thrust")
-        if math.hypot(self.heading.x, self.heading.y) > self.maxVelocity:
+        if self.heading.length() > self.maxVelocity:
             return
 
         dx = self.acceleration * math.sin(radians(self.angle)) * -1
         dy = self.acceleration * math.cos(radians(self.angle)) * -1
-        self.changeVelocity(dx, dy)
+        self.changeVelocity(Vector2d(dx, dy))
 
     def decreaseThrust(self):
         stopSound("thrust")
         if (self.heading.x == 0 and self.heading.y == 0):
             return
 
-        dx = self.heading.x * self.decelaration
-        dy = self.heading.y * self.decelaration
-        self.changeVelocity(dx, dy)
+        self.changeVelocity(self.heading * self.decelaration)
 
-    def changeVelocity(self, dx, dy):
-        self.heading.x += dx
-        self.heading.y += dy
-        self.thrustJet.heading.x += dx
-        self.thrustJet.heading.y += dy
+    def changeVelocity(self, delta):
+        self.heading += delta
+        self.thrustJet.heading += delta
 
     def move(self):
         VectorSprite.move(self)
         self.decreaseThrust()
+        if self.inHyperSpace:
+            self.hyperSpaceTtl -= 1
+            if self.hyperSpaceTtl == 0:
+                self.leaveHyperSpace()
 
     # Break the shape of the ship down into several lines
     # Ship shape - [(0, -10), (6, 10), (3, 7), (-3, 7), (-6, 10)]
@@ -117,7 +113,7 @@ class Ship(Shooter):
 
     def addShipDebris(self, pointlist):
         heading = Vector2d(0, 0)
-        position = Vector2d(self.position.x, self.position.y)
+        position = self.position.copy()
         debris = VectorSprite(position, heading, pointlist, self.angle)
 
         # Add debris to the stage
@@ -129,9 +125,9 @@ class Ship(Shooter):
 
         # Alter the random values below to change the rate of expansion
         debris.heading.x = ((centerX - self.position.x) +
-                            0.1) / random.uniform(20, 40)
+                            0.1) / self.rng.uniform(20, 40)
         debris.heading.y = ((centerY - self.position.y) +
-                            0.1) / random.uniform(20, 40)
+                            0.1) / self.rng.uniform(20, 40)
         self.shipDebrisList.append(debris)
 
     # Set the bullet velocity and create the bullet
@@ -153,17 +149,35 @@ class Ship(Shooter):
             self.color = (0, 0, 0)
             self.thrustJet.color = (0, 0, 0)
 
+    # Reappear somewhere random, out of the way of the rocks if possible
+    def leaveHyperSpace(self):
+        self.inHyperSpace = False
+        self.color = (255, 255, 255)
+        self.thrustJet.color = (255, 255, 255)
+        if self.dangerGrid is not None:
+            x, y = self.dangerGrid.randomSafePoint(self.rng)
+        else:
+            x = self.rng.randrange(0, self.stage.width)
+            y = self.rng.randrange(0, self.stage.height)
+        self.moveTo(x, y)
+
+    def moveTo(self, x, y):
+        self.position.set(x, y)
+        self.thrustJet.position = self.position.copy()
+
 
 # Exhaust jet when ship is accelerating
 class ThrustJet(VectorSprite):
-    pointlist = [(-3, 7), (0, 13), (3, 7)]
+    outline = [(-3, 7), (0, 13), (3, 7)]
 
     def __init__(self, stage, ship):
         position = Vector2d(stage.width/2, stage.height/2)
         heading = Vector2d(0, 0)
         self.accelerating = False
         self.ship = ship
-        VectorSprite.__init__(self, position, heading, self.pointlist)
+        shape = shapeRegistry.get('thrustJet')
+        VectorSprite.__init__(self, position, heading, shape.points)
+        self.useShape(shape)
 
     def draw(self):
         if self.accelerating and self.ship.inHyperSpace == False:
@@ -173,3 +187,7 @@ class ThrustJet(VectorSprite):
 
         VectorSprite.draw(self)
         return self.transformedPointlist
+
+
+shapeRegistry.register('ship', Ship.outline)
+shapeRegistry.register('thrustJet', ThrustJet.outline)
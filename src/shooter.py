@@ -30,9 +30,8 @@ class Shooter(VectorSprite):
 
     def fireBullet(self, heading, ttl, velocity):
         if (len(self.bullets) < self.maxBullets):
-            position = Vector2d(self.position.x, self.position.y)
-            newBullet = Bullet(position, heading, self,
-                               ttl, velocity, self.stage)
+            newBullet = Bullet.pool.acquire(self.position, heading, self,
+                                            ttl, velocity, self.stage)
             self.bullets.append(newBullet)
             self.stage.addSprite(newBullet)
             return True
@@ -46,13 +45,34 @@ class Shooter(VectorSprite):
 
         return collisionDetected
 
+    # Check the bullets against the objects filed in a SpatialHash, each
+    # bullet stops at the first thing it hits. Returns the objects hit
+    def bulletCollisions(self, grid):
+        hits = []
+        for bullet in self.bullets:
+            if bullet.ttl > 0:
+                for target in grid.query(bullet.boundingRect):
+                    if target.collidesWith(bullet):
+                        bullet.ttl = 0
+                        hits.append(target)
+                        break
+
+        return hits
+
 # Bullet class
 
 
 class Bullet(Point):
 
+    # Takes a copy of the position, a reused bullet copies it in reset
     def __init__(self, position, heading, shooter, ttl, velocity, stage):
-        Point.__init__(self, position, heading, stage)
+        Point.__init__(self, position.copy(), heading, stage)
+        self.shooter = shooter
+        self.ttl = ttl
+        self.velocity = velocity
+
+    def reset(self, position, heading, shooter, ttl, velocity, stage):
+        Point.reset(self, position, heading, stage)
         self.shooter = shooter
         self.ttl = ttl
         self.velocity = velocity
@@ -61,3 +81,8 @@ class Bullet(Point):
         Point.move(self)
         if (self.ttl <= 0):
             self.shooter.bullets.remove(self)
+
+
+# The ship has 4 bullets and the saucer 1, some are still in flight after
+# a shooter has gone
+Bullet.pool = ObjectPool(Bullet, maxSize=64)
@@ -38,13 +38,20 @@ def initSoundManager():
     sounds["extralife"] = pygame.mixer.Sound("../res/LIFE.WAV")
 
 
+# The sound functions do nothing until initSoundManager has loaded the
+# sounds, headless games never load them
+
+
 def playSound(soundName):
-    channel = sounds[soundName].play()
+    if soundName in sounds:
+        channel = sounds[soundName].play()
 
 
 def playSoundContinuous(soundName):
-    channel = sounds[soundName].play(-1)
+    if soundName in sounds:
+        channel = sounds[soundName].play(-1)
 
 
 def stopSound(soundName):
-    channel = sounds[soundName].stop()
+    if soundName in sounds:
+        channel = sounds[soundName].stop()
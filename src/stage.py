@@ -20,49 +20,305 @@ import pygame
 import sys
 import os
 from pygame.locals import *
+from util.vectorsprites import VectorSprite
+from util.entitystore import *
+from util.batchtransform import *
+from util.spriteatlas import *
+from util.particles import *
 
 
 class Stage:
 
-    # Set up the PyGame surface
-    def __init__(self, caption, dimensions=None):
-        pygame.init()
+    # Set up the PyGame surface. A headless stage never touches the display,
+    # there is no surface and sprites are never rasterized, so the simulation
+    # can run on machines without a screen. Given a surface the stage draws
+    # onto it instead of opening a display, for drawing off screen.
+    # With entityStore the sprites' movement is kept in an EntityStore and
+    # they are all moved in one vectorized step, with batchTransform the
+    # points of all sprites are rotated and translated together each frame.
+    # With dirtyRects only the parts of the screen drawn on are cleared and
+    # sent to the display each frame, with spriteAtlas sprites are drawn
+    # once and blitted from a SpriteAtlas after that. Explosions are thrown
+    # into a ParticleSystem, unless particles is False or there's no numpy
+    def __init__(self, caption, dimensions=None, headless=False,
+                 entityStore=False, batchTransform=False, dirtyRects=False,
+                 spriteAtlas=False, particles=True, surface=None):
+        self.headless = headless
 
-        # If no screen size is provided pick the first available mode
-        if dimensions == None:
-            dimensions = pygame.display.list_modes()[0]
+        if headless:
+            # No display to ask for a mode so fall back to the arcade size
+            if dimensions == None:
+                dimensions = (1024, 768)
 
-        pygame.display.set_mode(dimensions, FULLSCREEN)
-        pygame.mouse.set_visible(False)
+            self.screen = None
+        elif surface is not None:
+            if dimensions == None:
+                dimensions = surface.get_size()
 
-        # pygame.display.set_mode(dimensions)
+            self.screen = surface
+        else:
+            pygame.init()
 
-        pygame.display.set_caption(caption)
-        self.screen = pygame.display.get_surface()
+            # If no screen size is provided pick the first available mode
+            if dimensions == None:
+                dimensions = pygame.display.list_modes()[0]
+
+            pygame.display.set_mode(dimensions, FULLSCREEN)
+            pygame.mouse.set_visible(False)
+
+            # pygame.display.set_mode(dimensions)
+
+            pygame.display.set_caption(caption)
+            self.screen = pygame.display.get_surface()
+
+        # Each sprite's stageSlot is its index in spriteList. Removing a
+        # sprite only frees its slot, the list is compacted in one go when
+        # the frame's moving is done (or before drawing)
         self.spriteList = []
+        self.freeSlots = 0
         self.width = dimensions[0]
         self.height = dimensions[1]
         self.showBoundingBoxes = False
+        self.backgroundColor = (10, 10, 10)
+
+        # Areas drawn on this frame and cleared at the start of it. When
+        # they add up to more than dirtyThreshold of the screen the whole
+        # display is flipped instead
+        self.dirtyRects = dirtyRects and not headless
+        self.dirtyThreshold = 0.4
+        self.drawnRects = []
+        self.erasedRects = []
+        self.fullRedraw = True
+
+        self.atlas = None
+        if spriteAtlas and not headless:
+            self.atlas = SpriteAtlas(self.backgroundColor)
 
-    # Add sprite to list then draw it as a easy way to get the bounding rect
+        self.store = None
+        if entityStore:
+            if entityStoreAvailable:
+                self.store = EntityStore()
+            else:
+                print('Warning, numpy not found, entity store disabled')
+
+        self.batch = None
+        if batchTransform:
+            if batchTransformAvailable:
+                self.batch = BatchTransform()
+            else:
+                print('Warning, numpy not found, batch transform disabled')
+
+        self.particles = None
+        if particles and particlesAvailable:
+            self.particles = ParticleSystem(self.width, self.height)
+
+        # Sprites in the store that do more each frame than move in a
+        # straight line, these still have their move method called. Slots
+        # are handed out and freed in the same way as spriteList
+        self.behaviourList = []
+
+    # Add sprite to list and work out its points and bounding rect, nothing
+    # is drawn
     def addSprite(self, sprite):
+        sprite.stageSlot = len(self.spriteList)
         self.spriteList.append(sprite)
-        sprite.boundingRect = pygame.draw.aalines(
-            self.screen, sprite.color, True, sprite.draw())
+        if self.store is not None:
+            self.store.add(sprite)
+            if type(sprite).move is not VectorSprite.move:
+                sprite.behaviourSlot = len(self.behaviourList)
+                self.behaviourList.append(sprite)
+
+        self.updateSprite(sprite)
 
+    # Free the sprite's slot, it is safe to call while the sprites are
+    # being moved and for a sprite that has already gone. Pooled sprites
+    # (bullets and debris) go back to their pool
     def removeSprite(self, sprite):
-        self.spriteList.remove(sprite)
+        slot = sprite.stageSlot
+        if slot is None or slot >= len(self.spriteList) or \
+                self.spriteList[slot] is not sprite:
+            return
+
+        self.spriteList[slot] = None
+        sprite.stageSlot = None
+        self.freeSlots += 1
+        if self.store is not None:
+            self.store.remove(sprite)
+            if sprite.behaviourSlot is not None:
+                self.behaviourList[sprite.behaviourSlot] = None
+                sprite.behaviourSlot = None
 
+        if sprite.pool is not None:
+            sprite.pool.release(sprite)
+
+    # Close up the freed slots, keeping the sprites in the order they
+    # were added so they are drawn the same way
+    def compactSprites(self):
+        if self.freeSlots == 0:
+            return
+
+        self.spriteList = [sprite for sprite in self.spriteList
+                           if sprite is not None]
+        for slot, sprite in enumerate(self.spriteList):
+            sprite.stageSlot = slot
+
+        self.behaviourList = [sprite for sprite in self.behaviourList
+                              if sprite is not None]
+        for slot, sprite in enumerate(self.behaviourList):
+            sprite.behaviourSlot = slot
+
+        self.freeSlots = 0
+
+    # Update the sprites then draw them
     def drawSprites(self):
+        self.updateSprites()
+        self.renderSprites()
+
+    # Work out the points and bounding rects of all the sprites where they
+    # are now, which is all the collision checks need. Nothing is drawn
+    def updateSprites(self):
+        self.compactSprites()
+        if self.batch is not None:
+            self.batch.transform(self.spriteList, self.store)
+
         for sprite in self.spriteList:
-            sprite.boundingRect = pygame.draw.aalines(
-                self.screen, sprite.color, True, sprite.draw())
-            if self.showBoundingBoxes == True:
-                pygame.draw.rect(self.screen, (255, 255, 255),
-                                 sprite.boundingRect, 1)
+            self.updateSprite(sprite)
+
+    # Sprites transformed in a batch were given their rect with their
+    # points. Other sprites' rects come from their extents, so sprites that
+    # aren't drawn (the ship in hyperspace) still have the right rect.
+    # draw() clears pretransformed, so it is read first
+    def updateSprite(self, sprite):
+        pretransformed = sprite.pretransformed
+        sprite.draw()
+        if pretransformed:
+            sprite.boundingRect = sprite.batchRect
+        else:
+            sprite.boundingRect = sprite.bounds()
+
+    # Draw the sprites as they were at the last update, then the
+    # particles. Sprites removed since then are skipped. With an atlas they
+    # are blitted all together
+    def renderSprites(self):
+        if self.headless:
+            return
+
+        if self.atlas is not None and not self.showBoundingBoxes:
+            sprites = [sprite for sprite in self.spriteList
+                       if sprite is not None]
+            drawnRects = self.atlas.drawSprites(self.screen, sprites,
+                                                self.drawSpriteLines)
+            if self.dirtyRects:
+                self.drawnRects.extend(drawnRects)
+        else:
+            for sprite in self.spriteList:
+                if sprite is None:
+                    continue
+
+                self.renderSprite(sprite)
+                if self.showBoundingBoxes == True:
+                    pygame.draw.rect(self.screen, (255, 255, 255),
+                                     sprite.boundingRect, 1)
 
+        if self.particles is not None:
+            drawnRect = self.particles.draw(self.screen)
+            if self.dirtyRects and drawnRect is not None:
+                self.drawnRects.append(drawnRect)
+
+    def renderSprite(self, sprite):
+        drawnRect = None
+        if self.atlas is not None:
+            drawnRect = self.atlas.drawSprite(self.screen, sprite)
+
+        if drawnRect is None:
+            drawnRect = self.drawSpriteLines(sprite)
+
+        if self.dirtyRects:
+            self.drawnRects.append(drawnRect)
+
+    def drawSpriteLines(self, sprite):
+        return pygame.draw.aalines(self.screen, sprite.color, True,
+                                   sprite.transformedPointlist)
+
+    # Draw a surface, such as a line of text, keeping track of the area
+    def blit(self, surface, rect):
+        drawnRect = self.screen.blit(surface, rect)
+        if self.dirtyRects:
+            self.drawnRects.append(drawnRect)
+
+        return drawnRect
+
+    # Draw lines that aren't part of a sprite, such as a graph, keeping
+    # track of the area
+    def drawLines(self, color, closed, points):
+        drawnRect = pygame.draw.lines(self.screen, color, closed, points)
+        if self.dirtyRects:
+            self.drawnRects.append(drawnRect)
+
+        return drawnRect
+
+    # Start a new frame. With dirty rects only what was drawn last frame is
+    # cleared, otherwise (or after redrawAll) the whole screen
+    def clearScreen(self):
+        if self.headless:
+            return
+
+        if self.dirtyRects and not self.fullRedraw:
+            for rect in self.drawnRects:
+                self.screen.fill(self.backgroundColor, rect)
+            self.erasedRects = self.drawnRects
+        else:
+            self.screen.fill(self.backgroundColor)
+            self.erasedRects = []
+
+        self.drawnRects = []
+
+    # Put the frame on the display, only updating the cleared and drawn
+    # areas when there are few enough of them
+    def present(self):
+        if self.headless:
+            return
+
+        if self.dirtyRects and not self.fullRedraw:
+            rects = self.erasedRects + self.drawnRects
+            area = sum(rect.width * rect.height for rect in rects)
+            if area <= self.dirtyThreshold * self.width * self.height:
+                pygame.display.update(rects)
+                return
+
+        self.fullRedraw = False
+        pygame.display.flip()
+
+    # Clear and show the whole screen next frame, for when something has
+    # been drawn without the stage knowing (or the display mode changed)
+    def redrawAll(self):
+        self.fullRedraw = True
+
+    # Sprites added while moving (bullets fired by the saucer) start
+    # moving on the next frame, and ones removed are skipped
     def moveSprites(self):
-        for sprite in self.spriteList:
+        if self.particles is not None:
+            self.particles.step()
+
+        if self.store is not None:
+            self.store.step()
+
+            behaviourList = self.behaviourList
+            for slot in range(len(behaviourList)):
+                sprite = behaviourList[slot]
+                if sprite is not None:
+                    sprite.move()
+
+            self.store.wrap(self.width, self.height)
+            self.compactSprites()
+            return
+
+        spriteList = self.spriteList
+        for slot in range(len(spriteList)):
+            sprite = spriteList[slot]
+            if sprite is None:
+                continue
+
             sprite.move()
 
             if sprite.position.x < 0:
@@ -76,3 +332,5 @@ class Stage:
 
             if sprite.position.y > self.height:
                 sprite.position.y = 0
+
+        self.compactSprites()
@@ -0,0 +1,117 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# Rotate and translate the points of every sprite in one go. All of the
+# vertices are gathered into a single array and transformed together with
+# one cos/sin per sprite, then each sprite is handed its slice of the result
+# as its transformedPointlist. The maths is the same as
+# VectorSprite.rotateAndTransform, rotated points are truncated to integers
+# before being moved to the sprite's position.
+#
+# The bounding rect of every sprite comes out of the same arrays, sized the
+# same way as VectorSprite.bounds, so the stage doesn't have to go over each
+# sprite's points again.
+#
+# NumPy is optional, check batchTransformAvailable before creating one.
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from pygame import Rect
+
+batchTransformAvailable = numpy is not None
+
+
+class BatchTransform:
+
+    def __init__(self):
+        self.transformedPoints = None
+
+    # The sprite's raw pointlist as an array. Sprites drawn with a shared
+    # Shape use its array, others have one made once per sprite
+    def pointArray(self, sprite):
+        shape = sprite.shape
+        if shape is not None and shape.points is sprite.pointlist:
+            return shape.array
+
+        if sprite.pointArraySource is not sprite.pointlist:
+            sprite.pointArray = numpy.array(sprite.pointlist,
+                                            dtype=numpy.float64)
+            sprite.pointArraySource = sprite.pointlist
+
+        return sprite.pointArray
+
+    # Work out this frame's points for all the visible sprites. When they
+    # are all in an EntityStore their positions and angles are read
+    # straight from its arrays
+    def transform(self, spriteList, store=None):
+        sprites = [sprite for sprite in spriteList if sprite.visible]
+        if not sprites:
+            return
+
+        numSprites = len(sprites)
+        shapes = [self.pointArray(sprite) for sprite in sprites]
+        counts = numpy.fromiter((len(shape) for shape in shapes),
+                                dtype=numpy.intp, count=numSprites)
+        points = numpy.concatenate(shapes)
+
+        if store is not None and store.count == len(spriteList):
+            slots = numpy.fromiter((sprite.storeSlot for sprite in sprites),
+                                   dtype=numpy.intp, count=numSprites)
+            angles = store.angle[slots]
+            xs = store.x[slots]
+            ys = store.y[slots]
+        else:
+            angles = numpy.fromiter((sprite.angle for sprite in sprites),
+                                    dtype=numpy.float64, count=numSprites)
+            xs = numpy.fromiter((sprite.position.x for sprite in sprites),
+                                dtype=numpy.float64, count=numSprites)
+            ys = numpy.fromiter((sprite.position.y for sprite in sprites),
+                                dtype=numpy.float64, count=numSprites)
+        angles = numpy.radians(angles % 360)
+
+        # One cos and sin per sprite, spread over its vertices
+        cosVals = numpy.repeat(numpy.cos(angles), counts)
+        sinVals = numpy.repeat(numpy.sin(angles), counts)
+        px = points[:, 0]
+        py = points[:, 1]
+
+        transformed = numpy.empty_like(points)
+        transformed[:, 0] = numpy.trunc(px * cosVals + py * sinVals) + \
+            numpy.repeat(xs, counts)
+        transformed[:, 1] = numpy.trunc(py * cosVals - px * sinVals) + \
+            numpy.repeat(ys, counts)
+        self.transformedPoints = transformed
+
+        # Smallest and largest x and y of each sprite's vertices
+        ends = numpy.cumsum(counts)
+        starts = ends - counts
+        lefts = numpy.floor(numpy.minimum.reduceat(transformed[:, 0], starts))
+        tops = numpy.floor(numpy.minimum.reduceat(transformed[:, 1], starts))
+        rights = numpy.floor(numpy.maximum.reduceat(transformed[:, 0], starts))
+        bottoms = numpy.floor(numpy.maximum.reduceat(transformed[:, 1],
+                                                     starts))
+        widths = (rights - lefts + 1).tolist()
+        heights = (bottoms - tops + 1).tolist()
+
+        # Hand each sprite a view onto its own vertices and its rect
+        for sprite, start, end, left, top, width, height in zip(
+                sprites, starts.tolist(), ends.tolist(), lefts.tolist(),
+                tops.tolist(), widths, heights):
+            sprite.transformedPointlist = transformed[start:end]
+            sprite.batchRect = Rect(left, top, width, height)
+            sprite.pretransformed = True
@@ -0,0 +1,168 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# Game input as one small integer a tick. The held bits are the controls
+# that act for as long as the key is down, the pressed bits are key presses
+# that act once, on the first tick after the key went down. The game only
+# ever sees these masks, so a game can be recorded by saving the mask of
+# every tick and replayed by handing the same masks back.
+#
+# Recordings are a header holding the game's seed followed by run length
+# encoded masks, a run of ticks with the same input takes six bytes.
+
+import struct
+import pygame
+from pygame.locals import *
+
+# Held
+ROTATE_LEFT = 0x001
+ROTATE_RIGHT = 0x002
+THRUST = 0x004
+
+# Pressed
+FIRE = 0x008
+HYPERSPACE = 0x010
+KILL = 0x020
+START = 0x040
+UP = 0x080
+DOWN = 0x100
+LEFT = 0x200
+RIGHT = 0x400
+
+heldKeys = ((ROTATE_LEFT, (K_LEFT, K_z)),
+            (ROTATE_RIGHT, (K_RIGHT, K_x)),
+            (THRUST, (K_UP, K_n)))
+
+pressedKeys = {K_SPACE: FIRE, K_b: FIRE, K_h: HYPERSPACE, K_k: KILL,
+               K_RETURN: START, K_UP: UP, K_DOWN: DOWN, K_LEFT: LEFT,
+               K_RIGHT: RIGHT}
+
+recordingMagic = b'AREC'
+recordingVersion = 1
+headerFormat = '<4sBQ'
+runFormat = '<IH'
+
+
+# Input from the keyboard, key presses are passed in by the game's event
+# loop and the held keys are read when the tick asks for them
+class KeyboardInput:
+
+    def __init__(self):
+        self.pressed = 0
+
+    def keyDown(self, key):
+        self.pressed |= pressedKeys.get(key, 0)
+
+    def read(self):
+        key = pygame.key.get_pressed()
+        keys = self.pressed
+        self.pressed = 0
+        for bit, codes in heldKeys:
+            for code in codes:
+                if key[code]:
+                    keys |= bit
+                    break
+
+        return keys
+
+
+# Hands back the masks of a recording, one a tick, and nothing once the
+# recording has run out
+class ReplayInput:
+
+    def __init__(self, ticks):
+        self.ticks = ticks
+        self.position = 0
+
+    def keyDown(self, key):
+        pass
+
+    def read(self):
+        if self.position >= len(self.ticks):
+            return 0
+
+        keys = self.ticks[self.position]
+        self.position += 1
+        return keys
+
+    def finished(self):
+        return self.position >= len(self.ticks)
+
+
+# Passes through another input and keeps every mask it read
+class InputRecorder:
+
+    def __init__(self, source):
+        self.source = source
+        self.ticks = []
+
+    def keyDown(self, key):
+        self.source.keyDown(key)
+
+    def read(self):
+        keys = self.source.read()
+        self.ticks.append(keys)
+        return keys
+
+
+def saveRecording(path, seed, ticks):
+    with open(path, 'wb') as f:
+        f.write(encodeRecording(seed, ticks))
+
+
+# Returns (seed, ticks)
+def loadRecording(path):
+    with open(path, 'rb') as f:
+        return decodeRecording(f.read())
+
+
+def encodeRecording(seed, ticks):
+    data = [struct.pack(headerFormat, recordingMagic, recordingVersion, seed)]
+    count = 0
+    last = None
+    for keys in ticks:
+        if keys == last:
+            count += 1
+            continue
+        if count:
+            data.append(struct.pack(runFormat, count, last))
+        last = keys
+        count = 1
+
+    if count:
+        data.append(struct.pack(runFormat, count, last))
+
+    return b''.join(data)
+
+
+def decodeRecording(data):
+    headerSize = struct.calcsize(headerFormat)
+    if len(data) < headerSize:
+        raise ValueError('Not an Asteroids recording')
+
+    magic, version, seed = struct.unpack_from(headerFormat, data)
+    if magic != recordingMagic:
+        raise ValueError('Not an Asteroids recording')
+    if version != recordingVersion:
+        raise ValueError('Unknown recording version %d' % version)
+
+    if (len(data) - headerSize) % struct.calcsize(runFormat):
+        raise ValueError('Truncated recording')
+
+    ticks = []
+    for count, keys in struct.iter_unpack(runFormat, data[headerSize:]):
+        ticks.extend([keys] * count)
+
+    return seed, ticks
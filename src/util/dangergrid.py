@@ -0,0 +1,196 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# Coarse grid of how dangerous each part of the screen is about to be, for
+# finding somewhere safe to put the ship. Each threat (a rock or the
+# saucer) adds one to every cell its outline will pass over in the next
+# horizon ticks, travelling in a straight line and wrapping round the
+# screen edges.
+#
+# The grid is kept up to date a little at a time. A threat's footprint is
+# only worked out again when it moves into another cell or changes
+# direction, so the footprint reaches further than the horizon by the
+# longest way across a cell, the diagonal. Threats that have gone have their
+# footprint taken away. Queries look at every cell once, however many
+# rocks there are.
+
+import math
+
+
+class DangerGrid:
+
+    def __init__(self, width, height, cellSize=64, horizon=90, margin=16):
+        self.width = width
+        self.height = height
+        self.cellSize = cellSize
+        self.horizon = horizon
+        self.margin = margin
+        self.cols = max(1, int(math.ceil(width / cellSize)))
+        self.rows = max(1, int(math.ceil(height / cellSize)))
+        self.danger = [0] * (self.cols * self.rows)
+
+        # threat -> (key, cells), the key says when the cells are out of date
+        self.footprints = {}
+        self.radii = {}
+        self.recalculations = 0
+
+    def clear(self):
+        self.danger = [0] * (self.cols * self.rows)
+        self.footprints.clear()
+        self.radii.clear()
+
+    # Bring the grid up to date with where the threats are now
+    def update(self, threats):
+        cellSize = self.cellSize
+        footprints = self.footprints
+        danger = self.danger
+        for threat in threats:
+            position = threat.position
+            heading = threat.heading
+            key = (int(position.x // cellSize), int(position.y // cellSize),
+                   heading.x, heading.y)
+            old = footprints.get(threat)
+            if old is not None:
+                if old[0] == key:
+                    continue
+                for cell in old[1]:
+                    danger[cell] -= 1
+
+            cells = self.footprint(threat)
+            for cell in cells:
+                danger[cell] += 1
+            footprints[threat] = (key, cells)
+            self.recalculations += 1
+
+        if len(footprints) > len(threats):
+            current = set(threats)
+            for threat in [threat for threat in footprints
+                           if threat not in current]:
+                for cell in footprints.pop(threat)[1]:
+                    danger[cell] -= 1
+                self.radii.pop(threat, None)
+
+    # Cells the threat's outline passes over before the horizon
+    def footprint(self, threat):
+        cellSize = self.cellSize
+        cols = self.cols
+        rows = self.rows
+        radius = self.radius(threat)
+        x = threat.position.x
+        y = threat.position.y
+        headingX = threat.heading.x
+        headingY = threat.heading.y
+        speed = math.hypot(headingX, headingY)
+        ticks = self.horizon
+        if speed > 0:
+            ticks += cellSize * math.sqrt(2) / speed
+
+        # Check every half cell along the way, each check reaching half way
+        # to the next so nothing in between is missed
+        steps = max(1, int(math.ceil(speed * ticks / (cellSize / 2.0))))
+        radius += speed * ticks / steps / 2.0
+        cells = set()
+        for step in range(steps + 1):
+            t = ticks * step / steps
+            px = x + headingX * t
+            py = y + headingY * t
+            left = int((px - radius) // cellSize)
+            right = int((px + radius) // cellSize)
+            top = int((py - radius) // cellSize)
+            bottom = int((py + radius) // cellSize)
+            for row in range(top, bottom + 1):
+                rowStart = (row % rows) * cols
+                for col in range(left, right + 1):
+                    cells.add(rowStart + col % cols)
+
+        return sorted(cells)
+
+    # Furthest the outline reaches from its position at any angle, plus
+    # the margin for the ship
+    def radius(self, threat):
+        radius = self.radii.get(threat)
+        if radius is None:
+            shape = threat.shape
+            if shape is not None and shape.points is threat.pointlist:
+                radius = shape.radius
+            else:
+                radius = max(math.hypot(x, y) for x, y in threat.pointlist)
+            radius += self.margin
+            self.radii[threat] = radius
+
+        return radius
+
+    # Danger of each cell and, to a lesser degree, the cells round it
+    def scores(self):
+        cols = self.cols
+        rows = self.rows
+        danger = self.danger
+        scores = []
+        for row in range(rows):
+            above = ((row - 1) % rows) * cols
+            here = row * cols
+            below = ((row + 1) % rows) * cols
+            for col in range(cols):
+                left = (col - 1) % cols
+                right = (col + 1) % cols
+                around = (danger[above + left] + danger[above + col] +
+                          danger[above + right] + danger[here + left] +
+                          danger[here + right] + danger[below + left] +
+                          danger[below + col] + danger[below + right])
+                scores.append(8 * danger[here + col] + around)
+
+        return scores
+
+    def safestCells(self):
+        scores = self.scores()
+        best = min(scores)
+        return [cell for cell, score in enumerate(scores) if score == best]
+
+    # The safest place nearest to (x, y), (x, y) itself if it is one of the
+    # safest places, otherwise the middle of the nearest safest cell
+    def safestPoint(self, x, y):
+        cells = self.safestCells()
+        here = self.cellAt(x, y)
+        if here in cells:
+            return x, y
+
+        def distance(cell):
+            centerX, centerY = self.cellCenter(cell)
+            dx = abs(centerX - x) % self.width
+            dy = abs(centerY - y) % self.height
+            dx = min(dx, self.width - dx)
+            dy = min(dy, self.height - dy)
+            return dx * dx + dy * dy
+
+        return self.cellCenter(min(cells, key=distance))
+
+    # Somewhere random in one of the safest cells
+    def randomSafePoint(self, rng):
+        cell = rng.choice(self.safestCells())
+        left = (cell % self.cols) * self.cellSize
+        top = (cell // self.cols) * self.cellSize
+        x = min(left + rng.uniform(0, self.cellSize), self.width - 1)
+        y = min(top + rng.uniform(0, self.cellSize), self.height - 1)
+        return x, y
+
+    def cellAt(self, x, y):
+        col = int(x // self.cellSize) % self.cols
+        row = int(y // self.cellSize) % self.rows
+        return row * self.cols + col
+
+    def cellCenter(self, cell):
+        x = (cell % self.cols + 0.5) * self.cellSize
+        y = (cell // self.cols + 0.5) * self.cellSize
+        return min(x, self.width - 1), min(y, self.height - 1)
@@ -0,0 +1,184 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# Struct of arrays store for sprite movement. Instead of every sprite keeping
+# its own position, heading and angles the values live in contiguous arrays,
+# so the whole world can be moved and wrapped around the screen in one step.
+#
+# Sprites added to the store keep working as before, their position and
+# heading become views into the arrays (see VectorSprite).
+#
+# NumPy is optional, check entityStoreAvailable before creating a store.
+
+from util.vector2d import *
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+entityStoreAvailable = numpy is not None
+
+
+# Position of the sprite in slot 'slot' of the store. The views are
+# Vector2ds whose x and y are read from and written to the store's arrays
+class PositionView(Vector2d):
+
+    __slots__ = ('store', 'slot')
+
+    def __init__(self, store, slot):
+        self.store = store
+        self.slot = slot
+
+    @property
+    def x(self):
+        return self.store.x[self.slot]
+
+    @x.setter
+    def x(self, value):
+        self.store.x[self.slot] = value
+
+    @property
+    def y(self):
+        return self.store.y[self.slot]
+
+    @y.setter
+    def y(self, value):
+        self.store.y[self.slot] = value
+
+
+# Velocity of the sprite in slot 'slot' of the store
+class HeadingView(Vector2d):
+
+    __slots__ = ('store', 'slot')
+
+    def __init__(self, store, slot):
+        self.store = store
+        self.slot = slot
+
+    @property
+    def x(self):
+        return self.store.vx[self.slot]
+
+    @x.setter
+    def x(self, value):
+        self.store.vx[self.slot] = value
+
+    @property
+    def y(self):
+        return self.store.vy[self.slot]
+
+    @y.setter
+    def y(self, value):
+        self.store.vy[self.slot] = value
+
+
+class EntityStore:
+
+    def __init__(self, capacity=256):
+        self.count = 0
+        self.sprites = []
+        self.allocate(capacity)
+
+    # Create (or grow) the arrays, keeping the values of the live slots
+    def allocate(self, capacity):
+        for name in ('x', 'y', 'vx', 'vy', 'angle', 'vAngle'):
+            array = numpy.zeros(capacity, dtype=numpy.float64)
+            if self.count > 0:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+
+        self.capacity = capacity
+
+    # Copy the sprite's movement into a free slot and make the sprite use
+    # views onto it from now on
+    def add(self, sprite):
+        if self.count == self.capacity:
+            self.allocate(self.capacity * 2)
+
+        slot = self.count
+        self.x[slot] = sprite.position.x
+        self.y[slot] = sprite.position.y
+        self.vx[slot] = sprite.heading.x
+        self.vy[slot] = sprite.heading.y
+        self.angle[slot] = sprite.angle
+        self.vAngle[slot] = sprite.vAngle
+
+        sprite._position = PositionView(self, slot)
+        sprite._heading = HeadingView(self, slot)
+        sprite.storeSlot = slot
+        sprite.store = self
+
+        self.sprites.append(sprite)
+        self.count += 1
+
+    # Give the sprite its values back and fill the hole with the last slot
+    # so the live entries stay packed at the front of the arrays
+    def remove(self, sprite):
+        slot = sprite.storeSlot
+        sprite.store = None
+        sprite.storeSlot = None
+        sprite._position = Vector2d(float(self.x[slot]), float(self.y[slot]))
+        sprite._heading = Vector2d(float(self.vx[slot]), float(self.vy[slot]))
+        sprite._angle = float(self.angle[slot])
+        sprite._vAngle = float(self.vAngle[slot])
+
+        last = self.count - 1
+        if slot != last:
+            for array in (self.x, self.y, self.vx, self.vy, self.angle,
+                          self.vAngle):
+                array[slot] = array[last]
+
+            moved = self.sprites[last]
+            self.sprites[slot] = moved
+            moved.storeSlot = slot
+            moved._position.slot = slot
+            moved._heading.slot = slot
+
+        self.sprites.pop()
+        self.count -= 1
+
+    # Apply the velocities to every slot
+    def step(self):
+        n = self.count
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.angle[:n] += self.vAngle[:n]
+
+    # Wrap everything around the screen edges, the same rules as
+    # Stage.moveSprites uses for a single sprite
+    def wrap(self, width, height):
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        x[x < 0] = width
+        x[x > width] = 0
+        y[y < 0] = height
+        y[y > height] = 0
+
+    # The sprites within reach of any of the boxes, each box being the
+    # centre (x, y) and how far either way to look along each axis. Used to
+    # cull the sprites that are too far from anything to collide with it
+    def near(self, boxes):
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        found = numpy.zeros(n, dtype=bool)
+        for centerX, centerY, reachX, reachY in boxes:
+            found |= (numpy.abs(x - centerX) <= reachX) & \
+                (numpy.abs(y - centerY) <= reachY)
+
+        sprites = self.sprites
+        return [sprites[slot] for slot in numpy.flatnonzero(found).tolist()]
@@ -0,0 +1,84 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# Where each frame's time goes. The game calls lap() as it finishes each
+# stage of the frame and the time since the previous lap is charged to that
+# stage. The last historyLength frames are kept, along with the time
+# between frames, for the profiler overlay.
+
+import time
+from collections import deque
+
+
+class FrameProfiler:
+
+    stageNames = ('input', 'move', 'draw', 'saucer', 'danger', 'game',
+                  'collisions', 'hud', 'flip')
+
+    def __init__(self, historyLength=300):
+        self.history = deque(maxlen=historyLength)
+        self.frameTime = 0.0
+        self.current = dict.fromkeys(self.stageNames, 0.0)
+        self.lastLap = time.perf_counter()
+
+    # Start timing a frame, elapsed is the milliseconds since the last one
+    def startFrame(self, elapsed):
+        self.frameTime = elapsed
+        self.current = dict.fromkeys(self.stageNames, 0.0)
+        self.lastLap = time.perf_counter()
+
+    # Charge the time since the last lap to the stage
+    def lap(self, stageName):
+        now = time.perf_counter()
+        self.current[stageName] += (now - self.lastLap) * 1000.0
+        self.lastLap = now
+
+    def endFrame(self):
+        self.history.append((self.frameTime, self.current))
+
+    # Milliseconds between frames, oldest first
+    def frameTimes(self):
+        return [frameTime for frameTime, _ in self.history]
+
+    # Milliseconds of work in each frame, oldest first
+    def workTimes(self):
+        return [sum(stages.values()) for _, stages in self.history]
+
+    # Frame time percentiles and the mean and worst time of each stage
+    def stats(self):
+        frameTimes = sorted(self.frameTimes())
+        stats = {'frames': len(frameTimes), 'p95': 0.0, 'p99': 0.0,
+                 'max': 0.0, 'stages': {}}
+        if not frameTimes:
+            return stats
+
+        stats['p95'] = percentile(frameTimes, 95)
+        stats['p99'] = percentile(frameTimes, 99)
+        stats['max'] = frameTimes[-1]
+        for name in self.stageNames:
+            times = [stages[name] for _, stages in self.history]
+            stats['stages'][name] = {'mean': sum(times) / len(times),
+                                     'max': max(times)}
+
+        return stats
+
+    def clear(self):
+        self.history.clear()
+
+
+# Nearest rank percentile of an already sorted list
+def percentile(ordered, p):
+    index = max(0, -(-len(ordered) * p // 100) - 1)
+    return ordered[min(index, len(ordered) - 1)]
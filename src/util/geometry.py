@@ -18,6 +18,13 @@
 
 from pygame import Rect
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+polygonIntersectAvailable = numpy is not None
+
 #    Geometry functions to find intersecting lines.
 #    Thes calc's use this formula for a straight line:-
 #        y = mx + b where m is the gradient and b is the y value when x=0
@@ -160,6 +167,122 @@ def calculateIntersectPoint(p1, p2, p3, p4):
         return None
 
 
+#    Segment intersection using cross products (orientation tests) instead
+#    of slopes. The segments p1 to p2 and p3 to p4 are written as
+#        p1 + t * (p2 - p1)  and  p3 + u * (p4 - p3)
+#    and they intersect when both t and u are between 0 and 1. No Rects are
+#    built and no exceptions are used, the return value is the same as
+#    calculateIntersectPoint: an [x, y] list of ints or None.
+
+
+# The cross product of (b - a) and (c - a). Zero when the three points are
+# on one line, otherwise the sign tells which side of a to b the point c is
+def orientation(a, b, c):
+    return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+
+# Is p (already known to be on the line through a and b) within the segment
+def onSegment(p, a, b):
+    return (min(a[0], b[0]) <= p[0] <= max(a[0], b[0]) and
+            min(a[1], b[1]) <= p[1] <= max(a[1], b[1]))
+
+
+def segmentIntersectPoint(p1, p2, p3, p4):
+    x1, y1 = p1[0], p1[1]
+    dx1 = p2[0] - x1
+    dy1 = p2[1] - y1
+    dx2 = p4[0] - p3[0]
+    dy2 = p4[1] - p3[1]
+    rx = p3[0] - x1
+    ry = p3[1] - y1
+
+    denom = dx1 * dy2 - dy1 * dx2
+    tNum = rx * dy2 - ry * dx2
+    uNum = rx * dy1 - ry * dx1
+
+    # 0 <= t <= 1 and 0 <= u <= 1, multiplied through by denom
+    if denom != 0:
+        if denom < 0:
+            denom, tNum, uNum = -denom, -tNum, -uNum
+        if 0 <= tNum <= denom and 0 <= uNum <= denom:
+            t = tNum / denom
+            return [int(x1 + t * dx1), int(y1 + t * dy1)]
+        return None
+
+    # Parallel lines only meet if they lay on top of one another, in which
+    # case return the first end point that is on both segments
+    if uNum != 0:
+        return None
+
+    for point in (p1, p2, p3, p4):
+        if onSegment(point, p1, p2) and onSegment(point, p3, p4):
+            return [int(point[0]), int(point[1])]
+
+    return None
+
+
+# Test every edge of one closed polygon against every edge of another in a
+# single vectorized pass. Edges are taken in the same order as
+# VectorSprite.checkPolygonCollision (from point i-1 to point i) and the first
+# intersection found in that order is returned, or None. Needs numpy, check
+# polygonIntersectAvailable
+def polygonIntersectPoint(pointlist1, pointlist2):
+    a = numpy.asarray(pointlist1, dtype=numpy.float64)
+    b = numpy.asarray(pointlist2, dtype=numpy.float64)
+    aStart = numpy.roll(a, 1, axis=0)
+    bStart = numpy.roll(b, 1, axis=0)
+
+    dx1 = (a[:, 0] - aStart[:, 0])[:, None]
+    dy1 = (a[:, 1] - aStart[:, 1])[:, None]
+    dx2 = (b[:, 0] - bStart[:, 0])[None, :]
+    dy2 = (b[:, 1] - bStart[:, 1])[None, :]
+    rx = bStart[None, :, 0] - aStart[:, None, 0]
+    ry = bStart[None, :, 1] - aStart[:, None, 1]
+
+    denom = dx1 * dy2 - dy1 * dx2
+    tNum = rx * dy2 - ry * dx2
+    uNum = rx * dy1 - ry * dx1
+
+    # Crossing edges have t and u between 0 and 1. Multiplying through by
+    # denom (and flipping when it is negative) avoids dividing every pair
+    sign = numpy.sign(denom)
+    tScaled = tNum * sign
+    uScaled = uNum * sign
+    absDenom = denom * sign
+    crossing = (denom != 0) & (tScaled >= 0) & (tScaled <= absDenom) & \
+        (uScaled >= 0) & (uScaled <= absDenom)
+    overlapping = (denom == 0) & (uNum == 0)
+
+    for index in numpy.flatnonzero(crossing | overlapping).tolist():
+        i, j = divmod(index, len(b))
+        if crossing[i, j]:
+            t = tNum[i, j] / denom[i, j]
+            return [int(aStart[i, 0] + t * dx1[i, 0]),
+                    int(aStart[i, 1] + t * dy1[i, 0])]
+
+        p = segmentIntersectPoint(aStart[i], a[i], bStart[j], b[j])
+        if p is not None:
+            return p
+
+    return None
+
+
+# Is the point (x, y) inside the closed polygon. A ray is cast from the point
+# along x and the edges it crosses are counted, an odd count is inside (the
+# even-odd rule, so outlines that cross themselves work too). Points exactly
+# on an edge may come out either way
+def pointInPolygon(x, y, pointlist):
+    inside = False
+    x1, y1 = pointlist[-1]
+    for x2, y2 in pointlist:
+        if (y1 > y) != (y2 > y):
+            if x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                inside = not inside
+        x1, y1 = x2, y2
+
+    return inside
+
+
 # Test script below...
 if __name__ == "__main__":
 
@@ -0,0 +1,114 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# Narrow phase for the pairs the broad phase finds near each other. Each
+# pair goes through the tiers below, cheapest first, and stops at the first
+# one that rules a hit out:
+#
+#   circle  the bounding circles round the positions, from the radii of
+#           the shapes, are too far apart
+#   box     the bounding rects don't overlap
+#   exact   the outlines don't cross and neither is inside the other. A
+#           bullet (any Point) is tested as a point inside the outline
+#
+# Pairs that get through all of them hit. The counters say how many pairs
+# each tier turned away, for sizing up the work done per frame.
+#
+# The caller can say the boxes touching is enough for a pair, as the storm
+# does for small rocks against the ship. Those pairs only go through the box
+# tier and count as boxHits when they hit, the exact test is skipped.
+
+from util.geometry import pointInPolygon
+
+
+class NarrowPhase:
+
+    tiers = ('circle', 'box', 'exact')
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.pairs = 0
+        self.hits = 0
+        self.boxHits = 0
+        self.rejected = dict.fromkeys(self.tiers, 0)
+
+    # Does the sprite hit the target. Both must have been drawn this frame,
+    # so they have their boundingRect and transformedPointlist
+    def collide(self, sprite, target, boxIsEnough=False):
+        self.pairs += 1
+
+        if boxIsEnough:
+            if not sprite.boundingRect.colliderect(target.boundingRect):
+                self.rejected['box'] += 1
+                return False
+            self.hits += 1
+            self.boxHits += 1
+            return True
+
+        reach = sprite.boundingRadius() + target.boundingRadius()
+        dx = sprite.position.x - target.position.x
+        dy = sprite.position.y - target.position.y
+        if dx * dx + dy * dy > reach * reach:
+            self.rejected['circle'] += 1
+            return False
+
+        if not sprite.boundingRect.colliderect(target.boundingRect):
+            self.rejected['box'] += 1
+            return False
+
+        if not outlinesTouch(sprite, target):
+            self.rejected['exact'] += 1
+            return False
+
+        self.hits += 1
+        return True
+
+    # Counters since the last clear
+    def stats(self):
+        stats = {'pairs': self.pairs, 'hits': self.hits,
+                 'boxHits': self.boxHits}
+        stats.update(self.rejected)
+        return stats
+
+
+# The exact test between two sprites. Outlines touch when their edges cross
+# or when one is wholly inside the other, which crossing edges alone would
+# miss
+def outlinesTouch(sprite, target):
+    if sprite.isPoint:
+        if target.isPoint:
+            return True
+        return pointInPolygon(sprite.position.x, sprite.position.y,
+                              target.transformedPointlist)
+
+    if target.isPoint:
+        return pointInPolygon(target.position.x, target.position.y,
+                              sprite.transformedPointlist)
+
+    if sprite.checkPolygonCollision(target) is not None:
+        return True
+
+    x, y = target.transformedPointlist[0]
+    if pointInPolygon(x, y, sprite.transformedPointlist):
+        return True
+
+    x, y = sprite.transformedPointlist[0]
+    return pointInPolygon(x, y, target.transformedPointlist)
+
+
+# Shared by all sprites
+narrowPhase = NarrowPhase()
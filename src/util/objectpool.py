@@ -0,0 +1,71 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# Pools of short lived sprites. Bullets and debris only last for a second
+# or so, rather than making new ones all the time the dead ones are kept
+# and handed out again. A reused object has its reset method called with
+# the same arguments its constructor takes, which puts it back to the state
+# a new one would be in.
+
+class ObjectPool:
+
+    def __init__(self, cls, maxSize=256):
+        self.cls = cls
+        self.maxSize = maxSize
+        self.free = []
+        self.fresh = 0
+        self.reused = 0
+        self.released = 0
+        self.dropped = 0
+
+    # A reset object from the pool, or a new one when the pool is empty
+    def acquire(self, *args):
+        if self.free:
+            obj = self.free.pop()
+            obj.pooled = False
+            obj.reset(*args)
+            self.reused += 1
+        else:
+            obj = self.cls(*args)
+            self.fresh += 1
+
+        return obj
+
+    # Keep a finished object for reuse. Objects of other classes (a subclass
+    # has a pool of its own) and ones already in the pool are ignored, when
+    # the pool is full the object is left for the garbage collector
+    def release(self, obj):
+        if type(obj) is not self.cls or obj.pooled:
+            return
+
+        if len(self.free) < self.maxSize:
+            obj.pooled = True
+            self.free.append(obj)
+            self.released += 1
+        else:
+            self.dropped += 1
+
+    def clear(self):
+        self.free = []
+        self.fresh = 0
+        self.reused = 0
+        self.released = 0
+        self.dropped = 0
+
+    # Counters for sizing the pool
+    def stats(self):
+        return {'size': len(self.free), 'maxSize': self.maxSize,
+                'fresh': self.fresh, 'reused': self.reused,
+                'released': self.released, 'dropped': self.dropped}
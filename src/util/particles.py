@@ -0,0 +1,178 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+# Particles for explosions, kept in arrays rather than as sprites. Debris
+# used to be a sprite per piece, each moved, faded, transformed and drawn
+# with its own lines. Here the positions, velocities, time to live and
+# colours of all of the particles live in NumPy arrays, one step moves,
+# fades, wraps and expires them all and the survivors are packed to the
+# front of the arrays. Drawing writes each particle as a 2x2 block of
+# pixels straight into the surface, about the size of the Point outline
+# Debris was drawn with.
+#
+# NumPy is optional, check particlesAvailable before creating a system.
+
+import random
+import pygame
+
+try:
+    import numpy
+    import pygame.surfarray
+except ImportError:
+    numpy = None
+
+particlesAvailable = numpy is not None
+
+
+class ParticleSystem:
+
+    def __init__(self, width, height, capacity=1024):
+        self.width = width
+        self.height = height
+        self.count = 0
+        self.allocate(capacity)
+
+    # Create (or grow) the arrays, keeping the live particles
+    def allocate(self, capacity):
+        arrays = {'x': numpy.float64, 'y': numpy.float64,
+                  'vx': numpy.float64, 'vy': numpy.float64,
+                  'ttl': numpy.int32, 'fade': numpy.int16}
+        for name, dtype in arrays.items():
+            array = numpy.zeros(capacity, dtype=dtype)
+            if self.count > 0:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+
+        color = numpy.zeros((capacity, 3), dtype=numpy.int16)
+        if self.count > 0:
+            color[:self.count] = self.color[:self.count]
+        self.color = color
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    # Add count particles at (x, y) flying off in random directions, at up
+    # to spread pixels a tick along each axis. They lose fade from each
+    # colour channel every tick and are gone after ttl ticks. The random
+    # numbers are taken in the same order as for Debris sprites
+    def emit(self, x, y, count, rng=random, spread=1.5, ttl=50,
+             color=(255, 255, 255), fade=5):
+        needed = self.count + count
+        if needed > self.capacity:
+            capacity = self.capacity
+            while capacity < needed:
+                capacity *= 2
+            self.allocate(capacity)
+
+        headings = [rng.uniform(-spread, spread) for _ in range(count * 2)]
+        start = self.count
+        end = needed
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.vx[start:end] = headings[0::2]
+        self.vy[start:end] = headings[1::2]
+        self.ttl[start:end] = ttl
+        self.color[start:end] = color
+        self.fade[start:end] = fade
+        self.count = end
+
+    # One tick. Particles whose time has run out go, the rest move, wrap
+    # round the screen edges (the same rules as Stage.moveSprites) and fade
+    def step(self):
+        n = self.count
+        if n == 0:
+            return
+
+        ttl = self.ttl[:n]
+        ttl -= 1
+        alive = ttl > 0
+        if not alive.all():
+            n = int(numpy.count_nonzero(alive))
+            for array in (self.x, self.y, self.vx, self.vy, self.ttl,
+                          self.fade, self.color):
+                array[:n] = array[:self.count][alive]
+            self.count = n
+
+        x = self.x[:n]
+        y = self.y[:n]
+        x += self.vx[:n]
+        y += self.vy[:n]
+        x[x < 0] = self.width
+        x[x > self.width] = 0
+        y[y < 0] = self.height
+        y[y > self.height] = 0
+
+        color = self.color[:n]
+        color -= self.fade[:n, None]
+        numpy.maximum(color, 0, out=color)
+
+    # Write the particles into the surface, returning the area drawn on
+    # (None when there are none)
+    def draw(self, surface):
+        n = self.count
+        if n == 0:
+            return None
+
+        width, height = surface.get_size()
+        xs = self.x[:n].astype(numpy.intp)
+        ys = self.y[:n].astype(numpy.intp)
+        numpy.clip(xs, 0, width - 2, out=xs)
+        numpy.clip(ys, 0, height - 2, out=ys)
+
+        if surface.get_bytesize() in (2, 4):
+            self.writePixels(surface, xs, ys)
+        else:
+            # Palettes and 24 bit pixels can't be written as whole numbers
+            for x, y, color in zip(xs.tolist(), ys.tolist(),
+                                   self.color[:n].tolist()):
+                surface.fill(color, (x, y, 2, 2))
+
+        left = int(xs.min())
+        top = int(ys.min())
+        return pygame.Rect(left, top, int(xs.max()) - left + 2,
+                           int(ys.max()) - top + 2)
+
+    # Set the four pixels of each particle to its colour, mapped to the
+    # surface's pixel format. When the rows are packed one after another the
+    # pixels are addressed as one flat array, which is quicker
+    def writePixels(self, surface, xs, ys):
+        shifts = surface.get_shifts()
+        losses = surface.get_losses()
+        colors = self.color[:self.count].astype(numpy.uint32)
+        mapped = numpy.full(self.count, surface.get_masks()[3],
+                            dtype=numpy.uint32)
+        for channel in range(3):
+            mapped |= (colors[:, channel] >> losses[channel]) << \
+                shifts[channel]
+
+        pixels = pygame.surfarray.pixels2d(surface)
+        rows = pixels.T
+        if rows.flags.c_contiguous:
+            flat = rows.reshape(-1)
+            pitch = rows.shape[1]
+            index = ys * pitch + xs
+            for offset in (0, 1, pitch, pitch + 1):
+                flat[index + offset] = mapped
+            del flat
+        else:
+            for dx, dy in ((0, 0), (1, 0), (0, 1), (1, 1)):
+                pixels[xs + dx, ys + dy] = mapped
+
+        del rows, pixels
@@ -0,0 +1,183 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# Rays cast out from the ship, each one reporting how far away the nearest
+# rock, saucer or saucer bullet along it is. Ray 0 points where the ship
+# points and the rest are spread evenly round anticlockwise, turning with
+# the ship.
+#
+# Rays are only tested against the things that could be in their way. The
+# objects are indexed by direction from the ship: each is filed under the
+# rays that pass within its bounding circle, and objects out of range are
+# dropped. Then every ray is tested against every edge of the outlines
+# filed under it (transformedPointlist) in one vectorized step. The screen
+# wraps, so each object is first moved to wherever it is closest to the
+# ship. maxDistance should be no more than half the screen height, past
+# that an object could be seen the other way round the screen too.
+#
+# NumPy is optional, check raySensorAvailable before creating one.
+
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+raySensorAvailable = numpy is not None
+
+# What each ray hit
+NOTHING = 0
+ROCK = 1
+SAUCER = 2
+SAUCER_BULLET = 3
+
+
+class RaySensor:
+
+    def __init__(self, width, height, numRays=64, maxDistance=384):
+        self.width = width
+        self.height = height
+        self.numRays = numRays
+        self.maxDistance = maxDistance
+
+        # Ray angles for a ship at angle 0, (0, -1) is straight ahead
+        self.rayAngles = numpy.radians(numpy.arange(numRays) * 360.0 /
+                                       numRays)
+
+    # Directions of the rays from a ship turned by angle degrees
+    def rayDirections(self, angle):
+        angles = self.rayAngles + math.radians(angle)
+        return numpy.stack((-numpy.sin(angles), -numpy.cos(angles)), axis=1)
+
+    # Cast the rays from the game's ship. Returns (distances, kinds), for
+    # each ray the distance to the nearest thing hit (maxDistance if
+    # nothing was) and what it was
+    def sense(self, game):
+        objects = [(rock, ROCK) for rock in game.rockList]
+        saucer = game.saucer
+        if saucer is not None:
+            objects.append((saucer, SAUCER))
+            objects.extend((bullet, SAUCER_BULLET)
+                           for bullet in saucer.bullets if bullet.ttl > 0)
+
+        ship = game.ship
+        return self.cast(ship.position.x, ship.position.y, ship.angle,
+                         objects)
+
+    # Cast the rays from (x, y) against (sprite, kind) pairs
+    def cast(self, x, y, angle, objects):
+        numRays = self.numRays
+        maxDistance = self.maxDistance
+        distances = numpy.full(numRays, float(maxDistance))
+        kinds = numpy.zeros(numRays, dtype=numpy.int8)
+        if not objects:
+            return distances, kinds
+
+        # Bounding circles, moved to be nearest the origin round the screen
+        width = self.width
+        height = self.height
+        count = len(objects)
+        rects = [sprite.boundingRect for sprite, _ in objects]
+        centerX = numpy.fromiter((rect.centerx for rect in rects),
+                                 dtype=numpy.float64, count=count)
+        centerY = numpy.fromiter((rect.centery for rect in rects),
+                                 dtype=numpy.float64, count=count)
+        rectWidths = numpy.fromiter((rect.width for rect in rects),
+                                    dtype=numpy.float64, count=count)
+        rectHeights = numpy.fromiter((rect.height for rect in rects),
+                                     dtype=numpy.float64, count=count)
+        radius = numpy.hypot(rectWidths, rectHeights) / 2 + 1
+        dx = (centerX - x + width / 2) % width - width / 2
+        dy = (centerY - y + height / 2) % height - height / 2
+        distance = numpy.hypot(dx, dy)
+
+        # The rays passing through each circle, all of them when the origin
+        # is inside it and none when the circle is out of range
+        step = 2 * math.pi / numRays
+        inside = distance <= radius
+        halfWidth = numpy.arcsin(numpy.minimum(
+            radius / numpy.maximum(distance, radius), 1.0))
+        direction = numpy.arctan2(-dx, -dy) - math.radians(angle)
+        firstRay = numpy.ceil((direction - halfWidth) / step).astype(
+            numpy.intp)
+        lastRay = numpy.floor((direction + halfWidth) / step).astype(
+            numpy.intp)
+        rayCounts = numpy.clip(lastRay - firstRay + 1, 0, numRays)
+        rayCounts[inside] = numRays
+        firstRay[inside] = 0
+        rayCounts[distance - radius > maxDistance] = 0
+
+        selected = numpy.flatnonzero(rayCounts)
+        if len(selected) == 0:
+            return distances, kinds
+
+        # The outlines of the objects in the way of any ray, relative to
+        # the origin
+        selectedList = selected.tolist()
+        pointLists = [objects[i][0].transformedPointlist
+                      for i in selectedList]
+        pointCounts = numpy.fromiter(map(len, pointLists), dtype=numpy.intp,
+                                     count=len(selectedList))
+        points = numpy.array([point for pointList in pointLists
+                              for point in pointList],
+                             dtype=numpy.float64).reshape(-1, 2)
+        ends = numpy.cumsum(pointCounts)
+        edgeStarts = ends - pointCounts
+        offsetX = numpy.repeat(dx[selected] - centerX[selected], pointCounts)
+        offsetY = numpy.repeat(dy[selected] - centerY[selected], pointCounts)
+        startX = points[:, 0] + offsetX
+        startY = points[:, 1] + offsetY
+        following = numpy.arange(1, len(points) + 1)
+        following[ends - 1] = edgeStarts
+        edgeX = startX[following] - startX
+        edgeY = startY[following] - startY
+
+        # One entry for each ray and edge of each object filed under it
+        rayCounts = rayCounts[selected]
+        perObject = rayCounts * pointCounts
+        owner = numpy.repeat(numpy.arange(len(selected)), perObject)
+        within = numpy.arange(len(owner)) - numpy.repeat(
+            numpy.cumsum(perObject) - perObject, perObject)
+        ownerPoints = pointCounts[owner]
+        rays = (firstRay[selected][owner] + within // ownerPoints) % numRays
+        edges = edgeStarts[owner] + within % ownerPoints
+
+        # Ray t * d from the origin against edge start + u * edge
+        directions = self.rayDirections(angle)
+        dirX = directions[rays, 0]
+        dirY = directions[rays, 1]
+        eX = edgeX[edges]
+        eY = edgeY[edges]
+        sX = startX[edges]
+        sY = startY[edges]
+        denominator = dirX * eY - dirY * eX
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            t = (sX * eY - sY * eX) / denominator
+            u = (sX * dirY - sY * dirX) / denominator
+
+        hit = ((denominator != 0) & (t >= 0) & (t <= maxDistance) &
+               (u >= 0) & (u <= 1))
+        t = numpy.where(hit, t, numpy.inf)
+        nearest = numpy.full(numRays, numpy.inf)
+        numpy.minimum.at(nearest, rays, t)
+
+        found = numpy.isfinite(nearest)
+        distances[found] = nearest[found]
+        winners = hit & (t == nearest[rays])
+        objectKinds = numpy.array([objects[i][1] for i in selectedList],
+                                  dtype=numpy.int8)
+        kinds[rays[winners]] = objectKinds[owner[winners]]
+        return distances, kinds
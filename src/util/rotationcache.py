@@ -0,0 +1,98 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# Cache of rotated sprite outlines. The ship turns in steps of 6 degrees,
+# rocks spin a degree a frame and there are only a handful of outlines, so
+# the same rotations come round again and again. Entries are keyed by
+# (shape id, scale, whole degrees mod 360) and the least recently used entry
+# is thrown away when the cache is full.
+#
+# The extents of each rotated outline (its smallest and largest x and y)
+# are kept in the same entry, so a sprite's bounding rect can be found
+# without transforming its points.
+
+import math
+from collections import OrderedDict
+
+
+class RotationCache:
+
+    def __init__(self, maxSize=8192):
+        self.maxSize = maxSize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Return the pointlist rotated by angle as a tuple of (x, y) tuples.
+    # angle must be a whole number of degrees
+    def rotate(self, shapeId, scale, angle, pointlist):
+        return self.entry(shapeId, scale, angle, pointlist)[0]
+
+    # (left, top, right, bottom) of the pointlist rotated by angle, angle
+    # must be a whole number of degrees
+    def extents(self, shapeId, scale, angle, pointlist):
+        return self.entry(shapeId, scale, angle, pointlist)[1]
+
+    # The (rotated points, extents) entry for the rotation, made on a miss.
+    # Either lookup keeps the entry from being the next to go
+    def entry(self, shapeId, scale, angle, pointlist):
+        key = (shapeId, scale, int(angle) % 360)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        rotated = rotatePointlist(pointlist, key[2])
+        entry = (rotated, pointlistExtents(rotated))
+        self.entries[key] = entry
+        if len(self.entries) > self.maxSize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+        return entry
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Counters for sizing the cache
+    def stats(self):
+        return {'size': len(self.entries), 'maxSize': self.maxSize,
+                'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions}
+
+
+# Rotate each point by the angle (in degrees) keeping the points as integers,
+# the same maths as VectorSprite.rotatePoint
+def rotatePointlist(pointlist, angle):
+    cosVal = math.cos(math.radians(angle))
+    sinVal = math.sin(math.radians(angle))
+    return tuple((int(x * cosVal + y * sinVal), int(y * cosVal - x * sinVal))
+                 for x, y in pointlist)
+
+
+def pointlistExtents(pointlist):
+    xs = [x for x, y in pointlist]
+    ys = [y for x, y in pointlist]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+# Shared by all sprites
+rotationCache = RotationCache()
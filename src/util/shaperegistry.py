@@ -0,0 +1,96 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# Registry of the outlines sprites are drawn with. There are only a handful
+# of outlines (four rocks, the saucer, the ship) at a few scales, so each
+# (outline, scale) is scaled once into a Shape which every sprite drawn with
+# it shares, rather than every rock keeping its own copy of the points.
+#
+# How far the outline reaches from the sprite's position at any angle,
+# used by the danger grid and the narrow phase, is worked out when the Shape
+# is made. Shapes are never changed once made, the points are tuples and
+# the array handed to BatchTransform is read only.
+#
+# NumPy is optional, without it Shape.array is None.
+
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class Shape:
+
+    def __init__(self, shapeId, scale, outline):
+        self.shapeId = shapeId
+        self.scale = scale
+
+        # Scaled the same way as VectorSprite.scale, truncated to integers
+        self.points = tuple((int(x * scale), int(y * scale))
+                            for x, y in outline)
+
+        # Furthest any point is from the sprite's position, rotating the
+        # outline never takes a point further out than this
+        self.radius = max(math.hypot(x, y) for x, y in self.points)
+
+        if numpy is not None:
+            self.array = numpy.array(self.points, dtype=numpy.float64)
+            self.array.flags.writeable = False
+        else:
+            self.array = None
+
+    def __len__(self):
+        return len(self.points)
+
+    def __repr__(self):
+        return 'Shape(%r, %r)' % (self.shapeId, self.scale)
+
+
+class ShapeRegistry:
+
+    def __init__(self):
+        self.outlines = {}
+        self.shapes = {}
+
+    # Give an outline its shapeId, outlines can't be changed once given
+    def register(self, shapeId, outline):
+        outline = tuple((x, y) for x, y in outline)
+        registered = self.outlines.get(shapeId)
+        if registered is not None and registered != outline:
+            raise ValueError('shape %r is already registered' % (shapeId,))
+        self.outlines[shapeId] = outline
+
+    # The shared Shape for the registered outline at the given scale, made
+    # the first time it is asked for
+    def get(self, shapeId, scale=1):
+        key = (shapeId, scale)
+        shape = self.shapes.get(key)
+        if shape is None:
+            shape = Shape(shapeId, scale, self.outlines[shapeId])
+            self.shapes[key] = shape
+
+        return shape
+
+    def __contains__(self, shapeId):
+        return shapeId in self.outlines
+
+    def __len__(self):
+        return len(self.shapes)
+
+
+# Shared by all sprites
+shapeRegistry = ShapeRegistry()
@@ -0,0 +1,85 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# Uniform grid used as the broad phase for collisions. Objects are filed
+# under every cell their bounding rect touches and a query only returns the
+# objects sharing a cell with the given rect, so the expensive collision
+# tests are only made between things that are near each other.
+#
+# The grid wraps around the screen edges in the same way the sprites do, a
+# rect hanging off the right hand side also covers the cells on the left.
+
+import math
+
+
+class SpatialHash:
+
+    def __init__(self, width, height, cellSize=64):
+        self.cellSize = cellSize
+        self.cols = max(1, int(math.ceil(width / cellSize)))
+        self.rows = max(1, int(math.ceil(height / cellSize)))
+        self.cells = {}
+        self.objects = []
+
+    def clear(self):
+        self.cells.clear()
+        self.objects = []
+
+    # Empty the grid and file each object under its boundingRect
+    def rebuild(self, objects):
+        self.clear()
+        for obj in objects:
+            self.insert(obj, obj.boundingRect)
+
+    def insert(self, obj, rect):
+        index = len(self.objects)
+        self.objects.append(obj)
+        for cell in self.cellsFor(rect):
+            indexes = self.cells.get(cell)
+            if indexes is None:
+                self.cells[cell] = [index]
+            else:
+                indexes.append(index)
+
+    # Objects sharing a cell with the rect, in the order they were inserted
+    def query(self, rect):
+        found = set()
+        for cell in self.cellsFor(rect):
+            indexes = self.cells.get(cell)
+            if indexes is not None:
+                found.update(indexes)
+
+        return [self.objects[index] for index in sorted(found)]
+
+    # The cells covered by the rect, wrapped around the screen edges
+    def cellsFor(self, rect):
+        cellSize = self.cellSize
+        left = rect.left // cellSize
+        right = max(rect.right - 1, rect.left) // cellSize
+        top = rect.top // cellSize
+        bottom = max(rect.bottom - 1, rect.top) // cellSize
+
+        # A rect bigger than the screen covers every cell once
+        if right - left + 1 >= self.cols:
+            cols = range(self.cols)
+        else:
+            cols = [col % self.cols for col in range(left, right + 1)]
+
+        if bottom - top + 1 >= self.rows:
+            rows = range(self.rows)
+        else:
+            rows = [row % self.rows for row in range(top, bottom + 1)]
+
+        return [row * self.cols + col for row in rows for col in cols]
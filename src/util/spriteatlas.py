@@ -0,0 +1,149 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# Sprites drawn once and blitted from then on. Rocks, the ship and the
+# saucer only ever appear in a limited number of (outline, scale, angle,
+# colour) combinations, so rather than antialiasing every line of every
+# sprite each frame each combination is drawn the first time it is needed
+# onto a small surface of its own and that surface is blitted after that.
+#
+# The surfaces are filled with the background colour, which is made the
+# colour key, so the antialiased edges come out the same as drawing
+# straight onto the background. The atlas keeps the least recently used
+# surfaces under maxBytes, and the area each surface covers is stored with
+# it to give the sprite's bounding rect.
+
+import math
+import pygame
+from collections import OrderedDict
+from util.rotationcache import rotationCache
+
+
+class SpriteAtlas:
+
+    def __init__(self, backgroundColor, maxBytes=64 * 1024 * 1024):
+        self.backgroundColor = backgroundColor
+        self.maxBytes = maxBytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Blit the sprite at its position and return the area drawn on.
+    # Returns None for sprites at angles that aren't whole degrees, these
+    # have to be drawn with their lines
+    def drawSprite(self, screen, sprite):
+        entry = self.entryFor(screen, sprite)
+        if entry is None:
+            return None
+
+        surface, left, top, rect = entry
+        x = math.floor(sprite.position.x) + left
+        y = math.floor(sprite.position.y) + top
+        screen.blit(surface, (x, y))
+        return rect.move(x, y)
+
+    # Blit a list of sprites in as few calls as possible, keeping their
+    # order. Sprites the atlas can't draw are handed to drawLines, which
+    # returns the area it drew on. Returns the areas drawn on
+    def drawSprites(self, screen, sprites, drawLines):
+        floor = math.floor
+        pending = []
+        rects = []
+        for sprite in sprites:
+            entry = self.entryFor(screen, sprite)
+            if entry is None:
+                if pending:
+                    screen.blits(pending, False)
+                    pending = []
+                rects.append(drawLines(sprite))
+                continue
+
+            surface, left, top, rect = entry
+            position = sprite.position
+            x = floor(position.x) + left
+            y = floor(position.y) + top
+            pending.append((surface, (x, y)))
+            rects.append(rect.move(x, y))
+
+        if pending:
+            screen.blits(pending, False)
+
+        return rects
+
+    # The sprite's surface, drawn now if it isn't in the atlas. None for
+    # sprites at angles that aren't whole degrees
+    def entryFor(self, screen, sprite):
+        angle = sprite.angle
+        if angle != int(angle):
+            return None
+
+        key = (sprite.getShapeId(), sprite.shapeScale, int(angle) % 360,
+               sprite.color)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        return self.rasterize(screen, sprite, key)
+
+    # Draw the sprite's rotated outline onto a surface just big enough for
+    # it, plus a pixel all round for the antialiasing
+    def rasterize(self, screen, sprite, key):
+        shapeId, scale, angle, color = key
+        rotated = rotationCache.rotate(shapeId, scale, angle, sprite.pointlist)
+        xs = [x for x, y in rotated]
+        ys = [y for x, y in rotated]
+        left = min(xs) - 1
+        top = min(ys) - 1
+        width = max(xs) - left + 2
+        height = max(ys) - top + 2
+
+        surface = pygame.Surface((width, height), 0, screen)
+        surface.fill(self.backgroundColor)
+        rect = pygame.draw.aalines(surface, color, True,
+                                   [(x - left, y - top) for x, y in rotated])
+        surface.set_colorkey(self.backgroundColor, pygame.RLEACCEL)
+
+        entry = (surface, left, top, rect)
+        self.entries[key] = entry
+        self.bytes += self.entryBytes(entry)
+        while self.bytes > self.maxBytes and len(self.entries) > 1:
+            oldKey, oldEntry = self.entries.popitem(last=False)
+            self.bytes -= self.entryBytes(oldEntry)
+            self.evictions += 1
+
+        return entry
+
+    def entryBytes(self, entry):
+        surface = entry[0]
+        return surface.get_width() * surface.get_height() * \
+            surface.get_bytesize()
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Counters for sizing the atlas
+    def stats(self):
+        return {'size': len(self.entries), 'bytes': self.bytes,
+                'maxBytes': self.maxBytes, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
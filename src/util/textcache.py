@@ -0,0 +1,76 @@
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# Fonts and rendered text for the score, the attract screen and the rest of
+# the HUD. Each font size is loaded from the font file once, and rendered
+# strings are kept by (size, text, colour) so text that doesn't change
+# between frames (the title, the high scores, the score most of the time)
+# is only rendered once. The least recently used surface is thrown away
+# when the cache is full.
+
+import pygame
+from collections import OrderedDict
+
+
+class TextCache:
+
+    def __init__(self, fontPath, maxSize=64):
+        self.fontPath = fontPath
+        self.maxSize = maxSize
+        self.fonts = {}
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # The font at the given size, loaded the first time it is asked for
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(self.fontPath, size)
+            self.fonts[size] = font
+
+        return font
+
+    # Antialiased surface of the text
+    def render(self, size, text, color):
+        key = (size, text, color)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.font(size).render(text, True, color)
+        self.entries[key] = surface
+        if len(self.entries) > self.maxSize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+        return surface
+
+    # Forget the rendered text, the fonts are kept
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Counters for sizing the cache
+    def stats(self):
+        return {'size': len(self.entries), 'maxSize': self.maxSize,
+                'fonts': len(self.fonts), 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
@@ -16,11 +16,91 @@
 #    Copyright (C) 2018  Francisco Sanchez Arroyo
 #
 
+import math
 
+
+# 2d vector used for positions and velocities. The operators make new
+# vectors, the in place ones (+=, -=, *=) change the vector they are used
+# on, which is what the sprites want each frame
 class Vector2d:
 
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
 
-# needs a copy constructor and method for vector addition etc
+    def copy(self):
+        return Vector2d(self.x, self.y)
+
+    def set(self, x, y):
+        self.x = x
+        self.y = y
+
+    def __add__(self, other):
+        return Vector2d(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other):
+        return Vector2d(self.x - other.x, self.y - other.y)
+
+    # Scale by a number
+    def __mul__(self, factor):
+        return Vector2d(self.x * factor, self.y * factor)
+
+    __rmul__ = __mul__
+
+    def __iadd__(self, other):
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def __isub__(self, other):
+        self.x -= other.x
+        self.y -= other.y
+        return self
+
+    def __imul__(self, factor):
+        self.x *= factor
+        self.y *= factor
+        return self
+
+    def __neg__(self):
+        return Vector2d(-self.x, -self.y)
+
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y)
+
+    # Unit vector in the same direction, a zero vector stays as it is
+    def normalized(self):
+        length = self.length()
+        if length == 0:
+            return Vector2d(self.x, self.y)
+
+        return Vector2d(self.x / length, self.y / length)
+
+    # Make this vector unit length in place
+    def normalize(self):
+        length = self.length()
+        if length != 0:
+            self.x /= length
+            self.y /= length
+
+        return self
+
+    # Read like an (x, y) tuple, so a vector can be unpacked or handed to
+    # pygame where it wants a point
+    def asTuple(self):
+        return (self.x, self.y)
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, index):
+        return (self.x, self.y)[index]
+
+    def __repr__(self):
+        return 'Vector2d(%r, %r)' % (self.x, self.y)
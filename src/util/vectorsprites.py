@@ -24,10 +24,49 @@ import random
 from math import *
 from util.vector2d import *
 from util.geometry import *
+from util.rotationcache import rotationCache, pointlistExtents
+from util.shaperegistry import shapeRegistry
+from util.narrowphase import narrowPhase
+from util.objectpool import ObjectPool
 
 
 class VectorSprite:
 
+    # Set when the sprite has been added to an EntityStore
+    store = None
+    storeSlot = None
+
+    # Handles given out by the Stage the sprite is on
+    stageSlot = None
+    behaviourSlot = None
+
+    # Classes whose instances are reused have an ObjectPool here, pooled
+    # is set while an instance is sitting in the pool
+    pool = None
+    pooled = False
+
+    # Used by BatchTransform, pretransformed is set when this frame's
+    # transformedPointlist (and batchRect) has already been worked out
+    visible = True
+    pretransformed = False
+    batchRect = None
+    pointArray = None
+    pointArraySource = None
+
+    # Identify the outline in the rotation cache. Sprites sharing an outline
+    # should share a shapeId, when None one is made from the pointlist
+    shapeId = None
+    shapeScale = 1
+
+    # The shared Shape from util.shaperegistry the outline comes from, if any
+    shape = None
+
+    # Points (bullets and debris) collide as a single point, not an outline
+    isPoint = False
+
+    # Edge pairs above which checkPolygonCollision goes vectorized
+    vectorizedEdgePairs = 100
+
     def __init__(self, position, heading, pointlist, angle=0, color=(255, 255, 255)):
         self.position = position
         self.heading = heading
@@ -39,15 +78,118 @@ class VectorSprite:
 
         #self.color = color = (random.randrange(40,255),random.randrange(40,255),random.randrange(40,255))
 
-    # rotate each x,y coord by the angle, then translate it to the x,y position
+    # Position, heading and angles normally live on the sprite. Once the sprite
+    # is in an EntityStore they are read from and written to the store's
+    # arrays instead, assigning a new vector copies its values into the store
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, position):
+        if self.store is None:
+            self._position = position
+        else:
+            self._position.x = position.x
+            self._position.y = position.y
+
+    @property
+    def heading(self):
+        return self._heading
+
+    @heading.setter
+    def heading(self, heading):
+        if self.store is None:
+            self._heading = heading
+        else:
+            self._heading.x = heading.x
+            self._heading.y = heading.y
+
+    @property
+    def angle(self):
+        if self.store is None:
+            return self._angle
+        return self.store.angle[self.storeSlot]
+
+    @angle.setter
+    def angle(self, angle):
+        if self.store is None:
+            self._angle = angle
+        else:
+            self.store.angle[self.storeSlot] = angle
+
+    @property
+    def vAngle(self):
+        if self.store is None:
+            return self._vAngle
+        return self.store.vAngle[self.storeSlot]
+
+    @vAngle.setter
+    def vAngle(self, vAngle):
+        if self.store is None:
+            self._vAngle = vAngle
+        else:
+            self.store.vAngle[self.storeSlot] = vAngle
+
+    # rotate each x,y coord by the angle, then translate it to the x,y position.
+    # Rotations by whole degrees come from the shared rotation cache
     def rotateAndTransform(self):
-        newPointList = [self.rotatePoint(point) for point in self.pointlist]
-        self.transformedPointlist = [
-            self.translatePoint(point) for point in newPointList]
+        angle = self.angle
+        if angle == int(angle):
+            rotated = rotationCache.rotate(self.getShapeId(), self.shapeScale,
+                                           angle, self.pointlist)
+            x = self.position.x
+            y = self.position.y
+            self.transformedPointlist = [[px + x, py + y]
+                                         for px, py in rotated]
+        else:
+            newPointList = [self.rotatePoint(point)
+                            for point in self.pointlist]
+            self.transformedPointlist = [
+                self.translatePoint(point) for point in newPointList]
+
+    # The bounding rect of the outline where the sprite is now, from the
+    # extents of the rotated outline so nothing is transformed or drawn.
+    # Rotated points are whole numbers, so this is the same rect aalines
+    # reports for the transformed points (right and bottom pixels included)
+    def bounds(self):
+        angle = self.angle
+        if angle == int(angle):
+            left, top, right, bottom = rotationCache.extents(
+                self.getShapeId(), self.shapeScale, angle, self.pointlist)
+        else:
+            left, top, right, bottom = pointlistExtents(
+                [self.rotatePoint(point) for point in self.pointlist])
+
+        position = self.position
+        x = math.floor(position.x)
+        y = math.floor(position.y)
+        return pygame.Rect(x + left, y + top, right - left + 1,
+                           bottom - top + 1)
+
+    # Draw the sprite with a Shape from the registry, the sprite keeps no
+    # points of its own
+    def useShape(self, shape):
+        self.shape = shape
+        self.pointlist = shape.points
+        self.shapeId = shape.shapeId
+        self.shapeScale = shape.scale
+
+    # The shapeId, made from the pointlist the first time for sprites whose
+    # class doesn't give one
+    def getShapeId(self):
+        if self.shapeId is None:
+            self.shapeId = tuple(tuple(point) for point in self.pointlist)
+
+        return self.shapeId
 
     # draw the sprite
     def draw(self):
-        self.rotateAndTransform()
+        if self.pretransformed:
+            self.pretransformed = False
+        else:
+            self.rotateAndTransform()
+
         return self.transformedPointlist
 
     # translate each point to the current x, y position
@@ -57,12 +199,16 @@ class VectorSprite:
         newPoint.append(point[1] + self.position.y)
         return newPoint
 
-    # Move the sprite by the velocity
+    # Move the sprite by the velocity. Sprites in an EntityStore are moved by
+    # the store, all at once
     def move(self):
-        # Apply velocity
-        self.position.x = self.position.x + self.heading.x
-        self.position.y = self.position.y + self.heading.y
-        self.angle = self.angle + self.vAngle
+        if self.store is not None:
+            return
+
+        # Apply velocity, outside a store the vectors and angle are the
+        # sprite's own so skip the properties
+        self._position += self._heading
+        self._angle += self._vAngle
 
         # needed?
         # self.rotateAndTransform()
@@ -70,8 +216,8 @@ class VectorSprite:
     # Rotate a point by the given angle
     def rotatePoint(self, point):
         newPoint = []
-        cosVal = math.cos(radians(self.angle))
-        sinVal = math.sin(radians(self.angle))
+        cosVal = math.cos(radians(self.angle % 360))
+        sinVal = math.sin(radians(self.angle % 360))
         newPoint.append(point[0] * cosVal + point[1] * sinVal)
         newPoint.append(point[1] * cosVal - point[0] * sinVal)
 
@@ -88,22 +234,37 @@ class VectorSprite:
         newPoint = [int(point) for point in newPoint]
         return newPoint
 
-    def collidesWith(self, target):
-        if self.boundingRect.colliderect(target.boundingRect):
-            return True
-        else:
-            return False
+    # Goes through the tiers of the shared NarrowPhase, which keeps count of
+    # the pairs each tier rules out
+    def collidesWith(self, target, boxIsEnough=False):
+        return narrowPhase.collide(self, target, boxIsEnough)
+
+    # Furthest the outline reaches from the position at any angle, from
+    # the shared Shape when there is one
+    def boundingRadius(self):
+        shape = self.shape
+        if shape is not None and shape.points is self.pointlist:
+            return shape.radius
+
+        return max(math.hypot(x, y) for x, y in self.pointlist)
 
     # Check each line from pointlist1 for intersection with
-    # the lines in pointlist2
+    # the lines in pointlist2. Big outlines are checked in one vectorized
+    # pass, for the game's shapes the plain loop is quicker
     def checkPolygonCollision(self, target):
-        for i in range(0, len(self.transformedPointlist)):
-            for j in range(0, len(target.transformedPointlist)):
-                p1 = self.transformedPointlist[i-1]
-                p2 = self.transformedPointlist[i]
-                p3 = target.transformedPointlist[j-1]
-                p4 = target.transformedPointlist[j]
-                p = calculateIntersectPoint(p1, p2, p3, p4)
+        pointlist1 = self.transformedPointlist
+        pointlist2 = target.transformedPointlist
+        if polygonIntersectAvailable and \
+                len(pointlist1) * len(pointlist2) > self.vectorizedEdgePairs:
+            return polygonIntersectPoint(pointlist1, pointlist2)
+
+        for i in range(0, len(pointlist1)):
+            for j in range(0, len(pointlist2)):
+                p1 = pointlist1[i-1]
+                p2 = pointlist1[i]
+                p3 = pointlist2[j-1]
+                p4 = pointlist2[j]
+                p = segmentIntersectPoint(p1, p2, p3, p4)
                 if (p != None):
                     return p
 
@@ -115,10 +276,24 @@ class VectorSprite:
 class Point(VectorSprite):
 
     # Class attributes
-    pointlist = [(0, 0), (1, 1), (1, 0), (0, 1)]
+    outline = [(0, 0), (1, 1), (1, 0), (0, 1)]
+    isPoint = True
 
     def __init__(self, position, heading, stage):
-        VectorSprite.__init__(self, position, heading, self.pointlist)
+        shape = shapeRegistry.get('point')
+        VectorSprite.__init__(self, position, heading, shape.points)
+        self.useShape(shape)
+        self.stage = stage
+        self.ttl = 30
+
+    # Put a pooled point back as it was when new, keeping its vectors
+    def reset(self, position, heading, stage):
+        self.position.set(position.x, position.y)
+        self.heading.set(heading.x, heading.y)
+        self.angle = 0
+        self.vAngle = 0
+        self.color = (255, 255, 255)
+        self.pretransformed = False
         self.stage = stage
         self.ttl = 30
 
@@ -128,3 +303,8 @@ class Point(VectorSprite):
             self.stage.removeSprite(self)
 
         VectorSprite.move(self)
+
+
+shapeRegistry.register('point', Point.outline)
+
+Point.pool = ObjectPool(Point)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the batch runner
+Tests controllers, per game results and the CSV and JSON lines output
+"""
+
+import unittest
+import sys
+import os
+import io
+import json
+
+# Mock sound manager FIRST before any other imports
+sys.path.insert(0, os.path.dirname(__file__))
+import mock_soundManager
+sys.modules['soundManager'] = mock_soundManager
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from batch import (runGame, runGames, findController, CsvWriter,
+                   JsonLinesWriter, SpinnerController, resultFields)
+from asteroids import Asteroids
+
+
+class TestControllers(unittest.TestCase):
+    """Test controllers are found by name"""
+
+    def test_builtin(self):
+        """Test the built in controllers by name"""
+        self.assertIs(findController('spinner'), SpinnerController)
+
+    def test_module_and_class(self):
+        """Test any class can be given as module:Class"""
+        self.assertIs(findController('batch:SpinnerController'),
+                      SpinnerController)
+
+    def test_unknown(self):
+        """Test an unknown name is refused"""
+        with self.assertRaises(ValueError):
+            findController('nobody')
+
+
+class TestRunGame(unittest.TestCase):
+    """Test playing single games"""
+
+    def test_same_seed_same_result(self):
+        """Test a game is decided by its seed and controller"""
+        first = runGame(3, 'random', 1500)
+        second = runGame(3, 'random', 1500)
+
+        self.assertEqual(first, second)
+        self.assertEqual(set(first), set(resultFields))
+
+    def test_out_of_time(self):
+        """Test a game still going at maxTicks ends alive"""
+        result = runGame(1, 'idle', 10)
+
+        self.assertEqual(result['frames'], 10)
+        self.assertEqual(result['cause'], 'alive')
+        self.assertEqual(result['level'], 1)
+
+    def test_played_to_the_end(self):
+        """Test a game ends when the last ship is destroyed"""
+        result = runGame(1, 'idle', 100000)
+
+        self.assertLess(result['frames'], 100000)
+        self.assertIn(result['cause'], ('rock', 'saucer', 'saucer bullet'))
+
+    def test_level_counted(self):
+        """Test clearing the rocks moves the game up a level"""
+        game = Asteroids(headless=True, seed=1)
+        game.initialiseGame()
+        game.levelUp()
+        self.assertEqual(game.level, 2)
+
+
+class TestRunGames(unittest.TestCase):
+    """Test playing many games"""
+
+    def test_every_seed_played(self):
+        """Test each seed gives one result"""
+        results = list(runGames(range(4), 'spinner', 200, workers=1))
+        self.assertEqual([result['seed'] for result in results],
+                         [0, 1, 2, 3])
+
+    def test_pool_matches_one_process(self):
+        """Test games played on a pool give the same results"""
+        alone = list(runGames(range(4), 'random', 300, workers=1))
+        pooled = list(runGames(range(4), 'random', 300, workers=2))
+
+        self.assertEqual(sorted(pooled, key=lambda result: result['seed']),
+                         alone)
+
+
+class TestWriters(unittest.TestCase):
+    """Test the results are written out"""
+
+    result = {'seed': 5, 'controller': 'idle', 'score': 150, 'level': 1,
+              'frames': 900, 'cause': 'rock'}
+
+    def test_csv(self):
+        """Test a header then one row a game"""
+        f = io.StringIO()
+        CsvWriter(f).write(self.result)
+
+        self.assertEqual(f.getvalue().splitlines(),
+                         ['seed,controller,score,level,frames,cause',
+                          '5,idle,150,1,900,rock'])
+
+    def test_json_lines(self):
+        """Test one JSON object a line"""
+        f = io.StringIO()
+        writer = JsonLinesWriter(f)
+        writer.write(self.result)
+        writer.write(self.result)
+
+        lines = f.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0]), self.result)
+
+
+if __name__ == '__main__':
+    unittest.main()
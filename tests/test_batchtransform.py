@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Unit tests for BatchTransform
+Tests the vectorized rotate and translate of all sprite outlines
+"""
+
+import unittest
+import math
+import sys
+import os
+
+# Mock sound manager FIRST before any other imports
+sys.path.insert(0, os.path.dirname(__file__))
+import mock_soundManager
+sys.modules['soundManager'] = mock_soundManager
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from util.vector2d import Vector2d
+from util.vectorsprites import VectorSprite
+from util.batchtransform import BatchTransform, batchTransformAvailable
+from util.entitystore import EntityStore
+from ship import Ship
+from badies import Rock
+from stage import Stage
+
+
+@unittest.skipUnless(batchTransformAvailable, 'numpy not installed')
+class TestBatchTransform(unittest.TestCase):
+    """Test the batch matches the per sprite transform"""
+
+    def setUp(self):
+        """Create sprites with different shapes and angles"""
+        self.batch = BatchTransform()
+        self.sprites = []
+        for i, angle in enumerate([0, 6, 45, 90, 181, -37, 359.5]):
+            pointlist = [(0, -10), (6 + i, 10), (3, 7), (-3, 7 - i)]
+            sprite = VectorSprite(Vector2d(100 + i * 7.5, 50 - i * 3.25),
+                                  Vector2d(0, 0), pointlist, angle)
+            self.sprites.append(sprite)
+
+    def test_matches_rotate_and_transform(self):
+        """Test batch points equal the VectorSprite maths"""
+        self.batch.transform(self.sprites)
+        for sprite in self.sprites:
+            batched = sprite.transformedPointlist.tolist()
+            sprite.rotateAndTransform()
+            self.assertEqual(batched, sprite.transformedPointlist)
+
+    def test_views_share_one_array(self):
+        """Test each sprite is handed a view onto the batch"""
+        self.batch.transform(self.sprites)
+        for sprite in self.sprites:
+            self.assertIs(sprite.transformedPointlist.base,
+                          self.batch.transformedPoints)
+            self.assertEqual(len(sprite.transformedPointlist),
+                             len(sprite.pointlist))
+
+    def test_draw_uses_batch_once(self):
+        """Test draw returns the batch points then transforms again"""
+        sprite = self.sprites[2]
+        self.batch.transform(self.sprites)
+        batched = sprite.transformedPointlist
+        self.assertIs(sprite.draw(), batched)
+
+        sprite.position.x += 10
+        self.assertIsInstance(sprite.draw(), list)
+
+    def test_rects_match_points(self):
+        """Test each sprite's batchRect covers its points like bounds()"""
+        self.batch.transform(self.sprites)
+        for sprite in self.sprites:
+            xs = [x for x, y in sprite.transformedPointlist.tolist()]
+            ys = [y for x, y in sprite.transformedPointlist.tolist()]
+            left = math.floor(min(xs))
+            top = math.floor(min(ys))
+            self.assertEqual(sprite.batchRect,
+                             (left, top, math.floor(max(xs)) - left + 1,
+                              math.floor(max(ys)) - top + 1))
+            self.assertEqual(sprite.batchRect, sprite.bounds())
+
+    def test_read_from_store(self):
+        """Test sprites in a store give the same points read from its
+        arrays"""
+        self.batch.transform(self.sprites)
+        expected = [sprite.transformedPointlist.tolist()
+                    for sprite in self.sprites]
+        store = EntityStore()
+        for sprite in self.sprites:
+            store.add(sprite)
+
+        self.batch.transform(self.sprites, store)
+        self.assertEqual([sprite.transformedPointlist.tolist()
+                          for sprite in self.sprites], expected)
+
+    def test_invisible_sprites_skipped(self):
+        """Test sprites that are not visible are not transformed"""
+        sprite = self.sprites[0]
+        sprite.visible = False
+        self.batch.transform(self.sprites)
+        self.assertFalse(sprite.pretransformed)
+        self.assertEqual(len(self.batch.transformedPoints),
+                         sum(len(s.pointlist) for s in self.sprites[1:]))
+
+    def test_empty(self):
+        """Test transforming no sprites does nothing"""
+        self.batch.transform([])
+        self.assertIsNone(self.batch.transformedPoints)
+
+
+@unittest.skipUnless(batchTransformAvailable, 'numpy not installed')
+class TestStageWithBatchTransform(unittest.TestCase):
+    """Test a stage drawing through the batch transform"""
+
+    def test_bounding_rects_match(self):
+        """Test bounding rects match a stage without the batch"""
+        stages = [Stage('Test', (800, 600), headless=True),
+                  Stage('Test', (800, 600), headless=True,
+                        batchTransform=True)]
+        rects = []
+        for stage in stages:
+            ship = Ship(stage)
+            ship.angle = 36
+            stage.addSprite(ship)
+            Rock.rockShape = 2
+            rock = Rock(stage, Vector2d(300, 200), Rock.mediumRockType)
+            rock.angle = 17
+            stage.addSprite(rock)
+            stage.drawSprites()
+            rects.append([ship.boundingRect, rock.boundingRect])
+
+        self.assertEqual(rects[0], rects[1])
+
+    def test_rects_from_batch(self):
+        """Test the stage uses the rects worked out by the batch"""
+        stage = Stage('Test', (800, 600), headless=True, batchTransform=True)
+        ship = Ship(stage)
+        stage.addSprite(ship)
+        rock = Rock(stage, Vector2d(300, 200), Rock.mediumRockType)
+        stage.addSprite(rock)
+        stage.moveSprites()
+        stage.updateSprites()
+
+        self.assertIs(ship.boundingRect, ship.batchRect)
+        self.assertIs(rock.boundingRect, rock.batchRect)
+        self.assertFalse(rock.pretransformed)
+
+    def test_collision_with_batch_points(self):
+        """Test polygon collision works on the batch views"""
+        stage = Stage('Test', (800, 600), headless=True, batchTransform=True)
+        ship = Ship(stage)
+        stage.addSprite(ship)
+        rock = Rock(stage, Vector2d(400, 335), Rock.largeRockType)
+        stage.addSprite(rock)
+        stage.drawSprites()
+
+        self.assertTrue(rock.collidesWith(ship))
+        self.assertIsNotNone(rock.checkPolygonCollision(ship))
+
+
+if __name__ == '__main__':
+    unittest.main()
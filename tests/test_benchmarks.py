@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the frame pipeline benchmarks
+Tests the scenarios run, with and without drawing
+"""
+
+import argparse
+import unittest
+import sys
+import os
+
+# Mock sound manager FIRST before any other imports
+sys.path.insert(0, os.path.dirname(__file__))
+import mock_soundManager
+sys.modules['soundManager'] = mock_soundManager
+
+# Add parent and benchmarks directories to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..',
+                                'benchmarks'))
+
+import run_benchmarks
+
+
+def options(**changes):
+    """The command line defaults for a short run"""
+    values = dict(frames=3, warmup=1, seed=1, headless=False,
+                  entity_store=False, batch_transform=False,
+                  dirty_rects=False, sprite_atlas=False)
+    values.update(changes)
+    return argparse.Namespace(**values)
+
+
+class TestRunScenario(unittest.TestCase):
+    """Test a scenario runs and times each stage"""
+
+    def test_headless(self):
+        """Test a headless scenario runs with nothing drawn"""
+        results = run_benchmarks.runScenario('wave1', options(headless=True))
+
+        for phase in run_benchmarks.phases:
+            self.assertLessEqual(results[phase]['p50'], results[phase]['p99'])
+        self.assertEqual(results['hud']['mean'], 0.0)
+        self.assertGreater(results['total']['mean'], 0.0)
+        self.assertGreater(results['sprites'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the per tick input masks and recordings
+Tests the recording format, replaying input and seeded games playing out
+the same every time
+"""
+
+import unittest
+import sys
+import os
+
+# Mock sound manager FIRST before any other imports
+sys.path.insert(0, os.path.dirname(__file__))
+import mock_soundManager
+sys.modules['soundManager'] = mock_soundManager
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from util.controls import (KeyboardInput, ReplayInput, InputRecorder,
+                           encodeRecording, decodeRecording, saveRecording,
+                           loadRecording, ROTATE_LEFT, THRUST, FIRE,
+                           HYPERSPACE, START)
+from asteroids import Asteroids
+from pygame.locals import K_SPACE, K_h, K_RETURN, K_a
+
+
+class ScriptedInput:
+    """Fires, turns and thrusts on a fixed pattern, pressing start first"""
+
+    def __init__(self):
+        self.tickCount = 0
+
+    def keyDown(self, key):
+        pass
+
+    def read(self):
+        self.tickCount += 1
+        if self.tickCount == 2:
+            return START
+        keys = 0
+        if self.tickCount % 7 == 0:
+            keys |= FIRE
+        if (self.tickCount // 50) % 3 == 0:
+            keys |= THRUST
+        if (self.tickCount // 30) % 4 == 1:
+            keys |= ROTATE_LEFT
+        if self.tickCount % 500 == 0:
+            keys |= HYPERSPACE
+        return keys
+
+
+def gameState(game):
+    """Everything that should match between two runs of the same game"""
+    return (game.score, game.lives, game.gameState, len(game.rockList),
+            [rock.shapeId for rock in game.rockList],
+            [(sprite.position.x, sprite.position.y, sprite.angle)
+             for sprite in game.stage.spriteList if sprite is not None])
+
+
+class TestRecordingFormat(unittest.TestCase):
+    """Test recordings are encoded and decoded"""
+
+    def test_round_trip(self):
+        """Test the seed and every tick come back"""
+        ticks = [0, 0, 0, FIRE, THRUST, THRUST | FIRE, 0, 0]
+        seed, decoded = decodeRecording(encodeRecording(1234, ticks))
+
+        self.assertEqual(seed, 1234)
+        self.assertEqual(decoded, ticks)
+
+    def test_runs_are_compact(self):
+        """Test a long run of the same input takes one entry"""
+        short = encodeRecording(1, [THRUST])
+        long = encodeRecording(1, [THRUST] * 10000)
+
+        self.assertEqual(len(short), len(long))
+
+    def test_empty_recording(self):
+        """Test a recording with no ticks"""
+        self.assertEqual(decodeRecording(encodeRecording(5, [])), (5, []))
+
+    def test_rejects_other_files(self):
+        """Test data that is not a recording is refused"""
+        with self.assertRaises(ValueError):
+            decodeRecording(b'not a recording at all')
+        with self.assertRaises(ValueError):
+            decodeRecording(encodeRecording(1, [FIRE])[:-1])
+
+    def test_save_and_load(self):
+        """Test recordings written to a file are read back"""
+        path = os.path.join(os.path.dirname(__file__), 'test_controls.rec')
+        try:
+            saveRecording(path, 99, [START, 0, FIRE])
+            self.assertEqual(loadRecording(path), (99, [START, 0, FIRE]))
+        finally:
+            os.remove(path)
+
+
+class TestInputs(unittest.TestCase):
+    """Test the input sources"""
+
+    def test_key_presses_act_once(self):
+        """Test a key press is only seen on the next tick"""
+        keyboard = KeyboardInput()
+        keyboard.keyDown(K_SPACE)
+        keyboard.keyDown(K_h)
+        keyboard.keyDown(K_a)
+
+        self.assertEqual(keyboard.pressed, FIRE | HYPERSPACE)
+        keyboard.pressed = 0
+        keyboard.keyDown(K_RETURN)
+        self.assertEqual(keyboard.pressed, START)
+
+    def test_replay(self):
+        """Test a replay hands back its ticks then nothing"""
+        replay = ReplayInput([FIRE, THRUST])
+
+        self.assertEqual(replay.read(), FIRE)
+        self.assertFalse(replay.finished())
+        self.assertEqual(replay.read(), THRUST)
+        self.assertTrue(replay.finished())
+        self.assertEqual(replay.read(), 0)
+
+    def test_recorder_keeps_every_tick(self):
+        """Test the recorder passes input through and keeps it"""
+        recorder = InputRecorder(ReplayInput([START, 0, FIRE]))
+        read = [recorder.read() for _ in range(3)]
+
+        self.assertEqual(read, [START, 0, FIRE])
+        self.assertEqual(recorder.ticks, [START, 0, FIRE])
+
+
+class TestSeededGames(unittest.TestCase):
+    """Test games play out the same from the same seed and input"""
+
+    def test_start_pressed(self):
+        """Test a headless game with controls waits for start"""
+        game = Asteroids(headless=True, seed=1,
+                         controls=ReplayInput([0, START]))
+        game.tick()
+        self.assertEqual(game.gameState, 'attract_mode')
+        game.tick()
+        self.assertEqual(game.gameState, 'playing')
+
+    def test_same_seed_same_game(self):
+        """Test two games with the same seed match"""
+        first = Asteroids(headless=True, seed=7)
+        first.playGame(2500)
+        second = Asteroids(headless=True, seed=7)
+        second.playGame(2500)
+
+        self.assertEqual(gameState(first), gameState(second))
+
+    def test_games_side_by_side(self):
+        """Test a game plays the same with another game played alongside"""
+        alone = Asteroids(headless=True, seed=7, controls=ScriptedInput())
+        for _ in range(2500):
+            alone.tick()
+
+        first = Asteroids(headless=True, seed=7, controls=ScriptedInput())
+        other = Asteroids(headless=True, seed=8, controls=ScriptedInput())
+        for _ in range(2500):
+            first.tick()
+            other.tick()
+
+        self.assertEqual(gameState(first), gameState(alone))
+
+    def test_seed_changes_game(self):
+        """Test another seed lays the rocks out differently"""
+        first = Asteroids(headless=True, seed=7)
+        second = Asteroids(headless=True, seed=8)
+
+        self.assertNotEqual(gameState(first), gameState(second))
+
+    def test_replay_matches_recording(self):
+        """Test a recorded game replays bit for bit"""
+        recorder = InputRecorder(ScriptedInput())
+        game = Asteroids(headless=True, seed=42, controls=recorder)
+        game.playGame(3000)
+        self.assertGreater(game.score, 0)
+
+        seed, ticks = decodeRecording(encodeRecording(game.seed,
+                                                      recorder.ticks))
+        replay = Asteroids(headless=True, seed=seed,
+                           controls=ReplayInput(ticks))
+        replay.playGame(len(ticks))
+
+        self.assertEqual(gameState(replay), gameState(game))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the DangerGrid
+Tests rock footprints, incremental updates and finding safe places for the
+ship to appear
+"""
+
+import unittest
+import sys
+import os
+import random
+
+# Mock sound manager FIRST before any other imports
+sys.path.insert(0, os.path.dirname(__file__))
+import mock_soundManager
+sys.modules['soundManager'] = mock_soundManager
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from util.vector2d import Vector2d
+from util.dangergrid import DangerGrid
+from badies import Rock
+from asteroids import Asteroids
+
+
+def makeRock(x, y, headingX, headingY, rockType=Rock.smallRockType):
+    """A rock at (x, y) moving on the given heading"""
+    rock = Rock(None, Vector2d(x, y), rockType)
+    rock.heading = Vector2d(headingX, headingY)
+    return rock
+
+
+class TestDangerGrid(unittest.TestCase):
+    """Test the grid of cells rocks are about to pass over"""
+
+    def setUp(self):
+        """Create an 800x600 grid with 100 pixel cells"""
+        self.grid = DangerGrid(800, 600, cellSize=100, horizon=60,
+                               margin=0)
+
+    def test_footprint_follows_heading(self):
+        """Test a rock marks the cells ahead of it and not behind"""
+        rock = makeRock(150, 350, 2, 0)
+        self.grid.update([rock])
+
+        self.assertGreater(self.grid.danger[self.grid.cellAt(150, 350)], 0)
+        self.assertGreater(self.grid.danger[self.grid.cellAt(250, 350)], 0)
+        self.assertEqual(self.grid.danger[self.grid.cellAt(50, 350)], 0)
+        self.assertEqual(self.grid.danger[self.grid.cellAt(150, 150)], 0)
+
+    def test_footprint_wraps(self):
+        """Test a rock heading off the right edge marks the left edge"""
+        rock = makeRock(780, 350, 3, 0)
+        self.grid.update([rock])
+
+        self.assertGreater(self.grid.danger[self.grid.cellAt(50, 350)], 0)
+
+    def test_only_recalculated_on_changing_cell(self):
+        """Test footprints are kept until the rock moves to another cell"""
+        rock = makeRock(110, 350, 2, 0)
+        self.grid.update([rock])
+        rock.position.x = 180
+        self.grid.update([rock])
+        self.assertEqual(self.grid.recalculations, 1)
+
+        rock.position.x = 210
+        self.grid.update([rock])
+        self.assertEqual(self.grid.recalculations, 2)
+
+    def test_kept_footprints_cover_horizon(self):
+        """Test footprints kept from earlier ticks still cover the rocks'
+        positions up to the horizon"""
+        rng = random.Random(2)
+        rocks = [makeRock(rng.uniform(0, 800), rng.uniform(0, 600),
+                          rng.uniform(-4, 4), rng.uniform(-4, 4))
+                 for _ in range(20)]
+        for _ in range(100):
+            for rock in rocks:
+                rock.move()
+            self.grid.update(rocks)
+            for rock in rocks:
+                cells = self.grid.footprints[rock][1]
+                for t in range(0, 61, 5):
+                    self.assertIn(self.grid.cellAt(
+                        rock.position.x + rock.heading.x * t,
+                        rock.position.y + rock.heading.y * t), cells)
+
+        self.assertLess(self.grid.recalculations, 20 * 100 / 4)
+
+    def test_removed_rocks_forgotten(self):
+        """Test a rock that has gone takes its danger with it"""
+        rock = makeRock(150, 350, 2, 0)
+        self.grid.update([rock])
+        self.grid.update([])
+
+        self.assertEqual(sum(self.grid.danger), 0)
+        self.assertEqual(self.grid.footprints, {})
+
+    def test_safest_point_keeps_a_safe_spot(self):
+        """Test the preferred point is used when nothing is near it"""
+        self.grid.update([makeRock(150, 150, 1, 0)])
+        self.assertEqual(self.grid.safestPoint(450, 450), (450, 450))
+
+    def test_safest_point_moves_away(self):
+        """Test the ship is moved away from a rock heading for it"""
+        rock = makeRock(300, 300, 2, 0, Rock.largeRockType)
+        self.grid.update([rock])
+        x, y = self.grid.safestPoint(400, 300)
+
+        self.assertNotEqual((x, y), (400, 300))
+        self.assertEqual(self.grid.danger[self.grid.cellAt(x, y)], 0)
+
+    def test_random_safe_point(self):
+        """Test random points are in the safest cells"""
+        rng = random.Random(1)
+        rocks = [makeRock(100 * i + 50, 300, 0, 1, Rock.largeRockType)
+                 for i in range(8)]
+        self.grid.update(rocks)
+        safest = self.grid.safestCells()
+        for _ in range(20):
+            x, y = self.grid.randomSafePoint(rng)
+            self.assertIn(self.grid.cellAt(x, y), safest)
+            self.assertEqual(self.grid.danger[self.grid.cellAt(x, y)], 0)
+
+
+class TestSafeSpawn(unittest.TestCase):
+    """Test the game uses the grid for new ships and hyperspace"""
+
+    def setUp(self):
+        """Start a headless game"""
+        self.game = Asteroids(headless=True, seed=5)
+        self.game.initialiseGame()
+
+    def test_first_ship_in_the_middle(self):
+        """Test a new game starts in the middle as always"""
+        self.assertEqual((self.game.ship.position.x,
+                          self.game.ship.position.y), (512, 384))
+
+    def test_new_ship_avoids_rocks(self):
+        """Test a new ship doesn't appear where a rock is heading"""
+        rock = Rock(self.game.stage, Vector2d(420, 384), Rock.largeRockType)
+        rock.heading = Vector2d(1.5, 0)
+        self.game.stage.addSprite(rock)
+        self.game.rockList.append(rock)
+        self.game.tick()
+        self.game.createNewShip()
+
+        ship = self.game.ship
+        self.assertNotEqual((ship.position.x, ship.position.y), (512, 384))
+        grid = self.game.dangerGrid
+        self.assertEqual(grid.danger[grid.cellAt(ship.position.x,
+                                                 ship.position.y)], 0)
+
+    def test_hyperspace_lands_safely(self):
+        """Test leaving hyperspace lands in one of the safest cells"""
+        grid = self.game.dangerGrid
+        for _ in range(10):
+            self.game.tick()
+            self.game.ship.leaveHyperSpace()
+            ship = self.game.ship
+            self.assertIn(grid.cellAt(ship.position.x, ship.position.y),
+                          grid.safestCells())
+            self.assertEqual(ship.thrustJet.position.x, ship.position.x)
+
+
+if __name__ == '__main__':
+    unittest.main()
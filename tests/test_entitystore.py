@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the EntityStore
+Tests array backed movement and wrapping of sprites
+"""
+
+import unittest
+import sys
+import os
+
+# Mock sound manager FIRST before any other imports
+sys.path.insert(0, os.path.dirname(__file__))
+import mock_soundManager
+sys.modules['soundManager'] = mock_soundManager
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from util.vector2d import Vector2d
+from util.vectorsprites import VectorSprite
+from util.entitystore import EntityStore, entityStoreAvailable
+from ship import Ship
+from badies import Rock
+from stage import Stage
+
+
+@unittest.skipUnless(entityStoreAvailable, 'numpy not installed')
+class TestEntityStore(unittest.TestCase):
+    """Test the struct of arrays store"""
+
+    def setUp(self):
+        """Create a store and a few sprites"""
+        self.store = EntityStore(capacity=2)
+        self.pointlist = [(0, -10), (10, 10), (-10, 10)]
+        self.sprites = [
+            VectorSprite(Vector2d(i * 10, 20), Vector2d(1, 2), self.pointlist)
+            for i in range(3)]
+
+    def test_add_copies_values(self):
+        """Test adding a sprite copies its movement into the arrays"""
+        sprite = self.sprites[0]
+        sprite.angle = 30
+        sprite.vAngle = 2
+        self.store.add(sprite)
+
+        self.assertEqual(self.store.count, 1)
+        self.assertEqual(self.store.x[0], 0)
+        self.assertEqual(self.store.y[0], 20)
+        self.assertEqual(self.store.vx[0], 1)
+        self.assertEqual(self.store.vy[0], 2)
+        self.assertEqual(self.store.angle[0], 30)
+        self.assertEqual(self.store.vAngle[0], 2)
+
+    def test_sprite_is_view(self):
+        """Test sprite attributes read and write the arrays"""
+        sprite = self.sprites[1]
+        self.store.add(sprite)
+
+        sprite.position.x = 55
+        sprite.heading.y = -3
+        sprite.angle += 6
+        self.assertEqual(self.store.x[0], 55)
+        self.assertEqual(self.store.vy[0], -3)
+        self.assertEqual(self.store.angle[0], 6)
+
+        self.store.y[0] = 99
+        self.assertEqual(sprite.position.y, 99)
+
+    def test_assigning_vector_copies_into_store(self):
+        """Test assigning a new vector keeps the sprite in the store"""
+        sprite = self.sprites[0]
+        self.store.add(sprite)
+        sprite.position = Vector2d(7, 8)
+
+        self.assertEqual(self.store.x[0], 7)
+        self.assertEqual(self.store.y[0], 8)
+
+    def test_views_do_vector_maths(self):
+        """Test the views have the Vector2d operations"""
+        sprite = self.sprites[2]
+        self.store.add(sprite)
+
+        sprite.heading += Vector2d(1, 1)
+        self.assertIsInstance(sprite.heading, Vector2d)
+        self.assertEqual((self.store.vx[0], self.store.vy[0]), (2, 3))
+
+        copy = sprite.position.copy()
+        copy.x = 500
+        self.assertEqual(self.store.x[0], 20)
+        self.assertEqual(tuple(sprite.position), (20, 20))
+
+    def test_grows(self):
+        """Test the store grows past its initial capacity"""
+        for sprite in self.sprites:
+            self.store.add(sprite)
+
+        self.assertEqual(self.store.count, 3)
+        self.assertGreaterEqual(self.store.capacity, 3)
+        self.assertEqual(self.sprites[0].position.x, 0)
+        self.assertEqual(self.sprites[2].position.x, 20)
+
+    def test_step(self):
+        """Test one step applies velocity and angular velocity"""
+        sprite = self.sprites[1]
+        sprite.vAngle = 5
+        self.store.add(sprite)
+        self.store.step()
+        self.store.wrap(800, 600)
+
+        self.assertEqual(sprite.position.x, 11)
+        self.assertEqual(sprite.position.y, 22)
+        self.assertEqual(sprite.angle, 5)
+
+    def test_step_wraps(self):
+        """Test step wraps positions like Stage.moveSprites"""
+        sprite = self.sprites[0]
+        sprite.heading = Vector2d(-5, 590)
+        self.store.add(sprite)
+        self.store.step()
+        self.store.wrap(800, 600)
+
+        self.assertEqual(sprite.position.x, 800)
+        self.assertEqual(sprite.position.y, 0)
+
+    def test_near(self):
+        """Test only sprites within reach of a box are found"""
+        for sprite in self.sprites:
+            self.store.add(sprite)
+
+        self.assertEqual(self.store.near([(12, 22, 3, 3)]), [self.sprites[1]])
+        self.assertEqual(self.store.near([(0, 20, 10, 0), (20, 0, 0, 20)]),
+                         self.sprites)
+        self.assertEqual(self.store.near([(100, 100, 20, 20)]), [])
+        self.assertEqual(self.store.near([]), [])
+
+    def test_remove_keeps_others(self):
+        """Test removing a sprite moves the last slot into the hole"""
+        for sprite in self.sprites:
+            self.store.add(sprite)
+
+        self.store.remove(self.sprites[0])
+
+        self.assertEqual(self.store.count, 2)
+        self.assertEqual(self.sprites[2].storeSlot, 0)
+        self.assertEqual(self.sprites[2].position.x, 20)
+        self.assertEqual(self.sprites[1].position.x, 10)
+
+    def test_removed_sprite_keeps_values(self):
+        """Test a removed sprite carries on with its own vectors"""
+        sprite = self.sprites[0]
+        self.store.add(sprite)
+        self.store.step()
+        self.store.wrap(800, 600)
+        self.store.remove(sprite)
+
+        self.assertIsNone(sprite.store)
+        self.assertIsInstance(sprite.position, Vector2d)
+        self.assertEqual(sprite.position.x, 1)
+        self.assertEqual(sprite.position.y, 22)
+        sprite.move()
+        self.assertEqual(sprite.position.x, 2)
+
+
+@unittest.skipUnless(entityStoreAvailable, 'numpy not installed')
+class TestStageWithEntityStore(unittest.TestCase):
+    """Test a stage moving its sprites through the store"""
+
+    def setUp(self):
+        """Create a headless stage using the store"""
+        self.stage = Stage('Test', (800, 600), headless=True,
+                           entityStore=True)
+
+    def test_rocks_move_and_spin(self):
+        """Test rocks are moved by the store"""
+        rock = Rock(self.stage, Vector2d(100, 100), Rock.largeRockType)
+        x, y = rock.position.x, rock.position.y
+        self.stage.addSprite(rock)
+        self.stage.moveSprites()
+
+        self.assertAlmostEqual(rock.position.x, x + rock.heading.x)
+        self.assertAlmostEqual(rock.position.y, y + rock.heading.y)
+        self.assertEqual(rock.angle, 1)
+        self.assertNotIn(rock, self.stage.behaviourList)
+
+    def test_ship_still_decelerates(self):
+        """Test sprites with their own move logic still run it"""
+        ship = Ship(self.stage)
+        self.stage.addSprite(ship)
+        ship.heading.x = 5
+        self.stage.moveSprites()
+
+        self.assertEqual(ship.position.x, 405)
+        self.assertLess(ship.heading.x, 5)
+
+    def test_bullets_expire(self):
+        """Test bullets are removed from the store when they expire"""
+        ship = Ship(self.stage)
+        self.stage.addSprite(ship)
+        ship.fireBullet()
+        bullet = ship.bullets[0]
+
+        for _ in range(Ship.bulletTtl):
+            self.stage.moveSprites()
+
+        self.assertNotIn(bullet, self.stage.spriteList)
+        self.assertEqual(len(ship.bullets), 0)
+        self.assertEqual(self.stage.store.count, 1)
+
+    def test_wrap(self):
+        """Test sprites wrap around the screen"""
+        ship = Ship(self.stage)
+        self.stage.addSprite(ship)
+        ship.position.x = 810
+        self.stage.moveSprites()
+
+        self.assertEqual(ship.position.x, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
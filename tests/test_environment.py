@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the reset/step environment
+Tests actions, observations, rewards and stepping several games at once
+"""
+
+import unittest
+import sys
+import os
+
+# Mock sound manager FIRST before any other imports
+sys.path.insert(0, os.path.dirname(__file__))
+import mock_soundManager
+sys.modules['soundManager'] = mock_soundManager
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from environment import (AsteroidsEnv, VectorAsteroidsEnv,
+                         environmentAvailable)
+from ship import Ship
+
+if environmentAvailable:
+    import numpy
+
+
+def actionIndex(name):
+    """The index of the named action"""
+    return AsteroidsEnv.actionNames.index(name)
+
+
+@unittest.skipUnless(environmentAvailable, 'numpy not installed')
+class TestAsteroidsEnv(unittest.TestCase):
+    """Test a single environment"""
+
+    def setUp(self):
+        """Start a seeded game"""
+        self.env = AsteroidsEnv(seed=1)
+        self.observation = self.env.reset()
+
+    def test_observation(self):
+        """Test the first observation describes the ship and rocks"""
+        self.assertEqual(self.observation.shape,
+                         (AsteroidsEnv.observationSize,))
+        self.assertEqual(self.observation.dtype, numpy.float32)
+        self.assertEqual(list(self.observation[:2]), [0.5, 0.5])
+        self.assertTrue(numpy.all(numpy.abs(self.observation) <= 1.0))
+
+        # Three rocks, nearest first
+        rocks = self.observation[16:].reshape(AsteroidsEnv.maxRocks, 6)
+        self.assertEqual(list(rocks[:, 0]), [1, 1, 1, 0, 0, 0, 0, 0])
+        distances = (rocks[:3, 1] * 512) ** 2 + (rocks[:3, 2] * 384) ** 2
+        self.assertEqual(list(distances), sorted(distances))
+
+    def test_rotate_actions(self):
+        """Test the rotate actions turn the ship"""
+        self.env.step(actionIndex('rotateLeft'))
+        self.assertEqual(self.env.game.ship.angle, Ship.turnAngle)
+        self.env.step(actionIndex('rotateRight'))
+        self.assertEqual(self.env.game.ship.angle, 0)
+
+    def test_thrust_action(self):
+        """Test thrust moves the ship"""
+        self.env.step(actionIndex('increaseThrust'))
+        self.assertLess(self.env.game.ship.heading.y, 0)
+
+    def test_fire_action(self):
+        """Test fire shoots a bullet"""
+        self.env.step(actionIndex('fireBullet'))
+        self.assertEqual(len(self.env.game.ship.bullets), 1)
+
+    def test_hyperspace_action(self):
+        """Test hyperspace takes the ship out of play"""
+        self.env.step(actionIndex('enterHyperSpace'))
+        self.assertTrue(self.env.game.ship.inHyperSpace)
+
+    def test_reward_is_score_gained(self):
+        """Test the rewards add up to the score"""
+        total = 0.0
+        for step in range(2000):
+            _, reward, done, info = self.env.step(step % 6)
+            total += reward
+            if done:
+                break
+
+        self.assertGreater(total, 0)
+        self.assertEqual(total, info['score'])
+
+    def test_done_when_last_ship_lost(self):
+        """Test the game is over with the last ship"""
+        game = self.env.game
+        game.lives = 1
+        game.killShip('rock')
+        _, _, done, info = self.env.step(0)
+
+        self.assertTrue(done)
+        self.assertFalse(info['truncated'])
+
+    def test_max_ticks(self):
+        """Test a game is cut short at maxTicks"""
+        env = AsteroidsEnv(seed=1, frameSkip=4, maxTicks=8)
+        env.reset()
+        self.assertFalse(env.step(0)[2])
+        _, _, done, info = env.step(0)
+
+        self.assertTrue(done)
+        self.assertTrue(info['truncated'])
+        self.assertEqual(info['ticks'], 8)
+
+    def test_ray_observations(self):
+        """Test ray sensor distances are added to the observation"""
+        env = AsteroidsEnv(seed=1, numRays=16)
+        observation = env.reset()
+
+        self.assertEqual(env.observationSize,
+                         AsteroidsEnv.observationSize + 16)
+        self.assertEqual(observation.shape, (env.observationSize,))
+        rays = observation[AsteroidsEnv.observationSize:]
+        self.assertTrue(numpy.all((rays > 0) & (rays <= 1)))
+
+    def test_same_seed_same_game(self):
+        """Test the same seed and actions give the same observations"""
+        other = AsteroidsEnv(seed=1)
+        other.reset()
+        for step in range(300):
+            first = self.env.step(step % 6)[0]
+            second = other.step(step % 6)[0]
+
+        self.assertTrue(numpy.array_equal(first, second))
+
+    def test_same_seed_beside_other_games(self):
+        """Test a seeded game steps the same with other games in between"""
+        def action(step):
+            """Turn and fire in turn, so rocks are broken often"""
+            return 4 if step % 2 else 1
+
+        def played(env, step):
+            """The observation and the rocks' shapes after a step"""
+            observation = env.step(action(step))[0]
+            return observation, [rock.shapeId for rock in env.game.rockList]
+
+        alone = AsteroidsEnv(seed=11)
+        alone.reset()
+        expected = [played(alone, step) for step in range(600)]
+
+        first = AsteroidsEnv(seed=11)
+        other = AsteroidsEnv(seed=12)
+        first.reset()
+        other.reset()
+        for step in range(600):
+            observation, shapes = played(first, step)
+            self.assertTrue(numpy.array_equal(observation, expected[step][0]),
+                            'step %d' % step)
+            self.assertEqual(shapes, expected[step][1], 'step %d' % step)
+
+            # The other game is played too and started again now and then
+            if other.step(action(step + 1))[2] or step % 200 == 199:
+                other.reset()
+
+
+@unittest.skipUnless(environmentAvailable, 'numpy not installed')
+class TestVectorAsteroidsEnv(unittest.TestCase):
+    """Test stepping several games in lockstep"""
+
+    def test_batched_arrays(self):
+        """Test observations, rewards and dones come back as arrays"""
+        envs = VectorAsteroidsEnv(3, seed=2)
+        observations = envs.reset()
+        self.assertEqual(observations.shape,
+                         (3, AsteroidsEnv.observationSize))
+
+        observations, rewards, dones, infos = envs.step([0, 1, 4])
+        self.assertEqual(observations.shape,
+                         (3, AsteroidsEnv.observationSize))
+        self.assertEqual(rewards.shape, (3,))
+        self.assertEqual(dones.dtype, bool)
+        self.assertEqual(len(infos), 3)
+
+    def test_games_are_separate(self):
+        """Test each game only gets its own action"""
+        envs = VectorAsteroidsEnv(2, seed=2)
+        envs.reset()
+        envs.step(numpy.array([actionIndex('rotateLeft'), 0]))
+
+        self.assertEqual(envs.envs[0].game.ship.angle, Ship.turnAngle)
+        self.assertEqual(envs.envs[1].game.ship.angle, 0)
+
+    def test_finished_games_restart(self):
+        """Test a game that ends is reset and its last observation kept"""
+        envs = VectorAsteroidsEnv(2, seed=2, maxTicks=3)
+        envs.reset()
+        envs.step([0, 0])
+        envs.step([0, 0])
+        observations, _, dones, infos = envs.step([0, 0])
+
+        self.assertEqual(list(dones), [True, True])
+        self.assertIn('terminalObservation', infos[0])
+        self.assertEqual(envs.envs[0].ticks, 0)
+        self.assertEqual(list(observations[0, :2]), [0.5, 0.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the FrameProfiler
+Tests stage laps, the frame history and percentiles, and the overlay
+"""
+
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Mock sound manager FIRST before any other imports
+sys.path.insert(0, os.path.dirname(__file__))
+import mock_soundManager
+sys.modules['soundManager'] = mock_soundManager
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from util.frameprofiler import FrameProfiler, percentile
+from util.textcache import TextCache
+from util.controls import ReplayInput
+from asteroids import Asteroids
+import pygame
+
+FONT_PATH = os.path.join(os.path.dirname(__file__), '..', 'res',
+                         'Hyperspace.otf')
+
+
+class TestFrameProfiler(unittest.TestCase):
+    """Test the per stage frame timings"""
+
+    def setUp(self):
+        """Create a profiler keeping ten frames"""
+        self.profiler = FrameProfiler(historyLength=10)
+
+    def runFrame(self, elapsed, laps):
+        """Record a frame with the given (stage, seconds) laps"""
+        clock = [0.0]
+
+        def perfCounter():
+            return clock[0]
+
+        with mock.patch('util.frameprofiler.time.perf_counter',
+                        perfCounter):
+            self.profiler.startFrame(elapsed)
+            for stageName, seconds in laps:
+                clock[0] += seconds
+                self.profiler.lap(stageName)
+            self.profiler.endFrame()
+
+    def test_laps_charged_to_stages(self):
+        """Test the time since the last lap goes to the stage"""
+        self.runFrame(16, [('input', 0.001), ('move', 0.002),
+                           ('draw', 0.003), ('draw', 0.001)])
+        frameTime, stages = self.profiler.history[0]
+
+        self.assertEqual(frameTime, 16)
+        self.assertAlmostEqual(stages['input'], 1.0)
+        self.assertAlmostEqual(stages['move'], 2.0)
+        self.assertAlmostEqual(stages['draw'], 4.0)
+        self.assertEqual(stages['flip'], 0.0)
+        self.assertAlmostEqual(self.profiler.workTimes()[0], 7.0)
+
+    def test_history_is_rolling(self):
+        """Test only the last historyLength frames are kept"""
+        for frame in range(15):
+            self.runFrame(frame, [])
+
+        self.assertEqual(self.profiler.frameTimes(), list(range(5, 15)))
+
+    def test_stats(self):
+        """Test percentiles, worst frame and stage means"""
+        for frame in range(1, 11):
+            self.runFrame(frame, [('move', frame / 1000.0)])
+        stats = self.profiler.stats()
+
+        self.assertEqual(stats['frames'], 10)
+        self.assertEqual(stats['p95'], 10)
+        self.assertEqual(stats['max'], 10)
+        self.assertAlmostEqual(stats['stages']['move']['mean'], 5.5)
+        self.assertAlmostEqual(stats['stages']['move']['max'], 10.0)
+
+    def test_no_frames(self):
+        """Test the stats of an empty history"""
+        stats = self.profiler.stats()
+        self.assertEqual(stats['frames'], 0)
+        self.assertEqual(stats['stages'], {})
+
+    def test_percentile(self):
+        """Test nearest rank percentiles"""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3], 99), 3)
+
+
+class TestProfilerOverlay(unittest.TestCase):
+    """Test the game records frames and draws the overlay"""
+
+    def setUp(self):
+        """Play a few ticks of a headless game"""
+        pygame.font.init()
+        self.game = Asteroids(headless=True, seed=1)
+        self.game.textCache = TextCache(FONT_PATH)
+        self.game.playGame(20)
+
+    def drawOffscreen(self):
+        """Play a few ticks of a game drawn onto an off screen surface"""
+        self.game = Asteroids(seed=1, dirtyRects=True,
+                              controls=ReplayInput([]),
+                              surface=pygame.Surface((1024, 768)))
+        self.game.textCache = TextCache(FONT_PATH)
+        self.game.initialiseGame()
+        for _ in range(20):
+            self.game.profiler.startFrame(16)
+            self.game.tick()
+            self.game.profiler.endFrame()
+        self.game.stage.clearScreen()
+
+    def test_headless_frames_recorded(self):
+        """Test every headless tick is a frame in the history"""
+        self.assertEqual(len(self.game.profiler.history), 20)
+
+    def test_tick_stages(self):
+        """Test the danger grid, game logic and collisions are separate laps"""
+        game = self.game
+        clock = [0.0]
+
+        def taking(seconds, method):
+            """Wrap the method so it takes the given time on the clock"""
+            def timed(*args):
+                clock[0] += seconds
+                return method(*args)
+            return timed
+
+        game.updateDangerGrid = taking(0.002, game.updateDangerGrid)
+        game.processKeys = taking(0.005, game.processKeys)
+        game.checkCollisions = taking(0.003, game.checkCollisions)
+        self.assertEqual(game.gameState, 'playing')
+
+        with mock.patch('util.frameprofiler.time.perf_counter',
+                        lambda: clock[0]):
+            game.profiler.startFrame(16)
+            game.tick()
+            game.profiler.endFrame()
+        stages = game.profiler.history[-1][1]
+
+        self.assertAlmostEqual(stages['danger'], 2.0)
+        self.assertAlmostEqual(stages['game'], 5.0)
+        self.assertAlmostEqual(stages['collisions'], 3.0)
+        self.assertAlmostEqual(stages['saucer'], 0.0)
+
+    def test_overlay(self):
+        """Test the overlay lists the stages, collision pairs and sprites"""
+        self.drawOffscreen()
+        self.game.displayProfiler()
+
+        names = [row[0] for row in self.game.profilerRows]
+        self.assertEqual(names[1:-2], list(FrameProfiler.stageNames))
+        self.assertTrue(names[-2].startswith('pairs'))
+        self.assertEqual([cell.split()[0] for cell in
+                          self.game.profilerRows[-2][1:]],
+                         ['circle', 'box', 'exact', 'hits', 'boxHits'])
+        self.assertIn('Rock 3', names[-1])
+        self.assertIn('Ship 3', names[-1])
+        self.assertEqual(len(self.game.stage.drawnRects),
+                         sum(len(row) for row in self.game.profilerRows) + 4)
+
+    def test_overlay_refresh(self):
+        """Test the figures are only worked out every profilerRefresh"""
+        self.drawOffscreen()
+        self.game.displayProfiler()
+        rows = self.game.profilerRows
+        self.game.tick()
+        self.game.displayProfiler()
+        self.assertIs(self.game.profilerRows, rows)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,8 +18,11 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from util.vector2d import Vector2d
 from ship import Ship
-from badies import Rock, Saucer
+from badies import Rock, Saucer, Debris
 from stage import Stage
+from asteroids import Asteroids
+from util.vectorsprites import VectorSprite
+from unittest import mock
 import pygame
 
 
@@ -30,7 +33,7 @@ class TestShipPhysics(unittest.TestCase):
     def setUpClass(cls):
         """Initialize pygame and stage once"""
         pygame.init()
-        cls.stage = Stage('Test', (800, 600))
+        cls.stage = Stage('Test', (800, 600), headless=True)
 
     def setUp(self):
         """Create a new ship for each test"""
@@ -126,7 +129,7 @@ class TestRockBehavior(unittest.TestCase):
     def setUpClass(cls):
         """Initialize pygame and stage once"""
         pygame.init()
-        cls.stage = Stage('Test', (800, 600))
+        cls.stage = Stage('Test', (800, 600), headless=True)
 
     def setUp(self):
         """Set up test fixtures"""
@@ -196,7 +199,7 @@ class TestSaucerBehavior(unittest.TestCase):
     def setUpClass(cls):
         """Initialize pygame and stage once"""
         pygame.init()
-        cls.stage = Stage('Test', (800, 600))
+        cls.stage = Stage('Test', (800, 600), headless=True)
 
     def setUp(self):
         """Create ship and saucer"""
@@ -247,7 +250,7 @@ class TestScreenWrapping(unittest.TestCase):
     def setUpClass(cls):
         """Initialize pygame and stage once"""
         pygame.init()
-        cls.stage = Stage('Test', (800, 600))
+        cls.stage = Stage('Test', (800, 600), headless=True)
 
     def setUp(self):
         """Create a ship for testing"""
@@ -291,7 +294,7 @@ class TestCollisionDetection(unittest.TestCase):
     def setUpClass(cls):
         """Initialize pygame and stage once"""
         pygame.init()
-        cls.stage = Stage('Test', (800, 600))
+        cls.stage = Stage('Test', (800, 600), headless=True)
 
     def setUp(self):
         """Set up game objects"""
@@ -334,6 +337,322 @@ class TestCollisionDetection(unittest.TestCase):
             self.assertTrue(collision)
 
 
+class TestHeadlessStage(unittest.TestCase):
+    """Test the stage runs the simulation without a display"""
+
+    def setUp(self):
+        """Create a headless stage"""
+        self.stage = Stage('Test', (800, 600), headless=True)
+
+    def test_no_surface(self):
+        """Test a headless stage has no screen surface"""
+        self.assertIsNone(self.stage.screen)
+        self.assertEqual(self.stage.width, 800)
+        self.assertEqual(self.stage.height, 600)
+
+    def test_bounding_rect_from_points(self):
+        """Test bounding rect is worked out from the transformed points"""
+        rock = Rock(self.stage, Vector2d(100, 100), Rock.largeRockType)
+        self.stage.addSprite(rock)
+
+        xs = [point[0] for point in rock.transformedPointlist]
+        ys = [point[1] for point in rock.transformedPointlist]
+        self.assertEqual(rock.boundingRect.left, int(min(xs)))
+        self.assertEqual(rock.boundingRect.top, int(min(ys)))
+        self.assertEqual(rock.boundingRect.right, int(max(xs)) + 1)
+        self.assertEqual(rock.boundingRect.bottom, int(max(ys)) + 1)
+
+    def test_bounding_rect_matches_aalines(self):
+        """Test headless rect matches the rect drawing would report"""
+        ship = Ship(self.stage)
+        self.stage.addSprite(ship)
+        surface = pygame.Surface((800, 600))
+        drawnRect = pygame.draw.aalines(
+            surface, ship.color, True, ship.transformedPointlist)
+        self.assertEqual(ship.boundingRect, drawnRect)
+
+    def test_bounding_rect_follows_sprite(self):
+        """Test bounding rect is updated when sprites move"""
+        ship = Ship(self.stage)
+        ship.heading = Vector2d(5, 0)
+        self.stage.addSprite(ship)
+        left = ship.boundingRect.left
+
+        self.stage.moveSprites()
+        self.stage.drawSprites()
+        self.assertEqual(ship.boundingRect.left, left + 5)
+
+    def test_rects_kept_up_when_moving(self):
+        """Test updating after a move brings the rects up to date"""
+        rock = Rock(self.stage, Vector2d(100, 100), Rock.largeRockType)
+        rock.heading = Vector2d(3, -2)
+        self.stage.addSprite(rock)
+        self.stage.moveSprites()
+        self.stage.updateSprites()
+
+        self.assertEqual(rock.boundingRect, rock.bounds())
+        self.stage.drawSprites()
+        xs = [x for x, y in rock.transformedPointlist]
+        ys = [y for x, y in rock.transformedPointlist]
+        self.assertEqual(rock.boundingRect,
+                         (min(xs), min(ys), max(xs) - min(xs) + 1,
+                          max(ys) - min(ys) + 1))
+
+    def test_hidden_ship_rect_follows_it(self):
+        """Test the ship's rect is right while it is in hyperspace"""
+        ship = Ship(self.stage)
+        self.stage.addSprite(ship)
+        ship.enterHyperSpace()
+        ship.position = Vector2d(100, 200)
+        self.stage.moveSprites()
+        self.stage.drawSprites()
+
+        self.assertTrue(ship.boundingRect.collidepoint(100, 200))
+
+    def test_adding_draws_nothing(self):
+        """Test spawning a sprite doesn't touch the screen"""
+        stage = Stage('Test', surface=pygame.Surface((800, 600)))
+        stage.screen.fill(stage.backgroundColor)
+        before = pygame.image.tostring(stage.screen, 'RGB')
+        Ship(stage).explode()
+
+        self.assertEqual(pygame.image.tostring(stage.screen, 'RGB'), before)
+
+    def test_frame_without_display(self):
+        """Test clearing, drawing and showing a frame does nothing"""
+        self.stage.addSprite(Ship(self.stage))
+        self.stage.clearScreen()
+        self.stage.drawSprites()
+        self.stage.present()
+
+        self.assertIsNone(self.stage.screen)
+
+    def test_collision_without_display(self):
+        """Test ship and rock outlines cross on a headless stage"""
+        ship = Ship(self.stage)
+        self.stage.addSprite(ship)
+        Rock.rockShape = 1
+        rock = Rock(self.stage, Vector2d(400, 335), Rock.largeRockType)
+        self.stage.addSprite(rock)
+        self.stage.drawSprites()
+
+        self.assertTrue(rock.collidesWith(ship))
+        self.assertIsNotNone(rock.checkPolygonCollision(ship))
+
+
+class Spawner(VectorSprite):
+    """Sprite that adds another sprite each time it moves"""
+
+    def __init__(self, stage):
+        VectorSprite.__init__(self, Vector2d(100, 100), Vector2d(1, 0),
+                              [(0, 0), (1, 1), (1, 0)])
+        self.stage = stage
+        self.spawned = []
+
+    def move(self):
+        VectorSprite.move(self)
+        child = VectorSprite(Vector2d(200, 200), Vector2d(1, 0),
+                             [(0, 0), (1, 1), (1, 0)])
+        self.stage.addSprite(child)
+        self.spawned.append(child)
+
+
+class TestSpriteSlots(unittest.TestCase):
+    """Test sprites are added and removed through stage slots"""
+
+    def setUp(self):
+        """Create a headless stage with a few rocks"""
+        self.stage = Stage('Test', (800, 600), headless=True)
+        self.rocks = [Rock(self.stage, Vector2d(100 * i, 100),
+                           Rock.smallRockType) for i in range(1, 5)]
+        for rock in self.rocks:
+            self.stage.addSprite(rock)
+
+    def test_slots_follow_list(self):
+        """Test each sprite's slot is its place in the sprite list"""
+        for slot, rock in enumerate(self.rocks):
+            self.assertEqual(rock.stageSlot, slot)
+            self.assertIs(self.stage.spriteList[slot], rock)
+
+    def test_remove_keeps_order(self):
+        """Test the remaining sprites keep their order and get new slots"""
+        self.stage.removeSprite(self.rocks[1])
+        self.stage.drawSprites()
+
+        self.assertEqual(self.stage.spriteList,
+                         [self.rocks[0], self.rocks[2], self.rocks[3]])
+        self.assertIsNone(self.rocks[1].stageSlot)
+        self.assertEqual(self.rocks[3].stageSlot, 2)
+
+    def test_remove_twice(self):
+        """Test removing a sprite that has already gone does nothing"""
+        self.stage.removeSprite(self.rocks[0])
+        self.stage.removeSprite(self.rocks[0])
+        self.stage.drawSprites()
+
+        self.assertEqual(len(self.stage.spriteList), 3)
+
+    def test_removed_while_moving(self):
+        """Test debris that dies while moving leaves the others moving"""
+        debris = Debris(Vector2d(50, 50), self.stage)
+        debris.ttl = 1
+        self.stage.addSprite(debris)
+        last = self.rocks[-1]
+        x = last.position.x
+
+        self.stage.moveSprites()
+
+        self.assertNotIn(debris, self.stage.spriteList)
+        self.assertNotIn(None, self.stage.spriteList)
+        self.assertNotEqual(last.position.x, x)
+
+    def test_added_while_moving(self):
+        """Test sprites added while moving start moving next frame"""
+        spawner = Spawner(self.stage)
+        self.stage.addSprite(spawner)
+
+        self.stage.moveSprites()
+        self.assertEqual(spawner.spawned[0].position.x, 200)
+
+        self.stage.moveSprites()
+        self.assertEqual(spawner.spawned[0].position.x, 201)
+        self.assertEqual(spawner.spawned[1].position.x, 200)
+
+
+class TestDirtyRects(unittest.TestCase):
+    """Test the stage only clears and updates what was drawn"""
+
+    def setUp(self):
+        """Create a stage drawing onto an off screen surface"""
+        self.stage = Stage('Test', dirtyRects=True,
+                           surface=pygame.Surface((800, 600)))
+        self.stage.clearScreen()
+        self.stage.fullRedraw = False
+
+    def test_sprite_rects_recorded(self):
+        """Test drawing a sprite records its bounding rect"""
+        rock = Rock(self.stage, Vector2d(100, 100), Rock.largeRockType)
+        self.stage.addSprite(rock)
+        self.assertEqual(self.stage.drawnRects, [])
+
+        self.stage.drawSprites()
+        self.assertEqual(self.stage.drawnRects, [rock.boundingRect])
+
+    def test_blit_recorded(self):
+        """Test blitted surfaces are recorded"""
+        rect = self.stage.blit(pygame.Surface((20, 10)), (50, 60))
+        self.assertEqual(self.stage.drawnRects, [pygame.Rect(50, 60, 20, 10)])
+        self.assertEqual(rect, pygame.Rect(50, 60, 20, 10))
+
+    def test_clear_erases_last_frame(self):
+        """Test only last frame's rects are cleared"""
+        self.stage.screen.fill((255, 255, 255), (0, 0, 10, 10))
+        rock = Rock(self.stage, Vector2d(100, 100), Rock.largeRockType)
+        self.stage.addSprite(rock)
+        self.stage.drawSprites()
+        self.stage.clearScreen()
+
+        background = self.stage.backgroundColor
+        rect = rock.boundingRect
+        for x in range(rect.left, rect.right):
+            for y in range(rect.top, rect.bottom):
+                self.assertEqual(self.stage.screen.get_at((x, y))[:3],
+                                 background)
+        # Drawn behind the stage's back so left alone
+        self.assertEqual(self.stage.screen.get_at((5, 5))[:3],
+                         (255, 255, 255))
+        self.assertEqual(self.stage.erasedRects, [rect])
+        self.assertEqual(self.stage.drawnRects, [])
+
+    def test_present_updates_rects(self):
+        """Test a few small rects are sent to the display"""
+        self.stage.blit(pygame.Surface((20, 10)), (50, 60))
+        with mock.patch('pygame.display.update') as update, \
+                mock.patch('pygame.display.flip') as flip:
+            self.stage.present()
+
+        update.assert_called_once_with([pygame.Rect(50, 60, 20, 10)])
+        flip.assert_not_called()
+
+    def test_present_flips_over_threshold(self):
+        """Test the whole display is flipped when most of it changed"""
+        self.stage.blit(pygame.Surface((800, 400)), (0, 0))
+        with mock.patch('pygame.display.update') as update, \
+                mock.patch('pygame.display.flip') as flip:
+            self.stage.present()
+
+        flip.assert_called_once_with()
+        update.assert_not_called()
+
+    def test_redraw_all(self):
+        """Test redrawAll clears the whole screen and flips"""
+        self.stage.screen.fill((255, 255, 255))
+        self.stage.redrawAll()
+        self.stage.clearScreen()
+        self.assertEqual(self.stage.screen.get_at((5, 5))[:3],
+                         self.stage.backgroundColor)
+
+        with mock.patch('pygame.display.flip') as flip:
+            self.stage.present()
+        flip.assert_called_once_with()
+        self.assertFalse(self.stage.fullRedraw)
+
+    def test_offscreen_size(self):
+        """Test an off screen stage takes its size from the surface"""
+        self.assertEqual((self.stage.width, self.stage.height), (800, 600))
+        self.assertFalse(self.stage.headless)
+
+    def test_headless_never_dirty(self):
+        """Test a headless stage ignores the dirty rect option"""
+        stage = Stage('Test', (800, 600), headless=True, dirtyRects=True)
+        self.assertFalse(stage.dirtyRects)
+
+
+class TestFixedTimestep(unittest.TestCase):
+    """Test the game moves on in fixed ticks"""
+
+    def setUp(self):
+        """Create a headless game"""
+        self.game = Asteroids(headless=True)
+
+    def test_ticks_due(self):
+        """Test whole ticks are run and the rest carried over"""
+        self.assertEqual(self.game.ticksDue(10), 0)
+        self.assertEqual(self.game.ticksDue(10), 1)
+        self.assertAlmostEqual(self.game.lag, 20 - 1000.0 / 60)
+        self.assertEqual(self.game.ticksDue(1000.0 / 30), 2)
+
+    def test_tick_rate(self):
+        """Test the tick rate sets how long a tick is"""
+        game = Asteroids(headless=True, tickRate=30)
+        self.assertEqual(game.ticksDue(1000.0 / 60), 0)
+        self.assertEqual(game.ticksDue(1000.0 / 60), 1)
+
+    def test_catch_up_capped(self):
+        """Test a long stall only runs maxCatchUpTicks and drops the rest"""
+        self.assertEqual(self.game.ticksDue(1000), Asteroids.maxCatchUpTicks)
+        self.assertEqual(self.game.lag, 0.0)
+
+    def test_headless_runs_ticks(self):
+        """Test a headless game runs maxFrames ticks"""
+        self.game.playGame(50)
+        self.assertEqual(self.game.secondsCount, 51)
+        self.assertEqual(self.game.gameState, 'playing')
+
+    def test_hyperspace_counts_down_in_ticks(self):
+        """Test hyperspace ends after its ticks without drawing"""
+        self.game.initialiseGame()
+        ship = self.game.ship
+        ship.enterHyperSpace()
+        for _ in range(99):
+            self.game.stage.moveSprites()
+        self.assertTrue(ship.inHyperSpace)
+
+        self.game.stage.moveSprites()
+        self.assertFalse(ship.inHyperSpace)
+        self.assertEqual(ship.color, (255, 255, 255))
+
+
 class TestScoring(unittest.TestCase):
     """Test score calculation"""
 
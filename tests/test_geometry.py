@@ -12,6 +12,9 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from util.geometry import calculateGradient, calculateYAxisIntersect, getIntersectPoint
+from util.geometry import calculateIntersectPoint, segmentIntersectPoint
+from util.geometry import polygonIntersectPoint, polygonIntersectAvailable
+from util.geometry import pointInPolygon
 
 
 class TestGeometryBasics(unittest.TestCase):
@@ -157,5 +160,141 @@ class TestCollisionScenarios(unittest.TestCase):
             self.assertEqual(len(result), 1)
 
 
+class TestSegmentIntersection(unittest.TestCase):
+    """Test the cross product segment intersection kernel"""
+
+    def test_crossing_segments(self):
+        """Test crossing segments return the crossing point"""
+        result = segmentIntersectPoint((0, 0), (10, 10), (0, 10), (10, 0))
+        self.assertEqual(result, [5, 5])
+
+    def test_returns_ints(self):
+        """Test the point is returned as a list of ints"""
+        result = segmentIntersectPoint((1, 5), (4, 7), (4, 5), (3, 7))
+        self.assertIsInstance(result, list)
+        self.assertTrue(all(isinstance(value, int) for value in result))
+
+    def test_agrees_with_calculate_intersect_point(self):
+        """Test same results as calculateIntersectPoint for clear cases"""
+        cases = [
+            ((1, 5), (4, 7), (4, 5), (3, 7)),
+            ((1, 5), (4, 7), (4, 1), (3, 3)),
+            ((1, 5), (4, 7), (3, 1), (3, 10)),
+            ((1, 5), (4, 7), (0, 6), (5, 6)),
+            ((3, 1), (3, 10), (0, 6), (5, 6)),
+            ((512, 374), (518, 394), (520, 380), (520, 390)),
+        ]
+        for points in cases:
+            self.assertEqual(segmentIntersectPoint(*points),
+                             calculateIntersectPoint(*points), points)
+
+    def test_lines_cross_beyond_segments(self):
+        """Test segments whose lines cross only when extended"""
+        self.assertIsNone(
+            segmentIntersectPoint((0, 0), (1, 1), (5, 0), (4, 1)))
+
+    def test_vertical_and_horizontal(self):
+        """Test vertical against horizontal segments"""
+        result = segmentIntersectPoint((5, 0), (5, 10), (0, 5), (10, 5))
+        self.assertEqual(result, [5, 5])
+
+    def test_touching_end_points(self):
+        """Test segments sharing an end point intersect there"""
+        result = segmentIntersectPoint((0, 0), (10, 0), (10, 0), (10, 10))
+        self.assertEqual(result, [10, 0])
+
+    def test_parallel_segments(self):
+        """Test parallel segments apart don't intersect"""
+        self.assertIsNone(
+            segmentIntersectPoint((0, 0), (10, 0), (0, 5), (10, 5)))
+
+    def test_overlapping_collinear_segments(self):
+        """Test overlapping segments on one line return a shared end"""
+        result = segmentIntersectPoint((0, 0), (10, 10), (2, 2), (8, 8))
+        self.assertEqual(result, [2, 2])
+
+    def test_collinear_segments_apart(self):
+        """Test segments on one line that don't overlap"""
+        self.assertIsNone(
+            segmentIntersectPoint((0, 0), (2, 2), (5, 5), (8, 8)))
+
+
+@unittest.skipUnless(polygonIntersectAvailable, 'numpy not installed')
+class TestPolygonIntersection(unittest.TestCase):
+    """Test the vectorized all pairs edge test"""
+
+    def setUp(self):
+        """Two outlines to test against each other"""
+        self.rock = [(-10, -30), (15, -30), (32, -10), (32, 12), (15, 32),
+                     (0, 32), (0, 10), (-20, 32), (-37, 10), (-17, 2),
+                     (-37, -7)]
+        self.ship = [(0, -10), (6, 10), (3, 7), (-3, 7), (-6, 10)]
+
+    def place(self, pointlist, x, y):
+        return [[px + x, py + y] for px, py in pointlist]
+
+    def firstHit(self, pointlist1, pointlist2):
+        for i in range(len(pointlist1)):
+            for j in range(len(pointlist2)):
+                p = segmentIntersectPoint(pointlist1[i-1], pointlist1[i],
+                                          pointlist2[j-1], pointlist2[j])
+                if p is not None:
+                    return p
+        return None
+
+    def test_hit_matches_loop(self):
+        """Test the first hit is the one the double loop finds"""
+        rock = self.place(self.rock, 500, 400)
+        for x in range(450, 560, 3):
+            ship = self.place(self.ship, x, 395)
+            self.assertEqual(polygonIntersectPoint(rock, ship),
+                             self.firstHit(rock, ship), x)
+
+    def test_miss(self):
+        """Test outlines apart don't intersect"""
+        rock = self.place(self.rock, 500, 400)
+        ship = self.place(self.ship, 700, 400)
+        self.assertIsNone(polygonIntersectPoint(rock, ship))
+
+    def test_contained_outline_misses(self):
+        """Test an outline inside another has no crossing edges"""
+        rock = self.place(self.rock, 500, 400)
+        ship = self.place(self.ship, 505, 395)
+        self.assertIsNone(polygonIntersectPoint(rock, ship))
+
+    def test_collinear_edges(self):
+        """Test outlines sharing part of an edge"""
+        square1 = [(0, 0), (10, 0), (10, 10), (0, 10)]
+        square2 = [(10, 2), (20, 2), (20, 8), (10, 8)]
+        self.assertEqual(polygonIntersectPoint(square1, square2),
+                         self.firstHit(square1, square2))
+
+
+class TestPointInPolygon(unittest.TestCase):
+    """Test the even-odd point in polygon test"""
+
+    def test_square(self):
+        """Test points inside and outside a square"""
+        square = [(0, 0), (10, 0), (10, 10), (0, 10)]
+        self.assertTrue(pointInPolygon(5, 5, square))
+        self.assertTrue(pointInPolygon(0.5, 9.5, square))
+        self.assertFalse(pointInPolygon(15, 5, square))
+        self.assertFalse(pointInPolygon(-0.5, 5, square))
+        self.assertFalse(pointInPolygon(5, 10.5, square))
+
+    def test_concave(self):
+        """Test a point in the notch of a concave outline is outside"""
+        notched = [(0, 0), (10, 0), (10, 10), (5, 3), (0, 10)]
+        self.assertFalse(pointInPolygon(5, 8, notched))
+        self.assertTrue(pointInPolygon(5, 1, notched))
+        self.assertTrue(pointInPolygon(9, 8, notched))
+
+    def test_level_with_vertex(self):
+        """Test a ray passing through a vertex is only counted once"""
+        diamond = [(0, -5), (5, 0), (0, 5), (-5, 0)]
+        self.assertTrue(pointInPolygon(0, 0, diamond))
+        self.assertFalse(pointInPolygon(-6, 0, diamond))
+
+
 if __name__ == '__main__':
     unittest.main()
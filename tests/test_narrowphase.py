@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the NarrowPhase
+Tests each tier of the collision test, its counters and the game using it
+"""
+
+import unittest
+import sys
+import os
+
+# Mock sound manager FIRST before any other imports
+sys.path.insert(0, os.path.dirname(__file__))
+import mock_soundManager
+sys.modules['soundManager'] = mock_soundManager
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from util.vector2d import Vector2d
+from util.vectorsprites import VectorSprite, Point
+from util.narrowphase import NarrowPhase, narrowPhase, outlinesTouch
+from badies import Rock
+from asteroids import Asteroids
+
+
+def placed(pointlist, x, y):
+    """A sprite at (x, y) with its points and rect worked out"""
+    sprite = VectorSprite(Vector2d(x, y), Vector2d(0, 0), pointlist)
+    sprite.draw()
+    sprite.boundingRect = sprite.bounds()
+    return sprite
+
+
+def placedPoint(x, y):
+    """A Point at (x, y) with its points and rect worked out"""
+    point = Point(Vector2d(x, y), Vector2d(0, 0), None)
+    point.draw()
+    point.boundingRect = point.bounds()
+    return point
+
+
+class TestTiers(unittest.TestCase):
+    """Test which tier turns each pair away"""
+
+    square = [(-10, -10), (10, -10), (10, 10), (-10, 10)]
+    line = [(-20, 0), (20, 0)]
+    triangle = [(0, -10), (10, 10), (-10, 10)]
+
+    def setUp(self):
+        """A narrow phase of our own"""
+        self.narrow = NarrowPhase()
+
+    def assertCounts(self, **expected):
+        """Check the counters, anything not given is expected to be 0"""
+        stats = self.narrow.stats()
+        for name in ('pairs', 'hits', 'boxHits') + NarrowPhase.tiers:
+            self.assertEqual(stats[name], expected.get(name, 0), name)
+
+    def test_circle_rejects_far_apart(self):
+        """Test sprites further apart than their radii go no further"""
+        first = placed(self.square, 100, 100)
+        second = placed(self.square, 130, 100)
+        second.boundingRect = first.boundingRect
+
+        self.assertFalse(self.narrow.collide(first, second))
+        self.assertCounts(pairs=1, circle=1)
+
+    def test_box_rejects_parallel_lines(self):
+        """Test close lines whose rects don't touch stop at the box"""
+        first = placed(self.line, 100, 100)
+        second = placed(self.line, 100, 110)
+
+        self.assertFalse(self.narrow.collide(first, second))
+        self.assertCounts(pairs=1, box=1)
+
+    def test_exact_rejects_corners(self):
+        """Test triangles whose rects overlap but outlines don't"""
+        first = placed(self.triangle, 100, 100)
+        second = placed(self.triangle, 116, 84)
+        self.assertTrue(first.boundingRect.colliderect(second.boundingRect))
+
+        self.assertFalse(self.narrow.collide(first, second))
+        self.assertCounts(pairs=1, exact=1)
+
+    def test_crossing_outlines_hit(self):
+        """Test outlines whose edges cross hit"""
+        first = placed(self.square, 100, 100)
+        second = placed(self.square, 110, 105)
+
+        self.assertTrue(self.narrow.collide(first, second))
+        self.assertCounts(pairs=1, hits=1)
+
+    def test_outline_inside_another_hits(self):
+        """Test an outline wholly inside another hits either way round"""
+        big = placed(self.square, 100, 100)
+        small = placed([(-2, -2), (2, -2), (2, 2), (-2, 2)], 101, 99)
+        self.assertIsNone(big.checkPolygonCollision(small))
+
+        self.assertTrue(outlinesTouch(big, small))
+        self.assertTrue(outlinesTouch(small, big))
+
+    def test_point_inside_outline(self):
+        """Test a Point hits when its position is inside the outline"""
+        square = placed(self.square, 100, 100)
+
+        self.assertTrue(self.narrow.collide(square, placedPoint(105, 95)))
+        self.assertFalse(self.narrow.collide(square, placedPoint(111, 95)))
+        self.assertTrue(self.narrow.collide(placedPoint(92, 108), square))
+
+    def test_point_in_notch(self):
+        """Test a Point in the notch of a concave outline misses"""
+        notched = placed([(-10, -10), (10, -10), (10, 10), (0, -2),
+                          (-10, 10)], 100, 100)
+        point = placedPoint(100, 106)
+        self.assertTrue(notched.boundingRect.colliderect(point.boundingRect))
+
+        self.assertFalse(self.narrow.collide(notched, point))
+        self.assertCounts(pairs=1, exact=1)
+
+    def test_box_is_enough(self):
+        """Test a pair the caller says only needs its boxes to touch"""
+        first = placed(self.triangle, 100, 100)
+        second = placed(self.triangle, 116, 84)
+
+        self.assertTrue(self.narrow.collide(first, second, boxIsEnough=True))
+        self.assertCounts(pairs=1, hits=1, boxHits=1)
+
+        far = placed(self.triangle, 130, 100)
+        self.assertFalse(self.narrow.collide(first, far, boxIsEnough=True))
+        self.assertCounts(pairs=2, hits=1, boxHits=1, box=1)
+
+    def test_clear(self):
+        """Test clearing the counters"""
+        self.narrow.collide(placed(self.square, 0, 0),
+                            placed(self.square, 5, 0))
+        self.narrow.clear()
+        self.assertCounts()
+
+
+class TestRadius(unittest.TestCase):
+    """Test the radius used by the circle tier"""
+
+    def test_shape_radius(self):
+        """Test a sprite with a shared shape uses its radius"""
+        rock = Rock(None, Vector2d(0, 0), Rock.largeRockType)
+        self.assertEqual(rock.boundingRadius(), rock.shape.radius)
+
+    def test_own_outline(self):
+        """Test a sprite with its own outline measures it"""
+        sprite = VectorSprite(Vector2d(0, 0), Vector2d(0, 0),
+                              [(3, 4), (-1, 0)])
+        self.assertEqual(sprite.boundingRadius(), 5)
+
+    def test_point(self):
+        """Test Points use the shared point shape"""
+        point = Point(Vector2d(0, 0), Vector2d(0, 0), None)
+        self.assertTrue(point.isPoint)
+        self.assertAlmostEqual(point.boundingRadius(), 2 ** 0.5)
+
+
+class TestGameCollisions(unittest.TestCase):
+    """Test the game's collisions go through the narrow phase"""
+
+    def setUp(self):
+        """Start a headless game with one small rock away from the ship"""
+        self.game = Asteroids(headless=True)
+        self.game.initialiseGame()
+        for rock in self.game.rockList:
+            self.game.stage.removeSprite(rock)
+        Rock.rockShape = 1
+        self.rock = Rock(self.game.stage, Vector2d(100, 100),
+                         Rock.smallRockType)
+        self.game.stage.addSprite(self.rock)
+        self.game.rockList = [self.rock]
+        narrowPhase.clear()
+
+    def fireAt(self, x, y):
+        """Fire a bullet and put it at (x, y)"""
+        self.game.ship.fireBullet()
+        self.game.ship.bullets[0].position = Vector2d(x, y)
+        self.game.stage.drawSprites()
+        self.game.checkCollisions()
+
+    def test_bullet_inside_rock(self):
+        """Test a bullet inside the outline breaks the rock"""
+        self.fireAt(100, 100)
+
+        self.assertNotIn(self.rock, self.game.rockList)
+        self.assertEqual(narrowPhase.stats()['hits'], 1)
+
+    def test_bullet_in_rect_corner(self):
+        """Test a bullet in a corner of the rock's rect misses it"""
+        self.game.stage.drawSprites()
+        rect = self.rock.boundingRect
+        self.fireAt(rect.left, rect.bottom - 2)
+
+        self.assertIn(self.rock, self.game.rockList)
+        self.assertEqual(narrowPhase.stats()['pairs'], 1)
+        self.assertEqual(narrowPhase.stats()['hits'], 0)
+
+    def test_bullet_in_notch(self):
+        """Test a bullet in the notch at the bottom of the rock misses it"""
+        self.fireAt(99, 106)
+
+        self.assertIn(self.rock, self.game.rockList)
+        self.assertEqual(narrowPhase.stats()['exact'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
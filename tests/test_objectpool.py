@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the ObjectPool
+Tests reuse of bullets and debris and the pool counters
+"""
+
+import unittest
+from unittest import mock
+import sys
+import os
+
+# Mock sound manager FIRST before any other imports
+sys.path.insert(0, os.path.dirname(__file__))
+import mock_soundManager
+sys.modules['soundManager'] = mock_soundManager
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from util.vector2d import Vector2d
+from util.objectpool import ObjectPool
+from util.vectorsprites import Point
+from badies import Debris
+from shooter import Bullet
+from ship import Ship
+from stage import Stage
+
+
+class TestObjectPool(unittest.TestCase):
+    """Test handing out and taking back objects"""
+
+    def setUp(self):
+        """Create a small pool of points"""
+        self.stage = Stage('Test', (800, 600), headless=True)
+        self.pool = ObjectPool(Point, maxSize=2)
+
+    def acquire(self, x=10, y=20):
+        return self.pool.acquire(Vector2d(x, y), Vector2d(1, 2), self.stage)
+
+    def test_empty_pool_makes_new(self):
+        """Test a new object is made when there is nothing to reuse"""
+        point = self.acquire()
+
+        self.assertIsInstance(point, Point)
+        self.assertEqual(self.pool.fresh, 1)
+        self.assertEqual(self.pool.reused, 0)
+
+    def test_released_object_reused(self):
+        """Test a released object comes back from the next acquire"""
+        point = self.acquire()
+        self.pool.release(point)
+
+        self.assertIs(self.acquire(), point)
+        self.assertEqual(self.pool.reused, 1)
+
+    def test_reset_on_acquire(self):
+        """Test a reused object looks like a new one"""
+        point = self.acquire()
+        point.ttl = 0
+        point.angle = 45
+        point.color = (0, 0, 0)
+        point.position.x = 500
+        self.pool.release(point)
+
+        point = self.acquire(30, 40)
+        self.assertEqual(point.ttl, 30)
+        self.assertEqual(point.angle, 0)
+        self.assertEqual(point.color, (255, 255, 255))
+        self.assertEqual((point.position.x, point.position.y), (30, 40))
+        self.assertEqual((point.heading.x, point.heading.y), (1, 2))
+
+    def test_position_not_shared(self):
+        """Test a reused object copies the position it is given"""
+        point = self.acquire()
+        self.pool.release(point)
+        position = Vector2d(5, 5)
+        point = self.pool.acquire(position, Vector2d(0, 0), self.stage)
+
+        self.assertIsNot(point.position, position)
+
+    def test_cap(self):
+        """Test objects past the cap are dropped"""
+        points = [self.acquire() for _ in range(3)]
+        for point in points:
+            self.pool.release(point)
+
+        self.assertEqual(len(self.pool.free), 2)
+        self.assertEqual(self.pool.dropped, 1)
+
+    def test_release_twice(self):
+        """Test releasing an object twice only pools it once"""
+        point = self.acquire()
+        self.pool.release(point)
+        self.pool.release(point)
+
+        self.assertEqual(len(self.pool.free), 1)
+
+    def test_other_class_ignored(self):
+        """Test a subclass is not taken by its parent's pool"""
+        debris = Debris(Vector2d(0, 0), self.stage)
+        self.pool.release(debris)
+
+        self.assertEqual(len(self.pool.free), 0)
+
+    def test_stats(self):
+        """Test the counters are reported and cleared"""
+        point = self.acquire()
+        self.pool.release(point)
+        self.acquire()
+        stats = self.pool.stats()
+
+        self.assertEqual(stats['size'], 0)
+        self.assertEqual(stats['maxSize'], 2)
+        self.assertEqual(stats['fresh'], 1)
+        self.assertEqual(stats['reused'], 1)
+        self.assertEqual(stats['released'], 1)
+        self.assertEqual(stats['dropped'], 0)
+
+        self.pool.clear()
+        self.assertEqual(self.pool.stats()['fresh'], 0)
+
+
+class TestPooledSprites(unittest.TestCase):
+    """Test bullets and debris go back to their pools"""
+
+    def setUp(self):
+        """Create a headless stage and empty the pools"""
+        self.stage = Stage('Test', (800, 600), headless=True)
+        Debris.pool.clear()
+        Bullet.pool.clear()
+
+    def test_dead_debris_pooled(self):
+        """Test debris is pooled when its time runs out"""
+        debris = Debris.pool.acquire(Vector2d(50, 50), self.stage)
+        self.stage.addSprite(debris)
+        debris.ttl = 1
+        self.stage.moveSprites()
+
+        self.assertIn(debris, Debris.pool.free)
+
+        reused = Debris.pool.acquire(Vector2d(60, 60), self.stage)
+        self.assertIs(reused, debris)
+        self.assertEqual(reused.ttl, 50)
+        self.assertEqual(reused.color, (255, 255, 255))
+
+    def test_spent_bullet_reused(self):
+        """Test the ship's next bullet reuses a spent one"""
+        ship = Ship(self.stage)
+        self.stage.addSprite(ship)
+        ship.fireBullet()
+        bullet = ship.bullets[0]
+        bullet.ttl = 1
+        self.stage.moveSprites()
+
+        self.assertEqual(ship.bullets, [])
+        ship.fireBullet()
+        self.assertIs(ship.bullets[0], bullet)
+        self.assertEqual(bullet.ttl, Ship.bulletTtl)
+        self.assertIn(bullet, self.stage.spriteList)
+        self.assertEqual(Bullet.pool.reused, 1)
+
+
+    def test_new_bullet_copies_position(self):
+        """Test a new bullet has a position of its own"""
+        ship = Ship(self.stage)
+        self.stage.addSprite(ship)
+        ship.fireBullet()
+        bullet = ship.bullets[0]
+
+        self.assertIsNot(bullet.position, ship.position)
+        ship.position.x += 10
+        self.assertEqual(bullet.position.x, ship.position.x - 10)
+
+    def test_reuse_copies_nothing(self):
+        """Test reused bullets and debris take the values, not a copy"""
+        ship = Ship(self.stage)
+        self.stage.addSprite(ship)
+        ship.fireBullet()
+        bullet = ship.bullets[0]
+        bullet.ttl = 1
+        debris = Debris.pool.acquire(ship.position, self.stage)
+        self.assertIsNot(debris.position, ship.position)
+        self.stage.addSprite(debris)
+        debris.ttl = 1
+        self.stage.moveSprites()
+
+        with mock.patch.object(Vector2d, 'copy') as copy:
+            ship.fireBullet()
+            Debris.pool.acquire(ship.position, self.stage)
+        copy.assert_not_called()
+        self.assertIs(ship.bullets[0], bullet)
+        self.assertIsNot(bullet.position, ship.position)
+        self.assertEqual((bullet.position.x, bullet.position.y),
+                         (ship.position.x, ship.position.y))
+
+
+if __name__ == '__main__':
+    unittest.main()
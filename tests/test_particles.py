@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the ParticleSystem
+Tests emitting, moving, fading and expiring particles, drawing them into a
+surface and the game's explosions going into it
+"""
+
+import unittest
+import sys
+import os
+import random
+
+# Mock sound manager FIRST before any other imports
+sys.path.insert(0, os.path.dirname(__file__))
+import mock_soundManager
+sys.modules['soundManager'] = mock_soundManager
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from util.vector2d import Vector2d
+from util.particles import ParticleSystem, particlesAvailable
+from util.controls import ReplayInput, FIRE, ROTATE_LEFT
+from badies import Debris
+from stage import Stage
+from asteroids import Asteroids
+import pygame
+
+BACKGROUND = (10, 10, 10)
+
+
+@unittest.skipUnless(particlesAvailable, 'numpy not installed')
+class TestParticleSystem(unittest.TestCase):
+    """Test the arrays of particles"""
+
+    def setUp(self):
+        """Create a small system on an 800x600 screen"""
+        self.particles = ParticleSystem(800, 600, capacity=4)
+
+    def test_emit(self):
+        """Test particles start at the point with headings within spread"""
+        self.particles.emit(100, 200, 3, random.Random(1))
+
+        self.assertEqual(len(self.particles), 3)
+        self.assertEqual(self.particles.x[:3].tolist(), [100] * 3)
+        self.assertEqual(self.particles.y[:3].tolist(), [200] * 3)
+        for v in self.particles.vx[:3].tolist() + \
+                self.particles.vy[:3].tolist():
+            self.assertLessEqual(abs(v), 1.5)
+
+    def test_same_headings_as_debris(self):
+        """Test the random numbers are used as Debris sprites use them"""
+        self.particles.emit(0, 0, 3, random.Random(7))
+        rng = random.Random(7)
+        for i in range(3):
+            debris = Debris(Vector2d(0, 0), None, rng)
+            self.assertEqual(self.particles.vx[i], debris.heading.x)
+            self.assertEqual(self.particles.vy[i], debris.heading.y)
+
+    def test_grows(self):
+        """Test the arrays grow and keep the particles already there"""
+        self.particles.emit(1, 2, 3, random.Random(1))
+        self.particles.emit(3, 4, 10, random.Random(1))
+
+        self.assertEqual(len(self.particles), 13)
+        self.assertGreaterEqual(self.particles.capacity, 13)
+        self.assertEqual(self.particles.x[:4].tolist(), [1, 1, 1, 3])
+
+    def test_step_moves_and_fades(self):
+        """Test a step moves each particle and fades its colour"""
+        self.particles.emit(100, 100, 1, random.Random(1))
+        self.particles.vx[0] = 2
+        self.particles.vy[0] = -1
+        self.particles.step()
+
+        self.assertEqual(self.particles.x[0], 102)
+        self.assertEqual(self.particles.y[0], 99)
+        self.assertEqual(self.particles.color[0].tolist(), [250, 250, 250])
+
+    def test_lives_as_long_as_debris(self):
+        """Test particles last the same number of steps as Debris"""
+        stage = Stage('Test', (800, 600), headless=True, particles=False)
+        debris = Debris(Vector2d(100, 100), stage)
+        stage.addSprite(debris)
+        self.particles.emit(100, 100, 1)
+
+        steps = 0
+        while len(self.particles):
+            self.particles.step()
+            stage.moveSprites()
+            steps += 1
+            self.assertEqual(debris in stage.spriteList,
+                             len(self.particles) == 1)
+            if len(self.particles):
+                self.assertEqual(tuple(self.particles.color[0].tolist()),
+                                 debris.color)
+
+        self.assertEqual(steps, 50)
+
+    def test_expired_packed_in_order(self):
+        """Test expired particles go and the rest keep their order"""
+        self.particles.emit(10, 10, 1, ttl=5)
+        self.particles.emit(20, 20, 1, ttl=2)
+        self.particles.emit(30, 30, 1, ttl=5)
+        self.particles.vx[:3] = 0
+        self.particles.vy[:3] = 0
+        self.particles.step()
+        self.particles.step()
+
+        self.assertEqual(len(self.particles), 2)
+        self.assertEqual(self.particles.x[:2].tolist(), [10, 30])
+
+    def test_wraps(self):
+        """Test particles wrap round the screen edges"""
+        self.particles.emit(799, 1, 1)
+        self.particles.vx[0] = 2
+        self.particles.vy[0] = -2
+        self.particles.step()
+
+        self.assertEqual(self.particles.x[0], 0)
+        self.assertEqual(self.particles.y[0], 600)
+
+    def test_draw(self):
+        """Test each particle is a 2x2 block in its colour"""
+        screen = pygame.Surface((800, 600))
+        screen.fill(BACKGROUND)
+        self.particles.emit(100.7, 50.2, 1, color=(200, 100, 50))
+        self.particles.emit(300, 400, 1)
+        rect = self.particles.draw(screen)
+
+        for point in ((100, 50), (101, 50), (100, 51), (101, 51)):
+            self.assertEqual(screen.get_at(point), (200, 100, 50, 255))
+        self.assertEqual(screen.get_at((102, 50)), BACKGROUND + (255,))
+        self.assertEqual(screen.get_at((300, 400)), (255, 255, 255, 255))
+        self.assertEqual(rect, pygame.Rect(100, 50, 202, 352))
+
+    def test_draw_at_the_edge(self):
+        """Test particles on the far edges are drawn inside the surface"""
+        screen = pygame.Surface((800, 600))
+        self.particles.emit(800, 600, 1)
+        self.particles.draw(screen)
+
+        self.assertEqual(screen.get_at((799, 599)), (255, 255, 255, 255))
+
+    def test_draw_24_bit(self):
+        """Test surfaces that can't be written directly are filled"""
+        screen = pygame.Surface((800, 600), 0, 24)
+        self.particles.emit(100, 50, 1, color=(200, 100, 50))
+        self.particles.draw(screen)
+
+        self.assertEqual(screen.get_at((101, 51)), (200, 100, 50, 255))
+
+    def test_draw_nothing(self):
+        """Test drawing no particles draws nothing"""
+        self.assertIsNone(self.particles.draw(pygame.Surface((10, 10))))
+
+
+@unittest.skipUnless(particlesAvailable, 'numpy not installed')
+class TestGameParticles(unittest.TestCase):
+    """Test explosions in the game go into the particles"""
+
+    def test_rock_explodes_into_particles(self):
+        """Test a destroyed rock throws out 25 particles and no sprites"""
+        game = Asteroids(headless=True, seed=1)
+        game.initialiseGame()
+        game.createDebris(game.rockList[0])
+
+        self.assertEqual(len(game.stage.particles), 25)
+        self.assertFalse(any(isinstance(sprite, Debris)
+                             for sprite in game.stage.spriteList))
+
+    def test_stage_steps_and_draws(self):
+        """Test the stage moves the particles and draws them"""
+        stage = Stage('Test', dirtyRects=True,
+                      surface=pygame.Surface((800, 600)))
+        stage.particles.emit(100, 100, 10)
+        stage.moveSprites()
+        stage.clearScreen()
+        stage.renderSprites()
+
+        self.assertEqual(stage.particles.ttl[0], 49)
+        self.assertEqual(len(stage.drawnRects), 1)
+
+    def test_same_game_as_debris_sprites(self):
+        """Test particles leave a seeded game playing out as it did with
+        Debris sprites"""
+        results = []
+        for particles in (True, False):
+            game = Asteroids(headless=True, seed=9, controls=ReplayInput(
+                [FIRE | ROTATE_LEFT] * 600))
+            if not particles:
+                game.stage.particles = None
+            game.initialiseGame()
+            for _ in range(600):
+                game.tick()
+            results.append((game.score, game.rng.random(),
+                            [(rock.position.x, rock.position.y)
+                             for rock in game.rockList]))
+
+        self.assertGreater(results[0][0], 0)
+        self.assertEqual(results[0], results[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
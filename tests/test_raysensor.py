@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the RaySensor
+Tests ray directions, hits on each kind of object, screen wrapping and
+agreement with testing every ray against every edge
+"""
+
+import unittest
+import sys
+import os
+import math
+import random
+
+# Mock sound manager FIRST before any other imports
+sys.path.insert(0, os.path.dirname(__file__))
+import mock_soundManager
+sys.modules['soundManager'] = mock_soundManager
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from util.vector2d import Vector2d
+from util.raysensor import (RaySensor, raySensorAvailable, NOTHING, ROCK,
+                            SAUCER, SAUCER_BULLET)
+from badies import Rock, Saucer
+from asteroids import Asteroids
+from stage import Stage
+
+
+def bruteForce(sensor, x, y, angle, objects):
+    """Every ray against every edge of every object"""
+    width, height = sensor.width, sensor.height
+    distances = []
+    kinds = []
+    for i in range(sensor.numRays):
+        rayAngle = math.radians(angle + i * 360.0 / sensor.numRays)
+        dirX, dirY = -math.sin(rayAngle), -math.cos(rayAngle)
+        best, bestKind = sensor.maxDistance, NOTHING
+        for sprite, kind in objects:
+            rect = sprite.boundingRect
+            dx = rect.centerx - x
+            dy = rect.centery - y
+            shiftX = (dx + width / 2) % width - width / 2 - dx - x
+            shiftY = (dy + height / 2) % height - height / 2 - dy - y
+            points = [(px + shiftX, py + shiftY)
+                      for px, py in sprite.transformedPointlist]
+            for j in range(len(points)):
+                sX, sY = points[j]
+                eX = points[(j + 1) % len(points)][0] - sX
+                eY = points[(j + 1) % len(points)][1] - sY
+                denominator = dirX * eY - dirY * eX
+                if denominator == 0:
+                    continue
+                t = (sX * eY - sY * eX) / denominator
+                u = (sX * dirY - sY * dirX) / denominator
+                if 0 <= t <= best and 0 <= u <= 1:
+                    best, bestKind = t, kind
+        distances.append(best)
+        kinds.append(bestKind)
+    return distances, kinds
+
+
+@unittest.skipUnless(raySensorAvailable, 'numpy not installed')
+class TestRaySensor(unittest.TestCase):
+    """Test rays cast against sprite outlines"""
+
+    def setUp(self):
+        """Create a stage and a sensor with four rays"""
+        self.stage = Stage('Test', (800, 600), headless=True)
+        self.sensor = RaySensor(800, 600, numRays=4, maxDistance=300)
+
+    def addRock(self, x, y, rockType=Rock.smallRockType):
+        """A rock at (x, y) with its outline worked out"""
+        rock = Rock(self.stage, Vector2d(x, y), rockType)
+        self.stage.addSprite(rock)
+        return rock
+
+    def test_nothing_in_range(self):
+        """Test rays that hit nothing report maxDistance"""
+        rock = self.addRock(600, 500)
+        distances, kinds = self.sensor.cast(400, 300, 0, [(rock, ROCK)])
+
+        self.assertEqual(list(distances), [300] * 4)
+        self.assertEqual(list(kinds), [NOTHING] * 4)
+
+    def test_ray_directions(self):
+        """Test ray 0 points ahead and the rays turn with the ship"""
+        rock = self.addRock(400, 200)
+        distances, kinds = self.sensor.cast(400, 300, 0, [(rock, ROCK)])
+        self.assertEqual(list(kinds), [ROCK, NOTHING, NOTHING, NOTHING])
+        self.assertLess(distances[0], 100)
+        self.assertGreater(distances[0], 80)
+
+        # Turned a quarter anticlockwise the rock is off to the right
+        distances, kinds = self.sensor.cast(400, 300, 90, [(rock, ROCK)])
+        self.assertEqual(list(kinds), [NOTHING, NOTHING, NOTHING, ROCK])
+
+    def test_nearest_wins(self):
+        """Test a ray reports the nearest of two objects"""
+        far = self.addRock(400, 100)
+        near = self.addRock(400, 200)
+        saucer = Saucer(self.stage, Saucer.largeSaucerType, None)
+        saucer.position = Vector2d(400, 250)
+        self.stage.addSprite(saucer)
+
+        distances, kinds = self.sensor.cast(
+            400, 300, 0, [(far, ROCK), (near, ROCK), (saucer, SAUCER)])
+        self.assertEqual(kinds[0], SAUCER)
+        self.assertLess(distances[0], 50)
+
+    def test_wraps_round_the_screen(self):
+        """Test a ray off the left edge finds a rock on the right"""
+        rock = self.addRock(790, 300)
+        distances, kinds = self.sensor.cast(20, 300, 90, [(rock, ROCK)])
+
+        self.assertEqual(kinds[0], ROCK)
+        self.assertLess(distances[0], 40)
+
+    def test_inside_an_outline(self):
+        """Test rays from inside a rock hit its edges"""
+        rock = self.addRock(400, 300, Rock.largeRockType)
+        distances, kinds = self.sensor.cast(400, 300, 0, [(rock, ROCK)])
+
+        self.assertEqual(list(kinds), [ROCK] * 4)
+        self.assertTrue(all(distances < 100))
+
+    def test_matches_brute_force(self):
+        """Test the indexed rays agree with testing every edge"""
+        rng = random.Random(4)
+        sensor = RaySensor(800, 600, numRays=64, maxDistance=300)
+        objects = [(self.addRock(rng.uniform(0, 800), rng.uniform(0, 600),
+                                 rng.randrange(3)), ROCK)
+                   for _ in range(60)]
+        for _ in range(5):
+            x, y = rng.uniform(0, 800), rng.uniform(0, 600)
+            angle = rng.randrange(360)
+            distances, kinds = sensor.cast(x, y, angle, objects)
+            expected, expectedKinds = bruteForce(sensor, x, y, angle,
+                                                 objects)
+
+            for got, want in zip(distances, expected):
+                self.assertAlmostEqual(got, want)
+            self.assertEqual(list(kinds), expectedKinds)
+
+
+@unittest.skipUnless(raySensorAvailable, 'numpy not installed')
+class TestGameSensor(unittest.TestCase):
+    """Test sensing from the ship in a game"""
+
+    def test_senses_saucer_bullets(self):
+        """Test the saucer and its bullets are seen as well as rocks"""
+        game = Asteroids(headless=True, seed=1)
+        game.initialiseGame()
+        saucer = Saucer(game.stage, Saucer.smallSaucerType, game.ship)
+        saucer.position = Vector2d(512, 100)
+        game.saucer = saucer
+        game.stage.addSprite(saucer)
+        saucer.fireBullet()
+        bullet = saucer.bullets[0]
+        bullet.position = Vector2d(512, 350)
+        game.stage.updateSprites()
+
+        sensor = RaySensor(game.stage.width, game.stage.height, numRays=8)
+        distances, kinds = sensor.sense(game)
+        self.assertEqual(kinds[0], SAUCER_BULLET)
+        self.assertLess(distances[0], 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the RotationCache
+Tests cached outline rotations and the LRU counters
+"""
+
+import unittest
+import sys
+import os
+
+# Mock sound manager FIRST before any other imports
+sys.path.insert(0, os.path.dirname(__file__))
+import mock_soundManager
+sys.modules['soundManager'] = mock_soundManager
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from util.vector2d import Vector2d
+from util.vectorsprites import VectorSprite
+from util.rotationcache import RotationCache, rotatePointlist
+from badies import Rock
+
+
+class TestRotationCache(unittest.TestCase):
+    """Test the LRU cache of rotated outlines"""
+
+    def setUp(self):
+        """Create a small cache"""
+        self.cache = RotationCache(maxSize=2)
+        self.pointlist = [(0, -10), (6, 10), (3, 7), (-3, 7), (-6, 10)]
+
+    def test_matches_rotate_point(self):
+        """Test cached points equal VectorSprite.rotatePoint"""
+        sprite = VectorSprite(Vector2d(0, 0), Vector2d(0, 0), self.pointlist)
+        for angle in range(0, 360, 6):
+            sprite.angle = angle
+            expected = tuple(tuple(sprite.rotatePoint(point))
+                             for point in self.pointlist)
+            self.assertEqual(rotatePointlist(self.pointlist, angle), expected)
+
+    def test_miss_then_hit(self):
+        """Test the second lookup of a rotation is a hit"""
+        first = self.cache.rotate('ship', 1, 90, self.pointlist)
+        second = self.cache.rotate('ship', 1, 90, self.pointlist)
+
+        self.assertIs(first, second)
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_angle_wraps(self):
+        """Test angles are taken mod 360"""
+        self.cache.rotate('ship', 1, 6, self.pointlist)
+        self.cache.rotate('ship', 1, 366, self.pointlist)
+        self.cache.rotate('ship', 1, -354, self.pointlist)
+
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(self.cache.hits, 2)
+
+    def test_scale_is_part_of_key(self):
+        """Test the same shape at another scale is a separate entry"""
+        self.cache.rotate('rock', 2.5, 10, self.pointlist)
+        self.cache.rotate('rock', 1.5, 10, self.pointlist)
+
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_least_recently_used_evicted(self):
+        """Test the oldest entry goes when the cache is full"""
+        self.cache.rotate('ship', 1, 0, self.pointlist)
+        self.cache.rotate('ship', 1, 6, self.pointlist)
+        self.cache.rotate('ship', 1, 0, self.pointlist)
+        self.cache.rotate('ship', 1, 12, self.pointlist)
+
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertIn(('ship', 1, 0), self.cache.entries)
+        self.assertNotIn(('ship', 1, 6), self.cache.entries)
+
+    def test_extents(self):
+        """Test extents of a rotation are worked out once and kept"""
+        extents = self.cache.extents('ship', 1, 90, self.pointlist)
+        rotated = rotatePointlist(self.pointlist, 90)
+
+        self.assertEqual(extents, (min(x for x, y in rotated),
+                                   min(y for x, y in rotated),
+                                   max(x for x, y in rotated),
+                                   max(y for x, y in rotated)))
+        self.assertIs(self.cache.extents('ship', 1, 450, self.pointlist),
+                      extents)
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(self.cache.hits, 1)
+
+        # Kept in the same entry as the rotation
+        self.cache.rotate('ship', 1, 90, self.pointlist)
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(self.cache.stats()['size'], 1)
+
+    def test_extents_kept_while_used(self):
+        """Test looking up extents keeps the entry from being evicted"""
+        self.cache.extents('ship', 1, 0, self.pointlist)
+        self.cache.extents('ship', 1, 6, self.pointlist)
+        self.cache.extents('ship', 1, 0, self.pointlist)
+        self.cache.extents('ship', 1, 12, self.pointlist)
+
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertIn(('ship', 1, 0), self.cache.entries)
+        self.assertNotIn(('ship', 1, 6), self.cache.entries)
+
+    def test_stats(self):
+        """Test the counters are reported and cleared"""
+        self.cache.rotate('ship', 1, 0, self.pointlist)
+        self.cache.rotate('ship', 1, 0, self.pointlist)
+        stats = self.cache.stats()
+
+        self.assertEqual(stats['size'], 1)
+        self.assertEqual(stats['maxSize'], 2)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['evictions'], 0)
+
+        self.cache.clear()
+        self.assertEqual(self.cache.stats()['size'], 0)
+        self.assertEqual(self.cache.stats()['hits'], 0)
+
+
+class TestSpriteRotationCache(unittest.TestCase):
+    """Test sprites use the cache when transforming"""
+
+    def test_cached_transform_matches(self):
+        """Test cached and uncached transforms agree"""
+        pointlist = [(0, -10), (10, 10), (-10, 10)]
+        sprite = VectorSprite(Vector2d(50.5, 20.25), Vector2d(0, 0),
+                              pointlist, angle=42)
+        sprite.rotateAndTransform()
+
+        expected = [sprite.translatePoint(sprite.rotatePoint(point))
+                    for point in pointlist]
+        self.assertEqual(sprite.transformedPointlist, expected)
+
+    def test_fractional_angle_not_cached(self):
+        """Test angles that are not whole degrees are still transformed"""
+        pointlist = [(0, -10), (10, 10), (-10, 10)]
+        sprite = VectorSprite(Vector2d(0, 0), Vector2d(0, 0), pointlist,
+                              angle=42.5)
+        sprite.rotateAndTransform()
+
+        self.assertIsNone(sprite.shapeId)
+        self.assertEqual(len(sprite.transformedPointlist), 3)
+
+    def test_rocks_share_shape_id(self):
+        """Test rocks of the same shape and size share a cache key"""
+        Rock.rockShape = 1
+        first = Rock(None, Vector2d(0, 0), Rock.largeRockType)
+        Rock.rockShape = 1
+        second = Rock(None, Vector2d(0, 0), Rock.largeRockType)
+        Rock.rockShape = 1
+        small = Rock(None, Vector2d(0, 0), Rock.smallRockType)
+
+        self.assertEqual(first.shapeId, ('rock', 1))
+        self.assertEqual((first.shapeId, first.shapeScale),
+                         (second.shapeId, second.shapeScale))
+        self.assertNotEqual(first.shapeScale, small.shapeScale)
+
+
+if __name__ == '__main__':
+    unittest.main()
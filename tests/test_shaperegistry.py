@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the ShapeRegistry
+Tests the shared, precomputed shapes and the sprites drawn with them
+"""
+
+import unittest
+import math
+import sys
+import os
+
+# Mock sound manager FIRST before any other imports
+sys.path.insert(0, os.path.dirname(__file__))
+import mock_soundManager
+sys.modules['soundManager'] = mock_soundManager
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from util.vector2d import Vector2d
+from util.shaperegistry import Shape, ShapeRegistry, shapeRegistry, numpy
+from util.rotationcache import rotatePointlist
+from util.batchtransform import BatchTransform, batchTransformAvailable
+from util.dangergrid import DangerGrid
+from badies import Rock, Saucer
+from ship import Ship
+from stage import Stage
+
+
+class TestShape(unittest.TestCase):
+    """Test the geometry worked out for a shape"""
+
+    def setUp(self):
+        """A scaled rock outline"""
+        self.outline = Rock.outlines[0]
+        self.shape = Shape(('rock', 1), 2.5, self.outline)
+
+    def test_points_scaled_like_sprites(self):
+        """Test the points are scaled and truncated like VectorSprite.scale"""
+        rock = Rock(None, Vector2d(0, 0), Rock.largeRockType)
+        expected = tuple(tuple(rock.scale(point, 2.5))
+                         for point in self.outline)
+        self.assertEqual(self.shape.points, expected)
+
+    def test_radius_covers_rotations(self):
+        """Test no rotation of the outline reaches past the radius"""
+        for angle in range(360):
+            for x, y in rotatePointlist(self.shape.points, angle):
+                self.assertLessEqual(math.hypot(x, y), self.shape.radius)
+
+    def test_points_immutable(self):
+        """Test the points can't be changed"""
+        self.assertIsInstance(self.shape.points, tuple)
+        with self.assertRaises(TypeError):
+            self.shape.points[0][0] = 1
+
+    @unittest.skipUnless(numpy is not None, 'numpy not installed')
+    def test_array_read_only(self):
+        """Test the array matches the points and can't be written to"""
+        self.assertEqual([tuple(point) for point in self.shape.array.tolist()],
+                         list(self.shape.points))
+        with self.assertRaises(ValueError):
+            self.shape.array[0, 0] = 1
+
+
+class TestShapeRegistry(unittest.TestCase):
+    """Test shapes are made once and shared"""
+
+    def setUp(self):
+        """An empty registry with one outline"""
+        self.registry = ShapeRegistry()
+        self.registry.register('triangle', [(0, -10), (10, 10), (-10, 10)])
+
+    def test_same_shape_each_time(self):
+        """Test asking again gives the same Shape"""
+        shape = self.registry.get('triangle', 2)
+        self.assertIs(self.registry.get('triangle', 2), shape)
+        self.assertEqual(len(self.registry), 1)
+
+    def test_scales_are_different_shapes(self):
+        """Test each scale has its own Shape"""
+        self.assertIsNot(self.registry.get('triangle', 1),
+                         self.registry.get('triangle', 2))
+        self.assertEqual(self.registry.get('triangle', 2).points[0], (0, -20))
+
+    def test_unknown_shape(self):
+        """Test asking for an outline never registered"""
+        self.assertNotIn('square', self.registry)
+        with self.assertRaises(KeyError):
+            self.registry.get('square')
+
+    def test_register_again(self):
+        """Test the same outline can be registered again but not changed"""
+        self.registry.register('triangle', [(0, -10), (10, 10), (-10, 10)])
+        with self.assertRaises(ValueError):
+            self.registry.register('triangle', [(0, -12), (10, 10), (-10, 10)])
+
+
+class TestSharedSprites(unittest.TestCase):
+    """Test the sprites use the shared shapes"""
+
+    def setUp(self):
+        """A headless stage"""
+        self.stage = Stage('Test', (800, 600), headless=True)
+
+    def test_rocks_share_points(self):
+        """Test rocks of the same shape and size share one set of points"""
+        Rock.rockShape = 1
+        first = Rock(self.stage, Vector2d(0, 0), Rock.mediumRockType)
+        for _ in range(3):
+            Rock(self.stage, Vector2d(0, 0), Rock.mediumRockType)
+        fifth = Rock(self.stage, Vector2d(0, 0), Rock.mediumRockType)
+
+        self.assertIs(first.pointlist, fifth.pointlist)
+        self.assertIs(first.shape, shapeRegistry.get(('rock', 1), 1.5))
+        self.assertEqual(first.shapeId, ('rock', 1))
+        self.assertEqual(first.shapeScale, 1.5)
+
+    def test_saucers_share_points(self):
+        """Test saucers of the same size share one set of points"""
+        ship = Ship(self.stage)
+        first = Saucer(self.stage, Saucer.smallSaucerType, ship)
+        second = Saucer(self.stage, Saucer.smallSaucerType, ship)
+        large = Saucer(self.stage, Saucer.largeSaucerType, ship)
+
+        self.assertIs(first.pointlist, second.pointlist)
+        self.assertIsNot(first.pointlist, large.pointlist)
+        self.assertEqual(large.shapeScale, 1.5)
+
+    def test_rock_reach(self):
+        """Test Rock.reach is the furthest reach of any rock shape"""
+        self.assertEqual(Rock.reach, max(
+            shapeRegistry.get(('rock', shape), scale).radius
+            for shape in range(1, 5) for scale in Rock.scales))
+
+    def test_danger_radius_from_shape(self):
+        """Test the danger grid takes a rock's radius from its shape"""
+        grid = DangerGrid(800, 600, margin=0)
+        rock = Rock(self.stage, Vector2d(0, 0), Rock.largeRockType)
+        self.assertEqual(grid.radius(rock), rock.shape.radius)
+
+    @unittest.skipUnless(batchTransformAvailable, 'numpy not installed')
+    def test_batch_uses_shape_array(self):
+        """Test BatchTransform uses the shape's array for shared outlines"""
+        batch = BatchTransform()
+        rock = Rock(self.stage, Vector2d(0, 0), Rock.smallRockType)
+        self.assertIs(batch.pointArray(rock), rock.shape.array)
+
+        # An outline of its own gets an array of its own
+        rock.pointlist = [(0, 0), (1, 0), (0, 1)]
+        self.assertEqual(batch.pointArray(rock).tolist(),
+                         [[0, 0], [1, 0], [0, 1]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SpatialHash broad phase
+Tests grid queries, screen wrapping and the collision pass that uses it
+"""
+
+import unittest
+import sys
+import os
+
+# Mock sound manager FIRST before any other imports
+sys.path.insert(0, os.path.dirname(__file__))
+import mock_soundManager
+sys.modules['soundManager'] = mock_soundManager
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from util.vector2d import Vector2d
+from util.spatialhash import SpatialHash
+from badies import Rock, Saucer
+from asteroids import Asteroids
+from pygame import Rect
+
+
+class Thing:
+    """Something with a bounding rect to put in the grid"""
+
+    def __init__(self, rect):
+        self.boundingRect = Rect(rect)
+
+
+class TestSpatialHash(unittest.TestCase):
+    """Test the uniform grid"""
+
+    def setUp(self):
+        """Create an 800x600 grid with 100 pixel cells"""
+        self.grid = SpatialHash(800, 600, cellSize=100)
+
+    def test_dimensions(self):
+        """Test the grid covers the screen"""
+        self.assertEqual(self.grid.cols, 8)
+        self.assertEqual(self.grid.rows, 6)
+
+    def test_query_finds_nearby(self):
+        """Test objects in the same cell are returned"""
+        near = Thing((110, 110, 10, 10))
+        far = Thing((510, 410, 10, 10))
+        self.grid.rebuild([near, far])
+
+        self.assertEqual(self.grid.query(Rect(150, 150, 5, 5)), [near])
+
+    def test_query_spanning_cells(self):
+        """Test a rect over a cell boundary sees both cells"""
+        left = Thing((50, 50, 10, 10))
+        right = Thing((150, 50, 10, 10))
+        self.grid.rebuild([left, right])
+
+        self.assertEqual(self.grid.query(Rect(90, 50, 20, 10)), [left, right])
+
+    def test_query_returns_each_object_once(self):
+        """Test an object covering many cells is only returned once"""
+        big = Thing((0, 0, 350, 350))
+        self.grid.rebuild([big])
+
+        self.assertEqual(self.grid.query(Rect(0, 0, 400, 400)), [big])
+
+    def test_insertion_order(self):
+        """Test results come back in the order objects were inserted"""
+        things = [Thing((100 * i + 10, 10, 10, 10)) for i in range(4)]
+        self.grid.rebuild(list(reversed(things)))
+
+        self.assertEqual(self.grid.query(Rect(0, 0, 800, 50)),
+                         list(reversed(things)))
+
+    def test_wraps_horizontally(self):
+        """Test a rect off the right edge covers the left hand cells"""
+        left = Thing((5, 50, 10, 10))
+        self.grid.rebuild([left])
+
+        self.assertEqual(self.grid.query(Rect(790, 50, 30, 10)), [left])
+
+    def test_wraps_vertically(self):
+        """Test a rect off the top covers the bottom cells"""
+        bottom = Thing((50, 590, 5, 5))
+        self.grid.rebuild([bottom])
+
+        self.assertEqual(self.grid.query(Rect(50, -20, 10, 30)), [bottom])
+
+    def test_rect_bigger_than_screen(self):
+        """Test a rect wider than the screen covers every column once"""
+        self.assertEqual(len(self.grid.cellsFor(Rect(-50, 0, 2000, 10))), 8)
+
+    def test_rebuild_forgets_old_objects(self):
+        """Test rebuilding empties the grid first"""
+        self.grid.rebuild([Thing((10, 10, 5, 5))])
+        self.grid.rebuild([])
+
+        self.assertEqual(self.grid.query(Rect(0, 0, 800, 600)), [])
+
+
+class TestBroadPhaseCollisions(unittest.TestCase):
+    """Test Asteroids.checkCollisions through the grid"""
+
+    def setUp(self):
+        """Start a headless game with one rock far from the ship"""
+        self.game = Asteroids(headless=True)
+        self.game.initialiseGame()
+        for rock in self.game.rockList:
+            self.game.stage.removeSprite(rock)
+        self.game.rockList = []
+        self.rock = Rock(self.game.stage, Vector2d(100, 100),
+                         Rock.smallRockType)
+        self.game.stage.addSprite(self.rock)
+        self.game.rockList.append(self.rock)
+
+    def test_bullet_destroys_rock(self):
+        """Test a bullet over a rock destroys it"""
+        self.game.ship.fireBullet()
+        bullet = self.game.ship.bullets[0]
+        bullet.position = Vector2d(100, 100)
+        self.game.stage.drawSprites()
+        self.game.checkCollisions()
+
+        self.assertNotIn(self.rock, self.game.rockList)
+        self.assertEqual(bullet.ttl, 0)
+        self.assertEqual(self.game.score, 200)
+
+    def test_far_rock_untouched(self):
+        """Test nothing happens when nothing is near the rock"""
+        self.game.ship.fireBullet()
+        self.game.stage.drawSprites()
+        self.game.checkCollisions()
+
+        self.assertIn(self.rock, self.game.rockList)
+        self.assertEqual(self.game.gameState, 'playing')
+
+    def test_rock_hits_ship(self):
+        """Test a rock over the ship kills it"""
+        self.rock.position = Vector2d(self.game.ship.position.x + 8,
+                                      self.game.ship.position.y)
+        self.game.stage.drawSprites()
+        self.game.checkCollisions()
+
+        self.assertEqual(self.game.gameState, 'exploding')
+        self.assertEqual(self.game.deathCause, 'rock')
+
+    def test_ship_shoots_saucer_without_rocks(self):
+        """Test the saucer can be shot when there are no rocks left"""
+        self.game.stage.removeSprite(self.rock)
+        self.game.rockList = []
+        saucer = Saucer(self.game.stage, Saucer.largeSaucerType,
+                        self.game.ship)
+        saucer.position = Vector2d(300, 100)
+        self.game.stage.addSprite(saucer)
+        self.game.saucer = saucer
+
+        self.game.ship.fireBullet()
+        self.game.ship.bullets[0].position = Vector2d(300, 100)
+        self.game.stage.drawSprites()
+        self.game.checkCollisions()
+
+        self.assertIsNone(self.game.saucer)
+        self.assertEqual(self.game.score, 500)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SpriteAtlas
+Tests sprites are drawn once, blitted after that and the memory cap
+"""
+
+import unittest
+import sys
+import os
+
+# Mock sound manager FIRST before any other imports
+sys.path.insert(0, os.path.dirname(__file__))
+import mock_soundManager
+sys.modules['soundManager'] = mock_soundManager
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from util.vector2d import Vector2d
+from util.vectorsprites import VectorSprite
+from util.spriteatlas import SpriteAtlas
+from badies import Rock
+from ship import Ship
+from stage import Stage
+import pygame
+
+BACKGROUND = (10, 10, 10)
+
+
+class TestSpriteAtlas(unittest.TestCase):
+    """Test drawing sprites from the atlas"""
+
+    def setUp(self):
+        """Create an atlas and a surface to draw on"""
+        self.screen = pygame.Surface((800, 600))
+        self.screen.fill(BACKGROUND)
+        self.atlas = SpriteAtlas(BACKGROUND)
+        Rock.rockShape = 1
+        self.rock = Rock(None, Vector2d(400, 300), Rock.largeRockType)
+        self.rock.angle = 30
+
+    def test_rect_matches_aalines(self):
+        """Test the rect from the atlas is the one aalines gives"""
+        expected = pygame.draw.aalines(pygame.Surface((800, 600)),
+                                       self.rock.color, True,
+                                       self.rock.draw())
+
+        self.assertEqual(self.atlas.drawSprite(self.screen, self.rock),
+                         expected)
+
+    def test_pixels_match_aalines(self):
+        """Test the blitted sprite looks the same as drawing its lines,
+        give or take rounding where the antialiased lines blend"""
+        expected = pygame.Surface((800, 600))
+        expected.fill(BACKGROUND)
+        rect = pygame.draw.aalines(expected, self.rock.color, True,
+                                   self.rock.draw())
+        self.atlas.drawSprite(self.screen, self.rock)
+
+        for x in range(rect.left, rect.right):
+            for y in range(rect.top, rect.bottom):
+                drawn = self.screen.get_at((x, y))
+                for channel in range(3):
+                    self.assertAlmostEqual(drawn[channel],
+                                           expected.get_at((x, y))[channel],
+                                           delta=2)
+
+    def test_draw_list_matches_one_at_a_time(self):
+        """Test blitting a list gives the same pixels and rects as drawing
+        the sprites one by one, handing back the ones it can't draw"""
+        ship = Ship(Stage('Test', (800, 600), headless=True))
+        ship.position = Vector2d(420, 310)
+        odd = VectorSprite(Vector2d(390, 290), Vector2d(0, 0),
+                           [(0, -10), (10, 10), (-10, 10)], angle=0.5)
+        odd.draw()
+        sprites = [self.rock, odd, ship]
+        self.rock.draw()
+        ship.draw()
+
+        def drawLines(screen):
+            return lambda sprite: pygame.draw.aalines(
+                screen, sprite.color, True, sprite.transformedPointlist)
+
+        expected = pygame.Surface((800, 600))
+        expected.fill(BACKGROUND)
+        expectedRects = []
+        for sprite in sprites:
+            rect = self.atlas.drawSprite(expected, sprite)
+            if rect is None:
+                rect = drawLines(expected)(sprite)
+            expectedRects.append(rect)
+
+        rects = self.atlas.drawSprites(self.screen, sprites,
+                                       drawLines(self.screen))
+        self.assertEqual(rects, expectedRects)
+        for x in range(370, 450):
+            for y in range(260, 340):
+                self.assertEqual(self.screen.get_at((x, y)),
+                                 expected.get_at((x, y)))
+
+    def test_drawn_once(self):
+        """Test a combination is only drawn the first time"""
+        self.atlas.drawSprite(self.screen, self.rock)
+        self.rock.position = Vector2d(100, 100)
+        rect = self.atlas.drawSprite(self.screen, self.rock)
+
+        self.assertEqual(self.atlas.misses, 1)
+        self.assertEqual(self.atlas.hits, 1)
+        self.assertTrue(rect.collidepoint(100, 100))
+
+    def test_key(self):
+        """Test angle and colour are part of the key"""
+        self.atlas.drawSprite(self.screen, self.rock)
+        self.rock.angle = 31
+        self.atlas.drawSprite(self.screen, self.rock)
+        self.rock.angle = 391
+        self.atlas.drawSprite(self.screen, self.rock)
+        self.rock.color = (0, 0, 0)
+        self.atlas.drawSprite(self.screen, self.rock)
+
+        self.assertEqual(self.atlas.misses, 3)
+
+    def test_fractional_angle_not_drawn(self):
+        """Test sprites between whole degrees are left to aalines"""
+        self.rock.angle = 30.5
+        self.assertIsNone(self.atlas.drawSprite(self.screen, self.rock))
+        self.assertEqual(len(self.atlas.entries), 0)
+
+    def test_memory_cap(self):
+        """Test the least recently used surfaces go past maxBytes"""
+        self.atlas.drawSprite(self.screen, self.rock)
+        self.atlas.maxBytes = self.atlas.bytes + 1
+        self.rock.angle = 60
+        self.atlas.drawSprite(self.screen, self.rock)
+
+        self.assertEqual(self.atlas.evictions, 1)
+        self.assertEqual(len(self.atlas.entries), 1)
+        self.assertLessEqual(self.atlas.bytes, self.atlas.maxBytes)
+
+    def test_stats(self):
+        """Test the counters are reported and cleared"""
+        self.atlas.drawSprite(self.screen, self.rock)
+        stats = self.atlas.stats()
+
+        self.assertEqual(stats['size'], 1)
+        self.assertGreater(stats['bytes'], 0)
+        self.assertEqual(stats['misses'], 1)
+
+        self.atlas.clear()
+        self.assertEqual(self.atlas.stats()['bytes'], 0)
+
+
+class TestStageWithAtlas(unittest.TestCase):
+    """Test the stage draws through the atlas"""
+
+    def setUp(self):
+        """Create a stage drawing onto an off screen surface"""
+        self.stage = Stage('Test', dirtyRects=True, spriteAtlas=True,
+                           surface=pygame.Surface((800, 600)))
+
+    def test_sprites_from_atlas(self):
+        """Test sprites are drawn from the atlas"""
+        ship = Ship(self.stage)
+        self.stage.addSprite(ship)
+        self.stage.drawSprites()
+        self.stage.drawSprites()
+
+        self.assertEqual(self.stage.atlas.misses, 1)
+        self.assertEqual(self.stage.atlas.hits, 1)
+        self.assertEqual(self.stage.drawnRects[-1], ship.boundingRect)
+
+    def test_fractional_angle_uses_lines(self):
+        """Test sprites the atlas can't draw still get drawn"""
+        sprite = VectorSprite(Vector2d(100, 100), Vector2d(0, 0),
+                              [(0, -10), (10, 10), (-10, 10)], angle=0.5)
+        self.stage.addSprite(sprite)
+
+        self.assertEqual(len(self.stage.atlas.entries), 0)
+        self.assertTrue(sprite.boundingRect.collidepoint(100, 100))
+
+    def test_headless_has_no_atlas(self):
+        """Test a headless stage ignores the atlas option"""
+        stage = Stage('Test', (800, 600), headless=True, spriteAtlas=True)
+        self.assertIsNone(stage.atlas)
+
+
+if __name__ == '__main__':
+    unittest.main()
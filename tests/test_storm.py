@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the asteroid storm
+Tests storm waves, culling rocks before the broad phase and the cheaper
+test for small rocks
+"""
+
+import argparse
+import unittest
+import sys
+import os
+import math
+
+# Mock sound manager FIRST before any other imports
+sys.path.insert(0, os.path.dirname(__file__))
+import mock_soundManager
+sys.modules['soundManager'] = mock_soundManager
+
+# Add parent and benchmarks directories to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..',
+                                'benchmarks'))
+
+from util.vector2d import Vector2d
+from util.entitystore import entityStoreAvailable
+from util.rotationcache import rotatePointlist
+from util.narrowphase import narrowPhase
+from badies import Rock
+from asteroids import Asteroids
+import storm
+
+
+class TestRockReach(unittest.TestCase):
+    """Test the reach used for culling covers every rock"""
+
+    def test_reach(self):
+        """Test no rock outline reaches further than rockReach"""
+        for rockType in (Rock.largeRockType, Rock.mediumRockType,
+                         Rock.smallRockType):
+            for shape in range(1, 5):
+                Rock.rockShape = shape
+                rock = Rock(None, Vector2d(0, 0), rockType)
+                for angle in range(360):
+                    for x, y in rotatePointlist(rock.pointlist, angle):
+                        self.assertLessEqual(abs(x), Asteroids.rockReach)
+                        self.assertLessEqual(abs(y), Asteroids.rockReach)
+
+
+@unittest.skipUnless(entityStoreAvailable, 'numpy not installed')
+class TestStorm(unittest.TestCase):
+    """Test a game started as a storm"""
+
+    def setUp(self):
+        """Start a headless storm of 500 rocks"""
+        self.game = Asteroids(headless=True, seed=3, storm=500)
+        self.game.initialiseGame()
+
+    def removeRocks(self):
+        for rock in self.game.rockList:
+            self.game.stage.removeSprite(rock)
+        self.game.rockList = []
+
+    def addRock(self, x, y, rockType=Rock.largeRockType):
+        rock = Rock(self.game.stage, Vector2d(x, y), rockType)
+        rock.heading = Vector2d(0.1, 0.1)
+        self.game.stage.addSprite(rock)
+        self.game.rockList.append(rock)
+        return rock
+
+    def test_batched(self):
+        """Test a storm moves, transforms and draws in batches"""
+        stage = self.game.stage
+        self.assertIsNotNone(stage.store)
+        self.assertIsNotNone(stage.batch)
+
+    def test_rocks_spread_away_from_ship(self):
+        """Test every wave has storm rocks, none on top of the ship"""
+        self.assertEqual(len(self.game.rockList), 500)
+        ship = self.game.ship.position
+        for rock in self.game.rockList:
+            self.assertGreater(math.hypot(rock.position.x - ship.x,
+                                          rock.position.y - ship.y),
+                               Asteroids.stormClearance)
+
+        self.removeRocks()
+        self.game.tick()
+        self.assertEqual(self.game.level, 2)
+        self.assertEqual(len(self.game.rockList), 501)
+
+    def test_far_rocks_culled(self):
+        """Test only rocks near the ship or a bullet reach the broad phase"""
+        self.removeRocks()
+        near = self.addRock(self.game.ship.position.x + 40,
+                            self.game.ship.position.y)
+        far = self.addRock(100, 100)
+        self.game.ship.fireBullet()
+        bullet = self.game.ship.bullets[0]
+        bullet.position = Vector2d(800, 600)
+        byBullet = self.addRock(830, 600, Rock.smallRockType)
+        self.game.stage.updateSprites()
+
+        rocks = self.game.collidableRocks()
+        self.assertIn(near, rocks)
+        self.assertIn(byBullet, rocks)
+        self.assertNotIn(far, rocks)
+
+    def test_culled_collisions(self):
+        """Test bullets still destroy rocks after culling"""
+        self.removeRocks()
+        rock = self.addRock(300, 200, Rock.smallRockType)
+        self.game.ship.fireBullet()
+        self.game.ship.bullets[0].position = Vector2d(300, 200)
+        self.game.stage.updateSprites()
+        self.game.checkCollisions()
+
+        self.assertNotIn(rock, self.game.rockList)
+        self.assertEqual(self.game.score, 200)
+
+    def test_small_rock_box_hits_ship(self):
+        """Test a small storm rock only has to touch the ship's box"""
+        self.removeRocks()
+        ship = self.game.ship
+        self.game.stage.updateSprites()
+        corner = ship.boundingRect.topleft
+        Rock.rockShape = 1
+        rock = self.addRock(corner[0] - 4, corner[1] - 4, Rock.smallRockType)
+        self.game.stage.updateSprites()
+        self.assertTrue(rock.boundingRect.colliderect(ship.boundingRect))
+        self.assertIsNone(rock.checkPolygonCollision(ship))
+
+        narrowPhase.clear()
+        self.game.checkCollisions()
+        self.assertEqual(self.game.gameState, 'exploding')
+        self.assertEqual(narrowPhase.stats()['boxHits'], 1)
+
+    def test_no_danger_grid(self):
+        """Test the danger grid isn't kept in a storm"""
+        self.game.tick()
+        self.assertEqual(self.game.dangerGrid.footprints, {})
+
+
+@unittest.skipUnless(entityStoreAvailable, 'numpy not installed')
+class TestLoadTest(unittest.TestCase):
+    """Test the storm load test"""
+
+    def test_headless_storm(self):
+        """Test a storm runs headless with nothing drawn"""
+        options = argparse.Namespace(headless=True, seed=1, warmup=1,
+                                     frames=3)
+        result = storm.runStorm(200, options)
+
+        self.assertEqual(result['rocks'], 200)
+        self.assertGreater(result['mean'], 0.0)
+        self.assertLessEqual(result['p50'], result['p99'])
+        self.assertIn('pairs', result['narrowPhase'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the TextCache
+Tests fonts are loaded once and rendered text is reused
+"""
+
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from util.textcache import TextCache
+import pygame
+
+FONT_PATH = os.path.join(os.path.dirname(__file__), '..', 'res',
+                         'Hyperspace.otf')
+
+
+class TestTextCache(unittest.TestCase):
+    """Test the font registry and rendered text LRU"""
+
+    def setUp(self):
+        """Create a small cache"""
+        pygame.font.init()
+        self.cache = TextCache(FONT_PATH, maxSize=2)
+
+    def test_font_loaded_once_per_size(self):
+        """Test each size is loaded from the file once"""
+        first = self.cache.font(30)
+        self.assertIs(self.cache.font(30), first)
+        self.assertIsNot(self.cache.font(15), first)
+        self.assertEqual(len(self.cache.fonts), 2)
+
+    def test_render_then_hit(self):
+        """Test the same text comes back as the same surface"""
+        first = self.cache.render(30, 'Asteroids', (180, 180, 180))
+        second = self.cache.render(30, 'Asteroids', (180, 180, 180))
+
+        self.assertIsInstance(first, pygame.Surface)
+        self.assertIs(first, second)
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_key_includes_size_and_color(self):
+        """Test size and colour are part of the key"""
+        self.cache.render(30, '00', (200, 200, 200))
+        self.cache.render(15, '00', (200, 200, 200))
+        self.cache.render(15, '00', (255, 255, 255))
+
+        self.assertEqual(self.cache.misses, 3)
+
+    def test_matches_font_render(self):
+        """Test the cached surface is what the font renders"""
+        surface = self.cache.render(20, '1250', (255, 255, 255))
+        expected = self.cache.font(20).render('1250', True, (255, 255, 255))
+        self.assertEqual(surface.get_size(), expected.get_size())
+
+    def test_least_recently_used_evicted(self):
+        """Test the oldest string goes when the cache is full"""
+        self.cache.render(30, '100', (200, 200, 200))
+        self.cache.render(30, '200', (200, 200, 200))
+        self.cache.render(30, '100', (200, 200, 200))
+        self.cache.render(30, '300', (200, 200, 200))
+
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertIn((30, '100', (200, 200, 200)), self.cache.entries)
+        self.assertNotIn((30, '200', (200, 200, 200)), self.cache.entries)
+
+    def test_stats(self):
+        """Test the counters are reported and cleared"""
+        self.cache.render(30, 'Paused', (255, 255, 255))
+        self.cache.render(30, 'Paused', (255, 255, 255))
+        stats = self.cache.stats()
+
+        self.assertEqual(stats['size'], 1)
+        self.assertEqual(stats['fonts'], 1)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+        self.cache.clear()
+        self.assertEqual(self.cache.stats()['size'], 0)
+        self.assertEqual(self.cache.stats()['fonts'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,6 +12,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from util.vector2d import Vector2d
+import math
 
 
 class TestVector2d(unittest.TestCase):
@@ -75,6 +76,83 @@ class TestVector2dOperations(unittest.TestCase):
         distance = math.hypot(self.v1.x - self.v2.x, self.v1.y - self.v2.y)
         self.assertAlmostEqual(distance, math.sqrt(8))  # sqrt((3-1)^2 + (4-2)^2)
 
+    def test_length(self):
+        """Test length matches the magnitude"""
+        self.assertAlmostEqual(self.v1.length(), 5.0)
+        self.assertAlmostEqual((self.v1 - self.v2).length(), math.sqrt(8))
+
+    def test_no_instance_dict(self):
+        """Test vectors use slots rather than a __dict__"""
+        self.assertFalse(hasattr(self.v1, '__dict__'))
+        with self.assertRaises(AttributeError):
+            self.v1.z = 1
+
+    def test_copy(self):
+        """Test copy makes an independent vector"""
+        v = self.v1.copy()
+        v.x = 30
+        self.assertEqual(self.v1.x, 3)
+        self.assertEqual((v.x, v.y), (30, 4))
+
+    def test_set(self):
+        """Test both components are set together"""
+        self.v1.set(7, 8)
+        self.assertEqual((self.v1.x, self.v1.y), (7, 8))
+
+    def test_add_sub(self):
+        """Test addition and subtraction make new vectors"""
+        total = self.v1 + self.v2
+        difference = self.v1 - self.v2
+        self.assertEqual((total.x, total.y), (4, 6))
+        self.assertEqual((difference.x, difference.y), (2, 2))
+        self.assertEqual((self.v1.x, self.v1.y), (3, 4))
+
+    def test_scale(self):
+        """Test scaling by a number from either side"""
+        v = self.v1 * 2
+        self.assertEqual((v.x, v.y), (6, 8))
+        v = 0.5 * self.v1
+        self.assertEqual((v.x, v.y), (1.5, 2.0))
+        v = -self.v2
+        self.assertEqual((v.x, v.y), (-1, -2))
+
+    def test_in_place(self):
+        """Test in place operators change the same vector"""
+        v = self.v1
+        v += self.v2
+        self.assertIs(v, self.v1)
+        self.assertEqual((v.x, v.y), (4, 6))
+        v -= self.v2
+        self.assertEqual((v.x, v.y), (3, 4))
+        v *= 3
+        self.assertIs(v, self.v1)
+        self.assertEqual((v.x, v.y), (9, 12))
+
+    def test_normalize(self):
+        """Test unit vectors, in place and as a new vector"""
+        unit = self.v1.normalized()
+        self.assertAlmostEqual(unit.x, 0.6)
+        self.assertAlmostEqual(unit.y, 0.8)
+        self.assertEqual((self.v1.x, self.v1.y), (3, 4))
+
+        self.assertIs(self.v1.normalize(), self.v1)
+        self.assertAlmostEqual(self.v1.length(), 1.0)
+
+    def test_normalize_zero(self):
+        """Test a zero vector is left alone rather than dividing by zero"""
+        zero = Vector2d(0, 0)
+        self.assertEqual(zero.normalized().asTuple(), (0, 0))
+        self.assertEqual(zero.normalize().asTuple(), (0, 0))
+
+    def test_tuple_view(self):
+        """Test vectors read like (x, y) tuples"""
+        x, y = self.v1
+        self.assertEqual((x, y), (3, 4))
+        self.assertEqual(self.v1.asTuple(), (3, 4))
+        self.assertEqual(tuple(self.v1), (3, 4))
+        self.assertEqual(len(self.v1), 2)
+        self.assertEqual(self.v1[1], 4)
+
 
 if __name__ == '__main__':
     unittest.main()
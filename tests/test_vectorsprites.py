@@ -24,7 +24,6 @@ class TestVectorSpriteBasics(unittest.TestCase):
     def setUpClass(cls):
         """Initialize pygame once for all tests"""
         pygame.init()
-        pygame.display.set_mode((800, 600))
 
     def setUp(self):
         """Set up test fixtures"""
@@ -64,7 +63,6 @@ class TestVectorSpriteMovement(unittest.TestCase):
     def setUpClass(cls):
         """Initialize pygame once for all tests"""
         pygame.init()
-        pygame.display.set_mode((800, 600))
 
     def setUp(self):
         """Set up test fixtures"""
@@ -119,7 +117,6 @@ class TestVectorSpriteTransformation(unittest.TestCase):
     def setUpClass(cls):
         """Initialize pygame once for all tests"""
         pygame.init()
-        pygame.display.set_mode((800, 600))
 
     def setUp(self):
         """Set up test fixtures"""
@@ -184,6 +181,30 @@ class TestVectorSpriteTransformation(unittest.TestCase):
         self.assertEqual(scaled[0], 5)
         self.assertEqual(scaled[1], 10)
 
+    def test_bounds_match_transformed_points(self):
+        """Test the analytic bounds equal the rect around the transformed
+        points, at whole and fractional angles"""
+        self.sprite.pointlist = [(-7, -11), (13, -5), (6, 14), (-15, 5)]
+        for angle in (0, 17, 90, 233, 359, 42.5):
+            for x, y in ((0, 0), (100.25, 50.75), (-3.5, 799.99)):
+                self.sprite.angle = angle
+                self.sprite.position = Vector2d(x, y)
+                self.sprite.rotateAndTransform()
+                xs = [px for px, py in self.sprite.transformedPointlist]
+                ys = [py for px, py in self.sprite.transformedPointlist]
+                left = math.floor(min(xs))
+                top = math.floor(min(ys))
+                expected = pygame.Rect(left, top,
+                                       math.floor(max(xs)) - left + 1,
+                                       math.floor(max(ys)) - top + 1)
+                self.assertEqual(self.sprite.bounds(), expected)
+
+    def test_bounds_without_transforming(self):
+        """Test bounds don't need the points to have been transformed"""
+        self.sprite.position = Vector2d(50, 60)
+        self.assertEqual(self.sprite.bounds(), pygame.Rect(40, 50, 21, 21))
+        self.assertFalse(hasattr(self.sprite, 'transformedPointlist'))
+
 
 class TestVectorSpriteCollision(unittest.TestCase):
     """Test sprite collision detection"""
@@ -192,7 +213,7 @@ class TestVectorSpriteCollision(unittest.TestCase):
     def setUpClass(cls):
         """Initialize pygame once for all tests"""
         pygame.init()
-        cls.screen = pygame.display.set_mode((800, 600))
+        cls.screen = pygame.Surface((800, 600))
 
     def setUp(self):
         """Set up test fixtures"""